@@ -0,0 +1,96 @@
+# benchmarks/benchmark_nlp.py
+
+"""
+NLP Stage Benchmark
+Measures per-article text normalization time on the saved HTML fixtures, comparing the legacy
+pipeline (process_text run twice, with every sentence re-parsed by the model) against the
+single-pass normalize_text stage.
+
+Usage:
+    python benchmarks/benchmark_nlp.py [--repeat 3] [--backend senter]
+
+--backend selects the segmentation backend (see config.initialize_nlp); 'sentencizer' and
+'regex' work in environments without en_core_web_sm.
+"""
+
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.config import initialize_nlp, NLP_BACKEND
+from modules.text_processing import normalize_text, split_long_sentence
+from modules.web_scraper import WebScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+MAX_SENTENCE_LENGTH = 300
+
+
+def legacy_process_text(nlp, text: str) -> str:
+    """Replica of the previous process_text: one nlp call per paragraph and per sentence."""
+    processed_paragraphs = []
+    for paragraph in text.split('\n'):
+        if paragraph.strip():
+            doc = nlp(paragraph)
+            processed_sentences = []
+            for sent in doc.sents:
+                if not sent.text.strip():
+                    continue
+                split_sentences = []
+                for sub in nlp(sent.text.strip()).sents:
+                    split_sentences.extend(split_long_sentence(sub.text.strip(), MAX_SENTENCE_LENGTH))
+                processed_sentences.append(' '.join(split_sentences))
+            processed_paragraphs.append(' '.join(processed_sentences))
+        else:
+            processed_paragraphs.append('')
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(processed_paragraphs))
+
+
+def legacy_pipeline(nlp, text: str) -> str:
+    """extract_content and scrape_article each ran process_text."""
+    return legacy_process_text(nlp, legacy_process_text(nlp, text))
+
+
+def single_pass_pipeline(nlp, text: str) -> str:
+    return normalize_text(nlp, text, MAX_SENTENCE_LENGTH)
+
+
+def time_pipeline(pipeline, nlp, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pipeline(nlp, text)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per fixture (median is reported)')
+    arg_parser.add_argument('--backend', default=NLP_BACKEND,
+                            choices=['full', 'senter', 'sentencizer', 'regex'],
+                            help='Sentence segmentation backend')
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    nlp = initialize_nlp(args.backend)
+    print(f"Loaded '{args.backend}' backend in {time.perf_counter() - start:.3f}s")
+    scraper = WebScraper({'extraction_engine': 'none'})
+
+    print(f"{'fixture':<24}{'chars':>10}{'before (s)':>14}{'after (s)':>12}{'speedup':>10}")
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as fixture:
+            _, text, _ = scraper._parse_document(fixture.read())
+        before = time_pipeline(legacy_pipeline, nlp, text, args.repeat)
+        after = time_pipeline(single_pass_pipeline, nlp, text, args.repeat)
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(f"{name:<24}{len(text):>10}{before:>14.3f}{after:>12.3f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/llm_benchmark.py
+
+"""
+Article Generation Benchmark
+Runs article_pipeline.generate_article_text (chunking, pipelining, streaming, quota governor and
+TTS normalization included) against the fake language model backend, so throughput and our own
+overhead can be measured offline at one or more concurrency levels without spending quota.
+
+Reported per concurrency level: articles/sec, p50/p95/p99 latency, model calls, simulated model
+seconds per article, CPU ms per article (our overhead; the fake model only sleeps) and peak RSS.
+Injected ResourceExhausted errors go through the real 15-60s retry backoff.
+
+Usage:
+    python benchmarks/llm_benchmark.py [--articles 50] [--concurrency 1,8,32] [--article-chars 6000]
+        [--latency 0.8] [--jitter 0.3] [--distribution lognormal] [--tokens-per-second 150]
+        [--error-rate 0] [--tts-mode llm] [--pipelining off] [--chunking on] [--quota-rpm 0]
+        [--output results.json]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scraper_benchmark import peak_rss_mb, percentile
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'tts_normalizer')
+
+
+def load_articles(article_chars: int) -> List[str]:
+    """Articles of about article_chars characters, built by repeating the text fixtures."""
+    articles = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.txt'))):
+        if path.endswith('.expected.txt'):
+            continue
+        with open(path, encoding='utf-8') as source:
+            paragraphs = source.read().strip()
+        repeats = max(1, article_chars // (len(paragraphs) + 2))
+        articles.append('\n\n'.join([paragraphs] * repeats))
+    if not articles:
+        raise SystemExit(f"No .txt files found in {CORPUS_DIR}")
+    return articles
+
+
+async def run_level(args, articles: List[str], concurrency: int) -> Dict[str, Any]:
+    from modules import article_pipeline
+    from modules.google_api_interface import ContentGenerator, ContentGeneratorRegistry
+    from modules.llm_backends import FakeBackend
+    from modules.quota_governor import QuotaGovernor
+
+    backend = FakeBackend(latency=args.latency, jitter=args.jitter, distribution=args.distribution,
+                          tokens_per_second=args.tokens_per_second, error_rate=args.error_rate, seed=args.seed)
+    governor = QuotaGovernor(requests_per_minute=args.quota_rpm, tokens_per_minute=args.quota_tpm) \
+        if args.quota_rpm else None
+    # No response cache: every article must reach the model
+    article_pipeline.content_generators = ContentGeneratorRegistry(
+        governor=governor,
+        factory=lambda model_name, cache=None, governor=None: ContentGenerator(
+            model_name, cache=cache, governor=governor, backend=backend)
+    )
+    article_pipeline.LLM_PIPELINING_ENABLED = args.pipelining == 'on'
+    article_pipeline.LLM_CHUNKING_ENABLED = args.chunking == 'on'
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def generate(index: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                text = await article_pipeline.generate_article_text(articles[index % len(articles)],
+                                                                    tts_mode=args.tts_mode)
+            except Exception:
+                text = None
+            elapsed = time.perf_counter() - start
+        if text:
+            latencies.append(elapsed)
+        else:
+            failures += 1
+
+    process_cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[generate(index) for index in range(args.articles)])
+    wall = time.perf_counter() - wall_start
+    process_cpu = time.process_time() - process_cpu_start
+
+    backend_stats = backend.stats()
+    latencies.sort()
+    succeeded = len(latencies)
+    return {
+        'concurrency': concurrency,
+        'articles': args.articles,
+        'succeeded': succeeded,
+        'failed': failures,
+        'wall_seconds': round(wall, 3),
+        'articles_per_sec': round(succeeded / wall, 3) if wall else 0.0,
+        'latency_seconds': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(statistics.mean(latencies), 3) if latencies else 0.0,
+        },
+        'model_calls': backend_stats['calls'],
+        'model_errors': backend_stats['errors'],
+        'simulated_seconds_per_article': round(backend_stats['simulated_seconds'] / max(args.articles, 1), 3),
+        'cpu_ms_per_article': round(1000 * process_cpu / max(succeeded, 1), 2),
+        'quota': governor.stats() if governor else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def print_level(result: Dict[str, Any]) -> None:
+    latency = result['latency_seconds']
+    print(f"{result['concurrency']:>6} {result['succeeded']:>5}/{result['articles']:<5} "
+          f"{result['articles_per_sec']:>10.2f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+          f"{latency['p99']:>8.2f} {result['model_calls']:>6} {result['simulated_seconds_per_article']:>9.2f} "
+          f"{result['cpu_ms_per_article']:>8.1f} {result['peak_rss_mb']:>8.1f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--articles', type=int, default=50, help='Articles generated per concurrency level')
+    arg_parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated concurrency levels')
+    arg_parser.add_argument('--article-chars', type=int, default=6000, help='Approximate article length')
+    arg_parser.add_argument('--latency', type=float, default=0.8, help='Model time to first token (s)')
+    arg_parser.add_argument('--jitter', type=float, default=0.3, help='Latency spread (lognormal sigma)')
+    arg_parser.add_argument('--distribution', default='lognormal', choices=['constant', 'uniform', 'lognormal'])
+    arg_parser.add_argument('--tokens-per-second', type=float, default=150, help='Model output rate')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls raising ResourceExhausted')
+    arg_parser.add_argument('--tts-mode', default='llm', choices=['llm', 'local', 'hybrid'])
+    arg_parser.add_argument('--pipelining', default='off', choices=['on', 'off'])
+    arg_parser.add_argument('--chunking', default='on', choices=['on', 'off'])
+    arg_parser.add_argument('--quota-rpm', type=float, default=0, help='Quota governor requests/min (0 = none)')
+    arg_parser.add_argument('--quota-tpm', type=float, default=1e6, help='Quota governor tokens/min')
+    arg_parser.add_argument('--seed', type=int, default=1)
+    arg_parser.add_argument('--output', help='Write the JSON report to this file')
+    args = arg_parser.parse_args()
+
+    # Per-call logging would dominate the CPU being measured
+    logging.disable(logging.WARNING)
+    articles = load_articles(args.article_chars)
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+
+    print(f"{len(articles)} articles of ~{args.article_chars} chars, latency {args.latency}s "
+          f"({args.distribution}), {args.tokens_per_second:g} tokens/s, tts mode {args.tts_mode}")
+    print(f"{'conc':>6} {'ok':>11} {'articles/s':>10} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} "
+          f"{'calls':>6} {'model s':>9} {'cpu ms':>8} {'rss MB':>8}")
+    results = []
+    for concurrency in levels:
+        result = asyncio.run(run_level(args, articles, concurrency))
+        print_level(result)
+        results.append(result)
+
+    if args.output:
+        report = {
+            'settings': vars(args),
+            'python': platform.python_version(),
+            'results': results,
+        }
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
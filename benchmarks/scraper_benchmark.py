@@ -0,0 +1,385 @@
+# benchmarks/scraper_benchmark.py
+
+"""
+Scraper Throughput Benchmark
+Serves a corpus of recorded HTML pages from a local aiohttp fixture server (in a separate process,
+so serving does not count against the scraper) and drives WebScraper.scrape_article against it at
+one or more concurrency levels. The server can inject latency, limit bandwidth, fail a fraction of
+requests, and also plays the Cloud Run scrape endpoint.
+
+Reported per concurrency level: pages/sec, p50/p95/p99 latency, CPU time per stage and peak RSS.
+  fetch  - CPU of the event loop thread (requests, streaming, decoding, head metadata)
+  parse  - CPU of _parse_document in executor threads (HTML parse, boilerplate removal)
+  nlp    - CPU of sentence normalization in executor threads
+
+Usage:
+    python benchmarks/scraper_benchmark.py [--pages 200] [--concurrency 1,8,32] [--latency 0.05]
+        [--bandwidth 0] [--failure-rate 0] [--fetch-mode hedged] [--backend regex]
+        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+CHUNK_SIZE = 16384
+
+
+# ----------------------------------------------------------------------------
+# Fixture server
+# ----------------------------------------------------------------------------
+
+def load_corpus(corpus_dir: str) -> Dict[str, bytes]:
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.html'))):
+        with open(path, 'rb') as page:
+            corpus[os.path.splitext(os.path.basename(path))[0]] = page.read()
+    if not corpus:
+        raise SystemExit(f"No .html files found in {corpus_dir}")
+    return corpus
+
+
+def build_fixture_app(corpus: Dict[str, bytes], settings: Dict[str, Any]) -> web.Application:
+    """
+    /page/{name}/{n}  - a corpus page, subject to latency, bandwidth and failure injection
+    /scrape?url=...   - fake Cloud Run endpoint returning {'status': 'success', 'content': html}
+    """
+    rng = random.Random(settings['seed'])
+
+    async def inject_latency(latency: float) -> None:
+        delay = latency + rng.uniform(0, settings['jitter'])
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def page_handler(request):
+        body = corpus.get(request.match_info['name'])
+        if body is None:
+            return web.Response(status=404)
+        await inject_latency(settings['latency'])
+        if rng.random() < settings['failure_rate']:
+            return web.Response(status=503, text="injected failure")
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+        response.content_length = len(body)
+        await response.prepare(request)
+        bandwidth = settings['bandwidth']
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk = body[start:start + CHUNK_SIZE]
+            await response.write(chunk)
+            if bandwidth:
+                await asyncio.sleep(len(chunk) / bandwidth)
+        await response.write_eof()
+        return response
+
+    async def cloud_run_handler(request):
+        await inject_latency(settings['cloud_run_latency'])
+        if rng.random() < settings['cloud_run_failure_rate']:
+            return web.json_response({'status': 'error', 'error': 'injected failure'})
+        name = request.query.get('url', '').rstrip('/').split('/page/')[-1].split('/')[0]
+        body = corpus.get(name)
+        if body is None:
+            return web.json_response({'status': 'error', 'error': 'unknown page'})
+        return web.json_response({'status': 'success', 'content': body.decode('utf-8')})
+
+    app = web.Application()
+    app.router.add_get('/page/{name}/{n}', page_handler)
+    app.router.add_get('/scrape', cloud_run_handler)
+    return app
+
+
+async def _serve(corpus_dir: str, settings: Dict[str, Any], port_queue, stop_event) -> None:
+    runner = web.AppRunner(build_fixture_app(load_corpus(corpus_dir), settings), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', settings.get('port', 0))
+    await site.start()
+    port_queue.put(site._server.sockets[0].getsockname()[1])
+    while not stop_event.is_set():
+        await asyncio.sleep(0.1)
+    await runner.cleanup()
+
+
+def _serve_process(corpus_dir, settings, port_queue, stop_event) -> None:
+    asyncio.run(_serve(corpus_dir, settings, port_queue, stop_event))
+
+
+class FixtureServer:
+    """Runs the fixture server in a child process."""
+
+    def __init__(self, corpus_dir: str, settings: Dict[str, Any]):
+        context = multiprocessing.get_context('spawn')
+        self._port_queue = context.Queue()
+        self._stop_event = context.Event()
+        self._process = context.Process(target=_serve_process, daemon=True,
+                                        args=(corpus_dir, settings, self._port_queue, self._stop_event))
+        self.port = None
+
+    def __enter__(self) -> 'FixtureServer':
+        self._process.start()
+        self.port = self._port_queue.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop_event.set()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+# ----------------------------------------------------------------------------
+# Instrumented scraper
+# ----------------------------------------------------------------------------
+
+class StageCPU:
+    """Thread CPU seconds per stage, accumulated from several threads."""
+
+    def __init__(self):
+        self.seconds = {'fetch': 0.0, 'parse': 0.0, 'nlp': 0.0}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[stage] += seconds
+
+
+class TimedPipeline:
+    """Wraps an NLP pipeline and charges the thread CPU of each pipe() run to the 'nlp' stage."""
+
+    def __init__(self, nlp, stage_cpu: StageCPU):
+        self._nlp = nlp
+        self._stage_cpu = stage_cpu
+
+    def pipe(self, texts, **kwargs):
+        # normalize_text consumes the generator in the same thread, so this covers the whole stage
+        start = time.thread_time()
+        try:
+            yield from self._nlp.pipe(texts, **kwargs)
+        finally:
+            self._stage_cpu.add('nlp', time.thread_time() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._nlp, name)
+
+
+def make_scraper(args, port: int, stage_cpu: StageCPU, session_manager, limiters):
+    from modules.web_scraper import WebScraper
+
+    class InstrumentedScraper(WebScraper):
+        def get_nlp(self, backend=None):
+            return TimedPipeline(super().get_nlp(backend), stage_cpu)
+
+        def _parse_document(self, html_content):
+            start = time.thread_time()
+            try:
+                return super()._parse_document(html_content)
+            finally:
+                stage_cpu.add('parse', time.thread_time() - start)
+
+    return InstrumentedScraper({
+        'timeout': args.timeout,
+        'retry_attempts': args.retry_attempts,
+        'retry_delay': 1,
+        'fetch_mode': args.fetch_mode,
+        'hedge_delay': args.hedge_delay,
+        'nlp_backend': args.backend,
+        'extraction_engine': args.engine,
+        # A different host name than the pages, so each backend gets its own host limiter
+        'cloud_run_url': f"http://localhost:{port}/scrape",
+    }, session_manager=session_manager, limiters=limiters)
+
+
+# ----------------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+async def run_level(args, port: int, page_names: List[str], concurrency: int) -> Dict[str, Any]:
+    from modules.http_session import HttpSessionManager
+    from modules.rate_limiting import HostLimiterRegistry
+
+    stage_cpu = StageCPU()
+    session_manager = HttpSessionManager(limit=max(concurrency * 2, 10), limit_per_host=max(concurrency * 2, 10))
+    # The benchmark measures the scraper, not the politeness limits, unless asked to
+    limiters = HostLimiterRegistry(max_in_flight=args.host_max_in_flight or concurrency * 2,
+                                   rate=args.host_rate, burst=max(args.host_rate, concurrency))
+    scraper = make_scraper(args, port, stage_cpu, session_manager, limiters)
+    await session_manager.start()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def scrape(index: int) -> None:
+        nonlocal failures
+        url = f"http://127.0.0.1:{port}/page/{page_names[index % len(page_names)]}/{index}"
+        async with semaphore:
+            start = time.perf_counter()
+            result = await scraper.scrape_article(url=url)
+            elapsed = time.perf_counter() - start
+        if result and result.get('content'):
+            latencies.append(elapsed)
+        else:
+            failures += 1
+
+    loop_cpu_start = time.thread_time()
+    process_cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[scrape(index) for index in range(args.pages)])
+    wall = time.perf_counter() - wall_start
+    stage_cpu.add('fetch', time.thread_time() - loop_cpu_start)
+    process_cpu = time.process_time() - process_cpu_start
+
+    connection_stats = session_manager.stats()
+    await session_manager.close()
+
+    latencies.sort()
+    succeeded = len(latencies)
+    return {
+        'concurrency': concurrency,
+        'pages': args.pages,
+        'succeeded': succeeded,
+        'failed': failures,
+        'wall_seconds': round(wall, 3),
+        'pages_per_sec': round(succeeded / wall, 2) if wall else 0.0,
+        'latency_seconds': {
+            'p50': round(percentile(latencies, 0.50), 4),
+            'p95': round(percentile(latencies, 0.95), 4),
+            'p99': round(percentile(latencies, 0.99), 4),
+            'max': round(latencies[-1], 4) if latencies else 0.0,
+            'mean': round(statistics.mean(latencies), 4) if latencies else 0.0,
+        },
+        'cpu_seconds': {
+            **{stage: round(seconds, 3) for stage, seconds in stage_cpu.seconds.items()},
+            'process': round(process_cpu, 3),
+        },
+        'cpu_ms_per_page': {stage: round(1000 * seconds / max(succeeded, 1), 2)
+                            for stage, seconds in stage_cpu.seconds.items()},
+        'connections': connection_stats,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def print_level(result: Dict[str, Any]) -> None:
+    latency = result['latency_seconds']
+    cpu = result['cpu_ms_per_page']
+    print(f"{result['concurrency']:>6} {result['succeeded']:>5}/{result['pages']:<5} "
+          f"{result['pages_per_sec']:>9.1f} {latency['p50'] * 1000:>8.1f} {latency['p95'] * 1000:>8.1f} "
+          f"{latency['p99'] * 1000:>8.1f} {cpu['fetch']:>8.2f} {cpu['parse']:>8.2f} {cpu['nlp']:>8.2f} "
+          f"{result['peak_rss_mb']:>8.1f}")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print the change in throughput and tail latency against a previous JSON report."""
+    with open(baseline_path) as baseline_file:
+        baseline = {level['concurrency']: level for level in json.load(baseline_file)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'conc':>6} {'pages/s':>16} {'p95 ms':>18}")
+    for result in results:
+        previous = baseline.get(result['concurrency'])
+        if previous is None:
+            continue
+        def change(new, old):
+            return f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+        print(f"{result['concurrency']:>6} "
+              f"{result['pages_per_sec']:>8.1f} {change(result['pages_per_sec'], previous['pages_per_sec']):>7} "
+              f"{result['latency_seconds']['p95'] * 1000:>9.1f} "
+              f"{change(result['latency_seconds']['p95'], previous['latency_seconds']['p95']):>8}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--pages', type=int, default=200, help='Pages scraped per concurrency level')
+    arg_parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated concurrency levels')
+    arg_parser.add_argument('--corpus', default=FIXTURES_DIR, help='Directory of recorded .html pages')
+    arg_parser.add_argument('--latency', type=float, default=0.05, help='Page time to first byte (s)')
+    arg_parser.add_argument('--jitter', type=float, default=0.02, help='Random extra latency, up to (s)')
+    arg_parser.add_argument('--bandwidth', type=float, default=0, help='Per-response bytes/s (0 = unlimited)')
+    arg_parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of page requests answered 503')
+    arg_parser.add_argument('--cloud-run-latency', type=float, default=0.5, help='Fake Cloud Run latency (s)')
+    arg_parser.add_argument('--cloud-run-failure-rate', type=float, default=0.0)
+    arg_parser.add_argument('--fetch-mode', default='hedged', choices=['sequential', 'hedged'])
+    arg_parser.add_argument('--hedge-delay', type=float, default=0.5)
+    arg_parser.add_argument('--timeout', type=float, default=15)
+    arg_parser.add_argument('--retry-attempts', type=int, default=2)
+    arg_parser.add_argument('--backend', default='regex', choices=['full', 'senter', 'sentencizer', 'regex'],
+                            help='Sentence segmentation backend')
+    arg_parser.add_argument('--engine', default='density', choices=['density', 'trafilatura', 'none'],
+                            help='Boilerplate extraction engine')
+    arg_parser.add_argument('--host-rate', type=float, default=1000.0, help='Per-host requests/s limit')
+    arg_parser.add_argument('--host-max-in-flight', type=int, default=0,
+                            help='Per-host in-flight limit (0 = twice the concurrency)')
+    arg_parser.add_argument('--seed', type=int, default=1)
+    arg_parser.add_argument('--output', help='Write the JSON report to this file')
+    arg_parser.add_argument('--compare', help='Previous JSON report to compare against')
+    args = arg_parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    settings = {
+        'latency': args.latency, 'jitter': args.jitter, 'bandwidth': args.bandwidth,
+        'failure_rate': args.failure_rate, 'cloud_run_latency': args.cloud_run_latency,
+        'cloud_run_failure_rate': args.cloud_run_failure_rate, 'seed': args.seed,
+    }
+    page_names = sorted(load_corpus(args.corpus))
+
+    # Keep the scraper's per-request logging (and expected retry warnings) out of the measurement
+    import logging
+    logging.disable(logging.WARNING)
+
+    results = []
+    with FixtureServer(args.corpus, settings) as server:
+        print(f"Fixture server on port {server.port} serving {len(page_names)} pages; "
+              f"fetch mode {args.fetch_mode}, backend {args.backend}, engine {args.engine}\n")
+        print(f"{'conc':>6} {'ok/pages':>11} {'pages/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'fetch':>8} {'parse':>8} {'nlp':>8} {'rss MB':>8}   (CPU ms/page)")
+        for concurrency in levels:
+            result = asyncio.run(run_level(args, server.port, page_names, concurrency))
+            results.append(result)
+            print_level(result)
+
+    report = {
+        'benchmark': 'scraper',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpu_count': os.cpu_count()},
+        'settings': {**settings, 'pages': args.pages, 'fetch_mode': args.fetch_mode,
+                     'hedge_delay': args.hedge_delay, 'backend': args.backend, 'engine': args.engine,
+                     'corpus': sorted(page_names)},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f"\nReport written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# helper scripts/profile_imports.py
+
+"""
+Import-time profile of the application startup path.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and summarises the report:
+total import time, the slowest modules by cumulative and by self time, time per top-level package,
+and whether the heavy modules that should be imported lazily were pulled in at startup.
+
+Usage:
+    python "helper scripts/profile_imports.py" [--module main_app] [--top 20] [--json report.json]
+
+Startup work that runs on import (NLP model preload, NLP worker processes, Vertex AI setup) is disabled in the
+profiled interpreter, so the report covers import cost only.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported just to start the application
+LAZY_MODULES = [
+    'spacy',
+    'vertexai',
+    'google.cloud.texttospeech',
+    'pydub',
+    'google.cloud.logging',
+    'google.cloud.firestore',
+    'google.cloud.storage',
+    'modules.text_to_speech_service',
+]
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def run_importtime(module):
+    """Import the module in a fresh interpreter; return the importtime lines and the loaded lazy modules."""
+    code = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))"
+    )
+    env = {**os.environ, 'NLP_WORKERS': '0', 'NLP_BACKEND': 'regex', 'LLM_PRELOAD': 'false'}
+    env.pop('GAE_ENV', None)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    loaded_lazy = json.loads(result.stdout.strip().splitlines()[-1])
+    return result.stderr.splitlines(), loaded_lazy
+
+
+def parse_importtime(lines):
+    """Parse importtime lines into (module, self_us, cumulative_us, depth) records."""
+    records = []
+    for line in lines:
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append({'module': name, 'self_us': int(self_us), 'cumulative_us': int(cumulative_us),
+                            'depth': len(indent) // 2})
+    return records
+
+
+def summarise(records, module, top):
+    by_package = defaultdict(int)
+    for record in records:
+        by_package[record['module'].split('.')[0]] += record['self_us']
+    target = next((record for record in records if record['module'] == module), None)
+    return {
+        'module': module,
+        'total_ms': round((target['cumulative_us'] if target else sum(r['self_us'] for r in records)) / 1000, 1),
+        'modules_imported': len(records),
+        'slowest_cumulative': sorted(records, key=lambda r: r['cumulative_us'], reverse=True)[:top],
+        'slowest_self': sorted(records, key=lambda r: r['self_us'], reverse=True)[:top],
+        'packages': sorted(({'package': name, 'self_ms': round(us / 1000, 1)} for name, us in by_package.items()),
+                           key=lambda p: p['self_ms'], reverse=True)[:top],
+    }
+
+
+def print_report(report, loaded_lazy):
+    print(f"Import of {report['module']}: {report['total_ms']:.1f} ms, {report['modules_imported']} modules\n")
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for record in report['slowest_cumulative']:
+        print(f"{record['cumulative_us'] / 1000:>14.1f} {record['self_us'] / 1000:>9.1f}  {record['module']}")
+
+    print(f"\n{'self ms':>9}  package (sum of module self time)")
+    for package in report['packages']:
+        print(f"{package['self_ms']:>9.1f}  {package['package']}")
+
+    print("\nLazy modules imported at startup:", ', '.join(loaded_lazy) if loaded_lazy else 'none')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--module', default='main_app', help='Module to import (default: main_app)')
+    arg_parser.add_argument('--top', type=int, default=20, help='Rows per table')
+    arg_parser.add_argument('--json', help='Also write the report to this JSON file')
+    args = arg_parser.parse_args()
+
+    lines, loaded_lazy = run_importtime(args.module)
+    report = summarise(parse_importtime(lines), args.module, args.top)
+    report['lazy_modules_loaded'] = loaded_lazy
+    print_report(report, loaded_lazy)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nReport written to {args.json}")
+
+    # Non-zero exit so the script can guard against regressions
+    return 1 if loaded_lazy else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,32 +10,113 @@ application's functionality.
 """
 from quart import Quart, render_template, request, jsonify, g, redirect, send_file
 import asyncio
-from modules.config import MODEL_NAME_FLASH, ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT
-from modules.web_scraper import WebScraper
-from modules.google_api_interface import ContentGenerator
+from modules.web_scraper import CLOUD_RUN_URL
+from modules.rate_limiting import host_limiters
+from modules.http_session import session_manager
+from modules.nlp_worker_pool import nlp_worker_pool
+from modules.nlp_registry import nlp_registry
+from modules.lazy_imports import lazy_import, import_stats
+from modules.article_pipeline import (
+    url_index,
+    fingerprint_index,
+    llm_response_cache,
+    content_generators,
+    fetch_html,
+    extract_article,
+    find_existing_article,
+    generate_article_text,
+    save_generated_article
+)
+from modules.batch_processor import BatchProcessor, generate_job_id
+from modules.google_api_interface import LLM_PRELOAD, LLM_WARMUP_REQUEST
+from modules.quota_governor import QuotaExceededError, quota_governor
+from modules.llm_metrics import job_llm_metrics, llm_metrics
 from modules.common_logger import setup_logger,logger, job_context, set_job_context, clear_job_context, truncate_text
-from modules.text_to_speech_service import text_to_speech
 from modules.db_manager import (
     get_all_articles, 
     get_article_by_id,
-    save_article,
     update_article_by_id,
     delete_article_by_id,
     get_audio_file_by_article_id,
     get_articles_with_audio_status as db_get_articles_with_audio_status
 )
 import io
-import datetime, random, string
+import atexit
+from urllib.parse import urlparse
 from a2wsgi import ASGIMiddleware
 
 # Initialize the logger for the application
 logger = setup_logger("main_app")
 
+# The Cloud Run scraping service is ours and takes far more load than a single origin site
+host_limiters.configure(urlparse(CLOUD_RUN_URL).hostname, max_in_flight=10, rate=10.0, burst=10.0)
+
+# Runs /process_batch submissions through the same pipeline stages as /process
+batch_processor = BatchProcessor(
+    fetch=fetch_html,
+    extract=lambda url, html_content: extract_article(url=url, html_content=html_content),
+    generate=generate_article_text,
+    save=save_generated_article,
+    find_existing=find_existing_article
+)
+
 # Initialize the Flask application
 app = Quart(__name__)
 # Create a WSGI application
 wsgi_app = ASGIMiddleware(app)
 
+async def startup():
+    """
+    Create process-wide resources shared by all requests.
+    """
+    await session_manager.start()
+    await nlp_worker_pool.start()
+    if not nlp_worker_pool.running:
+        # Text is segmented in this process, so load the model now rather than on the first request
+        await nlp_registry.warmup()
+    if LLM_PRELOAD:
+        # Vertex AI setup happens once here instead of on the first /process request
+        await content_generators.warmup(send_request=LLM_WARMUP_REQUEST)
+
+
+async def shutdown():
+    """
+    Release process-wide resources.
+    """
+    await session_manager.close()
+    await asyncio.to_thread(nlp_worker_pool.shutdown)
+
+
+@app.before_serving
+async def before_serving():
+    await startup()
+
+
+@app.after_serving
+async def after_serving():
+    await shutdown()
+
+
+def _log_startup_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Application startup failed: {future.exception()}", exc_info=future.exception())
+
+
+def _close_wsgi_loop_resources():
+    try:
+        asyncio.run_coroutine_threadsafe(shutdown(), wsgi_app.loop).result(timeout=10)
+    except Exception as e:
+        logger.warning(f"Error during shutdown: {e}")
+
+
+# gunicorn serves the app through a2wsgi, which does not send ASGI lifespan events,
+# so run startup/shutdown on its event loop directly.
+if __name__ != '__main__':
+    startup_future = asyncio.run_coroutine_threadsafe(startup(), wsgi_app.loop)
+    startup_future.add_done_callback(_log_startup_failure)
+    atexit.register(_close_wsgi_loop_resources)
+
+
 @app.after_request
 def add_header(response):
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
@@ -95,7 +176,9 @@ async def tts_article(article_id):
                 logger.error(f"Article with ID {article_id} not found.")
                 return jsonify({'error': 'Article not found'}), 404
 
-            # Convert the text to speech using the article ID
+            # Convert the text to speech using the article ID. The TTS stack (Cloud Text-to-Speech,
+            # pydub) is imported on the first conversion, not at startup.
+            text_to_speech = lazy_import('modules.text_to_speech_service').text_to_speech
             conversion_success = await text_to_speech(article_id)
             
             if not conversion_success:
@@ -116,10 +199,10 @@ async def process():
     try:
         data = await request.get_json()
 
-        job_id = datetime.datetime.now().strftime('%Y%m%d%H%M%S') + ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+        job_id = generate_job_id()
 
-        with job_context(job_id):
-            
+        # The job's language model calls are summarized in its log when it finishes
+        with job_context(job_id), job_llm_metrics():
 
             if data is None:
                 logger.warning("No JSON data received in request")
@@ -127,25 +210,24 @@ async def process():
 
             url = data.get('url')
             html_content = data.get('html_content')
+            force_refresh = bool(data.get('force_refresh'))
 
             if not url and not html_content:
                 logger.warning("Neither URL nor HTML content provided")
                 return jsonify({'error': 'URL or HTML content is required'}), 400
 
-            scraper = WebScraper({
-                'timeout': 15,
-                'retry_attempts': 2,
-                'retry_delay': 1,
-                'headless': True
-            })
+            if url and not force_refresh:
+                existing_id = await find_existing_article(url)
+                if existing_id:
+                    return jsonify({'success': True, 'article_id': existing_id, 'duplicate': True})
 
             if html_content:
                 logger.info(f"Starting processing for raw data:\n{truncate_text(html_content)}")
-                article_data = await scraper.scrape_article(raw_content=html_content)
+                article_data = await extract_article(url=url, html_content=html_content)
                 source_type = 'html'
             else:
                 logger.info(f"Starting processing for URL: {data['url']}")
-                article_data = await scraper.scrape_article(url=url)
+                article_data = await extract_article(url=url)
                 source_type = 'url'
 
             if article_data is None:
@@ -156,43 +238,71 @@ async def process():
                 logger.error("Failed to extract content")
                 return jsonify({'error': 'Failed to extract content'}), 400
 
-            content_generator = ContentGenerator()
-
-            full_prompt = ARTICLE_CLEAN_PROMPT.format(article_text=article_data.get('content'))        
-            llm_response = await content_generator.generate_content(
-                user_prompt=full_prompt
-            )
+            # The page may declare a canonical URL that was ingested under a different address,
+            # or be a syndicated copy of an article already stored
+            if not force_refresh:
+                existing_id = await find_existing_article(url, article_data)
+                if existing_id:
+                    return jsonify({'success': True, 'article_id': existing_id, 'duplicate': True})
 
-            full_prompt = ARTICLE_IMPROVE_READABILITY_PROMPT.format(article_text=llm_response)        
-            llm_response = await content_generator.generate_content(
-                user_prompt=full_prompt
-            )
-        
+            llm_response = await generate_article_text(article_data.get('content'))
 
             if llm_response is None:
                 logger.error("Language model response is None")
                 return jsonify({'error': 'Failed to generate content'}), 500
 
-            if await save_article(
-                url=url,
-                content=llm_response,
-                title=article_data.get('title', ''),
-                author=article_data.get('author', ''),
-                date=article_data.get('date', ''),
-                description=article_data.get('description', ''),
-                source_type=source_type
-            ):
+            article_id = await save_generated_article(article_data, llm_response, source_type=source_type)
+            if article_id:
                 logger.info("Article saved successfully")
-                return jsonify({'success': True})
+                return jsonify({'success': True, 'article_id': article_id})
             
             logger.error("Failed to save the article to the database")
             return jsonify({'error': 'Failed to save article'}), 500
         
 
+    except QuotaExceededError as e:
+        logger.warning(f"Language model quota exhausted: {e}")
+        return jsonify({'error': 'The language model is busy, please try again shortly'}), 429
     except Exception as e:
         logger.exception("An unexpected error occurred during processing")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/process_batch', methods=['POST'])
+async def process_batch():
+    """
+    Queue a list of URLs for processing. Returns the batch ID immediately;
+    progress is available from /batch_status/<batch_id>.
+    """
+    try:
+        data = await request.get_json()
+        urls = data.get('urls') if data else None
+        if not isinstance(urls, list):
+            logger.warning("No URL list received in batch request")
+            return jsonify({'error': 'A list of URLs is required'}), 400
+
+        try:
+            batch = batch_processor.submit(urls, force_refresh=bool(data.get('force_refresh')))
+        except ValueError as e:
+            logger.warning(f"Rejected batch request: {e}")
+            return jsonify({'error': str(e)}), 400
+
+        app.add_background_task(batch_processor.run, batch)
+        return jsonify(batch.to_dict()), 202
+
+    except Exception as e:
+        logger.exception("An unexpected error occurred while submitting a batch")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/batch_status/<batch_id>')
+async def batch_status(batch_id):
+    """
+    Return the status of a submitted batch and each of its URLs.
+    """
+    batch = batch_processor.get(batch_id)
+    if batch is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    return jsonify(batch.to_dict())
+
 @app.route('/update_article/<article_id>', methods=['PUT'])
 async def update_article(article_id):
     """
@@ -238,6 +348,8 @@ async def delete_article(article_id):
     with job_context(article_id): 
         try:
             if await delete_article_by_id(article_id):
+                url_index.forget_article(article_id)
+                fingerprint_index.remove(article_id)
                 logger.info(f"Article with ID {article_id} deleted successfully")
                 return jsonify({'success': True})
             logger.error(f"Article with ID {article_id} not found for deletion")
@@ -269,6 +381,26 @@ async def get_articles_with_audio_status_route():
         logger.error(f"Error retrieving articles with audio status: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics')
+async def metrics():
+    """
+    Return in-process performance counters.
+    """
+    return jsonify({
+        'http_session': session_manager.stats(),
+        'nlp_worker_pool': nlp_worker_pool.stats(),
+        'nlp_registry': nlp_registry.stats(),
+        'lazy_imports': import_stats(),
+        'host_limiters': host_limiters.stats(),
+        'batch_processor': batch_processor.stats(),
+        'url_index': url_index.stats(),
+        'fingerprint_index': fingerprint_index.stats(),
+        'llm_cache': llm_response_cache.stats(),
+        'content_generators': content_generators.stats(),
+        'quota_governor': quota_governor.stats(),
+        'llm_calls': llm_metrics.stats()
+    })
+
 @app.route('/audio_player/<article_id>')
 async def audio_player(article_id):
     """
@@ -0,0 +1,191 @@
+# modules/article_pipeline.py
+
+"""
+Article Pipeline
+This module holds the stages an article goes through between submission and storage, so they can
+be shared by the single-article /process route and the batch processor:
+- fetch_html: download the page (local + Cloud Run backends).
+- extract_article: parse, extract metadata and main text, normalize sentences.
+- generate_article_text: the clean and readability language model passes (the clean pass chunked for
+  articles longer than the output token limit, and optionally pipelined so the readability pass starts while the clean pass is still streaming).
+  Depending on TTS_NORMALIZATION_MODE the readability pass is kept, preceded by or replaced with the
+  local rule-based normalizer.
+- save_generated_article: persist the result and index its URLs.
+- find_existing_article: look a URL up in the canonical URL index before doing any of the above,
+  and the extracted text up in the near-duplicate fingerprint index before the language model runs.
+Language model responses are cached by prompt, so repeating generate_article_text is free.
+"""
+
+from typing import Any, Dict, Optional
+
+from modules.chunked_generation import LLM_CHUNKING_ENABLED, LLM_CHUNK_TOKENS, estimate_tokens, generate_chunked
+from modules.common_logger import setup_logger
+from modules.config import ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT
+from modules.db_manager import (
+    save_article,
+    get_url_index_entry,
+    save_url_index_entry,
+    find_articles_by_fingerprint_bands,
+    get_llm_cache_entry,
+    save_llm_cache_entry
+)
+from modules.fingerprint import MIN_FINGERPRINT_SHINGLES, FingerprintIndex, shingle_count
+from modules.google_api_interface import ContentGeneratorRegistry
+from modules.http_session import session_manager
+from modules.llm_cache import LLMResponseCache
+from modules.nlp_worker_pool import nlp_worker_pool
+from modules.pipelined_generation import LLM_PIPELINING_ENABLED, pipelined_passes
+from modules.quota_governor import quota_governor
+from modules.tts_normalizer import TTS_NORMALIZATION_MODE, normalize_for_tts
+from modules.url_index import UrlIndex, canonicalize_url
+from modules.web_scraper import WebScraper
+
+logger = setup_logger("article_pipeline")
+
+SCRAPER_CONFIG = {
+    'timeout': 15,
+    'retry_attempts': 2,
+    'retry_delay': 1,
+    'headless': True,
+    'fetch_mode': 'hedged',
+    'hedge_delay': 0.5
+}
+
+# Canonical URL -> article ID, backed by the Firestore 'url_index' collection
+url_index = UrlIndex(lookup=get_url_index_entry, store=save_url_index_entry)
+
+# Content SimHash -> article ID, backed by the 'fingerprint_bands' field of stored articles
+fingerprint_index = FingerprintIndex(lookup=find_articles_by_fingerprint_bands)
+
+# Prompt hash -> generated text, backed by the Firestore 'llm_cache' collection
+llm_response_cache = LLMResponseCache(lookup=get_llm_cache_entry, store=save_llm_cache_entry)
+
+# One content generator per model for the whole process, sharing the response cache and the quota
+content_generators = ContentGeneratorRegistry(cache=llm_response_cache, governor=quota_governor)
+
+
+def create_scraper() -> WebScraper:
+    """Create a scraper that uses the process-wide HTTP session and NLP worker pool."""
+    return WebScraper(SCRAPER_CONFIG, session_manager=session_manager, nlp_pool=nlp_worker_pool)
+
+
+async def fetch_html(url: str) -> Optional[str]:
+    """Fetch the HTML of a page."""
+    return await create_scraper().fetch_webpage(url)
+
+
+async def extract_article(url: Optional[str] = None, html_content: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Extract metadata and normalized text from already fetched HTML, or fetch the URL first."""
+    return await create_scraper().scrape_article(url=url, raw_content=html_content)
+
+
+async def find_existing_article(url: Optional[str], article_data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Return the ID of an article already ingested from this URL or, once the page has been
+    extracted, from the canonical URL it declares or as a near-duplicate of its text.
+    A near-duplicate's URLs are indexed so the next submission is answered without fetching.
+    Callers look the URL up before extraction, so with article_data only the newly learned
+    canonical URL is looked up.
+    """
+    canonical_url = article_data.get('canonical_url') if article_data else None
+    if article_data is None:
+        article_id = await url_index.find(url)
+    else:
+        declared_url = canonicalize_url(canonical_url, base=url)
+        article_id = await url_index.find(declared_url) \
+            if declared_url and declared_url != canonicalize_url(url) else None
+    if article_id:
+        logger.info(f"Article for {url or canonical_url} already ingested as {article_id}")
+        return article_id
+
+    fingerprint = article_data.get('fingerprint') if article_data else None
+    # Short texts match too easily to be treated as the same article
+    if fingerprint is None or shingle_count(article_data.get('content')) < MIN_FINGERPRINT_SHINGLES:
+        return None
+    match = await fingerprint_index.find(fingerprint)
+    if match is None:
+        return None
+    logger.info(f"Content of {url or 'submitted HTML'} is a near-duplicate of article {match.article_id} "
+                f"(Hamming distance {match.distance})")
+    # A match served from memory may point at an article deleted by another process since; only
+    # one the store confirmed is written to the persistent URL index
+    await url_index.add([url, canonicalize_url(canonical_url, base=url)], match.article_id,
+                        persist=match.confirmed)
+    return match.article_id
+
+
+async def generate_article_text(content: str, tts_mode: str = TTS_NORMALIZATION_MODE) -> Optional[str]:
+    """
+    Run the clean and readability passes over the extracted article text.
+
+    :param content: Extracted article text.
+    :param tts_mode: 'llm' (readability prompt only), 'local' (rule-based normalizer instead of the
+                     readability prompt) or 'hybrid' (normalizer, then the readability prompt).
+    :return: The text ready for storage and text-to-speech.
+    """
+    # Cached, so a retry after a later stage failed does not call the model again
+    content_generator = content_generators.get()
+
+    async def improve_readability(text: str) -> str:
+        if tts_mode == 'local':
+            return normalize_for_tts(text)
+        if tts_mode == 'hybrid':
+            # The model gets text whose numbers, dates and symbols are already spelled out
+            text = normalize_for_tts(text)
+        return await content_generator.generate_content(
+            user_prompt=ARTICLE_IMPROVE_READABILITY_PROMPT.format(article_text=text)
+        )
+
+    async def run_passes(text: str) -> str:
+        if LLM_PIPELINING_ENABLED and tts_mode != 'local':
+            # The readability pass starts on the first paragraphs while the clean pass is still streaming
+            return await pipelined_passes(
+                content_generator.generate_content_stream(ARTICLE_CLEAN_PROMPT.format(article_text=text)),
+                improve_readability
+            )
+
+        llm_response = await content_generator.generate_content(
+            user_prompt=ARTICLE_CLEAN_PROMPT.format(article_text=text)
+        )
+        return await improve_readability(llm_response)
+
+    # Long articles would be truncated at the output token limit; clean them window by window. Only
+    # the clean pass is chunked: its output stays close to the source, so the paragraphs repeated
+    # across each cut are still recognised and dropped before the readability pass rewrites them.
+    if LLM_CHUNKING_ENABLED and estimate_tokens(content) > LLM_CHUNK_TOKENS:
+        cleaned = await generate_chunked(
+            content_generator.generate_content, content, [ARTICLE_CLEAN_PROMPT], max_tokens=LLM_CHUNK_TOKENS
+        )
+        if estimate_tokens(cleaned) <= LLM_CHUNK_TOKENS:
+            return await improve_readability(cleaned)
+        # Still too long for one response: windows without overlap, so there are no seams to repeat
+        return await generate_chunked(
+            content_generator.generate_content, cleaned, [], max_tokens=LLM_CHUNK_TOKENS, overlap=0,
+            run_window=improve_readability
+        )
+    return await run_passes(content)
+
+
+async def save_generated_article(article_data: Dict[str, Any], content: str, source_type: str = 'url'):
+    """
+    Save the generated article text with the scraped metadata and index its URLs.
+
+    :return: The new article ID, or False if the article could not be saved.
+    """
+    article_id = await save_article(
+        url=article_data.get('url'),
+        content=content,
+        title=article_data.get('title', ''),
+        author=article_data.get('author', ''),
+        date=article_data.get('date', ''),
+        description=article_data.get('description', ''),
+        source_type=source_type,
+        fingerprint=article_data.get('fingerprint')
+    )
+    if article_id:
+        if article_data.get('fingerprint') is not None:
+            fingerprint_index.add(article_id, article_data['fingerprint'])
+        url = article_data.get('url')
+        canonical_url = article_data.get('canonical_url')
+        await url_index.add([url, canonicalize_url(canonical_url, base=url)], article_id)
+    return article_id
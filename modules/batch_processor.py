@@ -0,0 +1,277 @@
+# modules/batch_processor.py
+
+"""
+Batch Processor
+This module runs many article URLs through the ingestion pipeline with bounded concurrency.
+Submitted URLs are deduplicated by canonical URL and already ingested articles are skipped. Each
+stage (fetch, NLP extraction, language model, save) has its own concurrency limit so a slow stage
+does not starve the others. Batches and per-item status are kept in memory and can be polled by
+batch ID.
+"""
+
+import asyncio
+import datetime
+import os
+import random
+import string
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from modules.common_logger import setup_logger, job_context
+from modules.llm_metrics import job_llm_metrics
+from modules.quota_governor import BATCH, priority_context
+from modules.url_index import canonicalize_url
+
+logger = setup_logger("batch_processor")
+
+BATCH_FETCH_CONCURRENCY = int(os.getenv('BATCH_FETCH_CONCURRENCY', '8'))
+BATCH_NLP_CONCURRENCY = int(os.getenv('BATCH_NLP_CONCURRENCY', '4'))
+BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', '4'))
+BATCH_MAX_URLS = int(os.getenv('BATCH_MAX_URLS', '500'))
+
+# Item states, in pipeline order
+QUEUED = 'queued'
+FETCHING = 'fetching'
+EXTRACTING = 'extracting'
+GENERATING = 'generating'
+SAVING = 'saving'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def generate_job_id() -> str:
+    """Timestamp plus a random suffix, the format used for /process job IDs."""
+    return datetime.datetime.now().strftime('%Y%m%d%H%M%S') + ''.join(
+        random.choices(string.ascii_uppercase + string.digits, k=4))
+
+
+class BatchItem:
+    """One URL in a batch and its progress through the pipeline."""
+
+    def __init__(self, url: str, job_id: str):
+        self.url = url
+        self.job_id = job_id
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.article_id: Optional[str] = None
+        self.duplicate = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def fail(self, error: str) -> None:
+        self.status = FAILED
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'job_id': self.job_id,
+            'status': self.status,
+            'error': self.error,
+            'article_id': self.article_id,
+            'duplicate': self.duplicate,
+            'duration': round(self.finished_at - self.started_at, 3)
+            if self.started_at and self.finished_at else None,
+        }
+
+
+class Batch:
+    """A submitted set of URLs."""
+
+    def __init__(self, batch_id: str, urls: List[str], duplicates: int, force_refresh: bool = False,
+                 invalid: int = 0):
+        self.batch_id = batch_id
+        self.items = [BatchItem(url, f"{batch_id}-{index}") for index, url in enumerate(urls)]
+        self.duplicates = duplicates
+        self.invalid = invalid
+        self.force_refresh = force_refresh
+        self.created_at = time.time()
+
+    @property
+    def finished(self) -> bool:
+        return all(item.status in (DONE, FAILED) for item in self.items)
+
+    def to_dict(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {
+            'batch_id': self.batch_id,
+            'total': len(self.items),
+            'duplicates_removed': self.duplicates,
+            'invalid_removed': self.invalid,
+            'force_refresh': self.force_refresh,
+            'finished': self.finished,
+            'counts': counts,
+            'items': [item.to_dict() for item in self.items],
+        }
+
+
+class BatchProcessor:
+    """
+    Runs batches through the pipeline stages. The stages are passed in as coroutine functions:
+        fetch(url) -> Optional[str]                         HTML
+        extract(url, html) -> Optional[dict]               article data with 'content'
+        generate(content) -> Optional[str]                 generated text
+        save(article_data, text) -> article ID or bool    stored article
+    and optionally
+        find_existing(url, article_data) -> Optional[str] ID of an article already ingested
+    """
+
+    def __init__(self,
+                 fetch: Callable[[str], Awaitable[Optional[str]]],
+                 extract: Callable[[str, str], Awaitable[Optional[Dict[str, Any]]]],
+                 generate: Callable[[str], Awaitable[Optional[str]]],
+                 save: Callable[[Dict[str, Any], str], Awaitable[Any]],
+                 find_existing: Optional[Callable[[str, Optional[Dict[str, Any]]], Awaitable[Optional[str]]]] = None,
+                 fetch_concurrency: int = BATCH_FETCH_CONCURRENCY,
+                 nlp_concurrency: int = BATCH_NLP_CONCURRENCY,
+                 llm_concurrency: int = BATCH_LLM_CONCURRENCY,
+                 max_urls: int = BATCH_MAX_URLS,
+                 max_batches: int = 50):
+        self.fetch = fetch
+        self.extract = extract
+        self.generate = generate
+        self.save = save
+        self.find_existing = find_existing
+        self.limits = {'fetch': fetch_concurrency, 'nlp': nlp_concurrency, 'llm': llm_concurrency}
+        self.max_urls = max_urls
+        self.max_batches = max_batches
+
+        self._batches: 'OrderedDict[str, Batch]' = OrderedDict()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self, stage: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+            self._semaphore_loop = loop
+        return self._semaphores[stage]
+
+    def normalize_urls(self, urls: List[str]) -> List[str]:
+        """
+        Strip and deduplicate URLs, preserving submission order. URLs with the same canonical form
+        count as duplicates; the first spelling submitted is kept.
+        """
+        unique = OrderedDict()
+        for url in urls:
+            if isinstance(url, str) and url.strip():
+                url = url.strip()
+                unique.setdefault(canonicalize_url(url) or url, url)
+        return list(unique.values())
+
+    def submit(self, urls: List[str], force_refresh: bool = False) -> Batch:
+        """
+        Register a new batch. Raises ValueError if there are no URLs or too many.
+        The batch is not started; pass it to run().
+
+        :param urls: URLs to ingest.
+        :param force_refresh: Process URLs even if they were already ingested.
+        """
+        unique_urls = self.normalize_urls(urls)
+        # Empty and non-string entries are dropped by normalize_urls but are not duplicates
+        valid = sum(1 for url in urls if isinstance(url, str) and url.strip())
+        if not unique_urls:
+            raise ValueError("At least one URL is required")
+        if len(unique_urls) > self.max_urls:
+            raise ValueError(f"A batch may contain at most {self.max_urls} URLs")
+
+        batch = Batch(generate_job_id(), unique_urls, duplicates=valid - len(unique_urls),
+                      force_refresh=force_refresh, invalid=len(urls) - valid)
+        self._batches[batch.batch_id] = batch
+        self._evict_finished_batches()
+        logger.info(f"Batch {batch.batch_id} submitted with {len(unique_urls)} URLs "
+                    f"({batch.duplicates} duplicates and {batch.invalid} invalid entries removed)")
+        return batch
+
+    def _evict_finished_batches(self) -> None:
+        for batch_id in list(self._batches):
+            if len(self._batches) <= self.max_batches:
+                break
+            if self._batches[batch_id].finished:
+                del self._batches[batch_id]
+
+    def get(self, batch_id: str) -> Optional[Batch]:
+        return self._batches.get(batch_id)
+
+    async def run(self, batch: Batch) -> Batch:
+        """Process every item of the batch; per-item failures are recorded, not raised."""
+        start_time = time.perf_counter()
+        await asyncio.gather(*[self._process_item(item, batch.force_refresh) for item in batch.items])
+        logger.info(f"Batch {batch.batch_id} finished in {time.perf_counter() - start_time:.1f}s: "
+                    f"{batch.to_dict()['counts']}")
+        return batch
+
+    async def _skip_if_ingested(self, item: BatchItem, article_data: Optional[Dict[str, Any]] = None) -> bool:
+        if self.find_existing is None:
+            return False
+        existing_id = await self.find_existing(item.url, article_data)
+        if not existing_id:
+            return False
+        item.article_id = existing_id
+        item.duplicate = True
+        item.status = DONE
+        item.finished_at = time.time()
+        return True
+
+    async def _process_item(self, item: BatchItem, force_refresh: bool = False) -> None:
+        # Language model calls of batch items queue behind interactive /process requests
+        with job_context(item.job_id), priority_context(BATCH), job_llm_metrics():
+            item.started_at = time.time()
+            try:
+                if urlparse(item.url).scheme not in ('http', 'https'):
+                    item.fail("Invalid URL")
+                    return
+                if not force_refresh and await self._skip_if_ingested(item):
+                    return
+
+                async with self._semaphore('fetch'):
+                    item.status = FETCHING
+                    html_content = await self.fetch(item.url)
+                if not html_content:
+                    item.fail("Failed to fetch page")
+                    return
+
+                async with self._semaphore('nlp'):
+                    item.status = EXTRACTING
+                    article_data = await self.extract(item.url, html_content)
+                if not article_data or not article_data.get('content'):
+                    item.fail("Failed to extract content")
+                    return
+                if not force_refresh and await self._skip_if_ingested(item, article_data):
+                    return
+
+                async with self._semaphore('llm'):
+                    item.status = GENERATING
+                    generated_text = await self.generate(article_data['content'])
+                if not generated_text:
+                    item.fail("Failed to generate content")
+                    return
+
+                item.status = SAVING
+                saved = await self.save(article_data, generated_text)
+                if not saved:
+                    item.fail("Failed to save article")
+                    return
+                if isinstance(saved, str):
+                    item.article_id = saved
+
+                item.status = DONE
+                item.finished_at = time.time()
+            except Exception as e:
+                logger.exception(f"Batch item {item.url} failed")
+                item.fail(str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        active = [batch for batch in self._batches.values() if not batch.finished]
+        return {
+            'limits': self.limits,
+            'batches': len(self._batches),
+            'active_batches': len(active),
+            'active_items': sum(1 for batch in active for item in batch.items
+                                if item.status not in (DONE, FAILED)),
+        }
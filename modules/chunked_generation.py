@@ -0,0 +1,181 @@
+# modules/chunked_generation.py
+
+"""
+Chunked Generation
+A long article sent to the language model in one prompt is cut off at the model's output token
+limit, and the readability pass cannot start until the whole cleaning pass has returned. This
+module splits the article at paragraph boundaries into windows that fit a token budget, runs the
+prompt passes on every window concurrently (each window goes through all passes on its own), and
+joins the results in order. Each window starts with the last paragraph(s) of the previous one, so
+the model sees the context across the cut; the repeated paragraphs are dropped again at the seams.
+
+Chunking is for articles whose output would not fit the model's output token limit (8192 tokens in
+GENERATION_CONFIG); shorter ones go through each prompt whole, as the prompts are written for a
+whole article. Repeats are matched by similarity, which works when a pass stays close to its input
+(the clean pass); a pass that rewrites freely words each copy differently.
+"""
+
+import asyncio
+import difflib
+import os
+import re
+import time
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("chunked_generation")
+
+LLM_CHUNKING_ENABLED = os.getenv('LLM_CHUNKING_ENABLED', 'true').lower() != 'false'
+# Articles over this many tokens are chunked, into windows of this size; close to the output limit
+LLM_CHUNK_TOKENS = int(os.getenv('LLM_CHUNK_TOKENS', '7000'))
+LLM_CHUNK_CONCURRENCY = int(os.getenv('LLM_CHUNK_CONCURRENCY', '4'))
+LLM_CHUNK_OVERLAP = int(os.getenv('LLM_CHUNK_OVERLAP', '1'))
+
+# Rough English average; only used to size windows, so it errs on the small side
+CHARS_PER_TOKEN = 4
+SEAM_SIMILARITY = 0.85
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n|\n')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|(?<=[.!?]["”\')\]])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split text into non-empty, stripped paragraphs."""
+    return [paragraph.strip() for paragraph in PARAGRAPH_BREAK.split(text) if paragraph.strip()]
+
+
+def _split_long_paragraph(paragraph: str, max_tokens: int) -> List[str]:
+    """Break a paragraph over the budget at sentence boundaries (or hard cuts, for one huge sentence)."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces, current = [], ''
+    for sentence in SENTENCE_BREAK.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int = LLM_CHUNK_TOKENS, overlap: int = LLM_CHUNK_OVERLAP) -> List[str]:
+    """
+    Split text into windows of whole paragraphs that fit the token budget.
+
+    :param text: The article text.
+    :param max_tokens: Budget for the new paragraphs of a window; overlap comes on top.
+    :param overlap: Number of paragraphs from the end of a window repeated at the start of the next.
+    :return: The windows, in order, paragraphs separated by blank lines.
+    """
+    paragraphs = []
+    for paragraph in split_paragraphs(text):
+        if estimate_tokens(paragraph) > max_tokens:
+            paragraphs.extend(_split_long_paragraph(paragraph, max_tokens))
+        else:
+            paragraphs.append(paragraph)
+
+    windows: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        if current and current_tokens + tokens > max_tokens:
+            windows.append(current)
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        windows.append(current)
+
+    chunks = []
+    for index, window in enumerate(windows):
+        context = windows[index - 1][-overlap:] if index and overlap else []
+        chunks.append('\n\n'.join(context + window))
+    return chunks
+
+
+def _is_repeat(paragraph: str, previous: Sequence[str]) -> bool:
+    for candidate in previous:
+        matcher = difflib.SequenceMatcher(None, paragraph, candidate, autojunk=False)
+        if matcher.real_quick_ratio() >= SEAM_SIMILARITY and matcher.quick_ratio() >= SEAM_SIMILARITY \
+                and matcher.ratio() >= SEAM_SIMILARITY:
+            return True
+    return False
+
+
+def merge_chunks(outputs: Sequence[str], overlap: int = LLM_CHUNK_OVERLAP) -> str:
+    """
+    Join generated windows in order, dropping paragraphs at the start of a window that repeat the
+    end of the previous one. The model may reword the overlap slightly, so repeats are matched by
+    similarity rather than equality.
+    """
+    merged: List[str] = []
+    for index, output in enumerate(outputs):
+        paragraphs = split_paragraphs(output)
+        if index and overlap and merged:
+            tail = merged[-overlap:]
+            # Only the first `overlap` paragraphs of a window can be repeats
+            skip = 0
+            while skip < min(len(paragraphs), overlap) and _is_repeat(paragraphs[skip], tail):
+                skip += 1
+            paragraphs = paragraphs[skip:]
+        merged.extend(paragraphs)
+    return '\n\n'.join(merged)
+
+
+async def generate_chunked(generate: Callable[[str], Awaitable[str]],
+                           text: str,
+                           prompt_templates: Sequence[str],
+                           max_tokens: int = LLM_CHUNK_TOKENS,
+                           concurrency: int = LLM_CHUNK_CONCURRENCY,
+                           overlap: int = LLM_CHUNK_OVERLAP,
+                           run_window: Optional[Callable[[str], Awaitable[str]]] = None) -> str:
+    """
+    Run a sequence of prompt passes over a long text, window by window.
+
+    :param generate: Coroutine function sending a prompt to the model and returning its text.
+    :param text: The article text.
+    :param prompt_templates: Prompts with an {article_text} placeholder, applied in order;
+        each pass gets the previous pass's output for the same window.
+    :param max_tokens: Token budget per window.
+    :param concurrency: Maximum number of windows in flight at once.
+    :param overlap: Paragraphs of context repeated across each cut.
+    :param run_window: Coroutine function running all passes over one window, used instead of
+        applying prompt_templates one after another (e.g. to pipeline the passes).
+    :return: The generated text of all windows, joined in order.
+    """
+    chunks = chunk_text(text, max_tokens, overlap)
+    semaphore = asyncio.Semaphore(concurrency)
+    start_time = time.perf_counter()
+
+    async def run_chunk(index: int, chunk: str) -> str:
+        async with semaphore:
+            chunk_start = time.perf_counter()
+            if run_window is not None:
+                output = await run_window(chunk)
+            else:
+                output = chunk
+                for template in prompt_templates:
+                    output = await generate(template.format(article_text=output))
+            logger.debug(f"Chunk {index + 1}/{len(chunks)} ({estimate_tokens(chunk)} tokens) "
+                         f"generated in {time.perf_counter() - chunk_start:.2f}s")
+            return output
+
+    outputs = await asyncio.gather(*[run_chunk(index, chunk) for index, chunk in enumerate(chunks)])
+    result = merge_chunks(outputs, overlap)
+    logger.info(f"Generated {len(chunks)} chunks of ~{estimate_tokens(text)} tokens in "
+                f"{time.perf_counter() - start_time:.2f}s (concurrency {concurrency})")
+    return result
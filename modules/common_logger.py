@@ -1,18 +1,20 @@
 # modules/common_logger.py
 
+import contextvars
 import logging
 import os
 import threading
 import uuid
 from contextlib import contextmanager
-from google.cloud import logging as cloud_logging
+from functools import lru_cache
 
-# Thread-local storage for job context
-_thread_local = threading.local()
+# Job context storage. A ContextVar rather than a thread-local, so concurrent asyncio tasks
+# (e.g. batch items) each see their own job ID.
+_job_id = contextvars.ContextVar('job_id', default=None)
 
 class JobContextFilter(logging.Filter):
     def filter(self, record):
-        record.job_id = getattr(_thread_local, 'job_id', 'No-Job')
+        record.job_id = _job_id.get() or 'No-Job'
         record.pid = os.getpid()
         record.tid = threading.get_native_id()
         return True
@@ -27,23 +29,25 @@ def job_context(job_id=None):
     """
     if job_id is None:
         job_id = str(uuid.uuid4())  # Generate a unique ID if none provided
-    previous_job_id = getattr(_thread_local, 'job_id', None)
-    _thread_local.job_id = job_id
+    token = _job_id.set(job_id)
     try:
         yield
     finally:
-        if previous_job_id:
-            _thread_local.job_id = previous_job_id
-        else:
-            del _thread_local.job_id
+        _job_id.reset(token)
 
 class JobContextFilter(logging.Filter):
     def filter(self, record):
-        record.job_id = getattr(_thread_local, 'job_id', 'No-Job')
+        record.job_id = _job_id.get() or 'No-Job'
         record.pid = os.getpid()
         record.tid = threading.get_native_id()
         return True
 
+@lru_cache(maxsize=None)
+def _get_cloud_logging_client():
+    """One Cloud Logging client per process, imported only on App Engine."""
+    from google.cloud import logging as cloud_logging
+    return cloud_logging.Client()
+
 def setup_logger(name, log_file='app.log', level=logging.DEBUG):
     logger = logging.getLogger(name)
     
@@ -55,8 +59,8 @@ def setup_logger(name, log_file='app.log', level=logging.DEBUG):
 
         if os.getenv('GAE_ENV', '').startswith('standard'):
             # App Engine setup
-            client = cloud_logging.Client()
-            handler = cloud_logging.handlers.CloudLoggingHandler(client)
+            from google.cloud.logging.handlers import CloudLoggingHandler
+            handler = CloudLoggingHandler(_get_cloud_logging_client())
         else:
             # Local setup
             handler = logging.FileHandler(log_file)
@@ -79,11 +83,13 @@ logger = setup_logger("app_logger")
 
 # Helper functions to set/clear job context
 def set_job_context(job_id):
-    _thread_local.job_id = job_id
+    _job_id.set(job_id)
 
 def clear_job_context():
-    if hasattr(_thread_local, 'job_id'):
-        del _thread_local.job_id
+    _job_id.set(None)
+
+def get_job_context():
+    return _job_id.get()
 
 
 def truncate_text(text):
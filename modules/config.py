@@ -10,9 +10,10 @@ stored, processed, and cleaned before further processing.
 """
 
 import os
-import spacy
 import subprocess
 from modules.common_logger import setup_logger
+from modules.lazy_imports import lazy_import
+from modules.sentence_segmenter import RegexSentenceSegmenter
 import sys 
 
 # Initialize the logger for the config module
@@ -20,24 +21,59 @@ logger = setup_logger("config")
 
 
 
-def initialize_nlp():
-    """Initialize spaCy NLP model"""
+# Sentence segmentation backend: 'full', 'senter', 'sentencizer' or 'regex'
+NLP_BACKEND = os.getenv('NLP_BACKEND', 'senter')
+NLP_MODEL_NAME = 'en_core_web_sm'
+
+# Components of en_core_web_sm that sentence segmentation does not need
+NLP_UNUSED_COMPONENTS = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner']
+
+
+def _load_spacy_model(**kwargs):
+    """Load en_core_web_sm, downloading it first if it is not installed."""
+    spacy = lazy_import('spacy')
     try:
         # Try to load the model directly
-        nlp = spacy.load('en_core_web_sm')
-        return nlp
+        return spacy.load(NLP_MODEL_NAME, **kwargs)
     except OSError:
         logger.warning("Could not load spaCy model directly, attempting download...")
         try:
             # If the model isn't found, download it
-            subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"], 
+            subprocess.run([sys.executable, "-m", "spacy", "download", NLP_MODEL_NAME], 
                          check=True, capture_output=True)
-            nlp = spacy.load('en_core_web_sm')
-            return nlp
+            return spacy.load(NLP_MODEL_NAME, **kwargs)
         except Exception as e:
             logger.error(f"Failed to download spaCy model: {str(e)}")
             raise
 
+
+def initialize_nlp(backend=None):
+    """
+    Initialize the sentence segmentation pipeline.
+
+    Backends:
+        full        - the complete en_core_web_sm pipeline (tagger, parser, NER, lemmatizer)
+        senter      - en_core_web_sm with only the statistical sentence recognizer enabled
+        sentencizer - a blank English pipeline with the rule-based spaCy sentencizer
+        regex       - the pure-regex RegexSentenceSegmenter, no spaCy model at all
+    """
+    backend = backend or NLP_BACKEND
+    logger.info(f"Initializing NLP backend: {backend}")
+
+    if backend == 'full':
+        return _load_spacy_model()
+    if backend == 'senter':
+        nlp = _load_spacy_model(exclude=NLP_UNUSED_COMPONENTS)
+        nlp.enable_pipe('senter')
+        return nlp
+    if backend == 'sentencizer':
+        nlp = lazy_import('spacy').blank('en')
+        nlp.add_pipe('sentencizer')
+        return nlp
+    if backend == 'regex':
+        return RegexSentenceSegmenter()
+    raise ValueError(f"Unknown NLP backend: {backend}")
+
 def initialize_config():
     """
     Initialize and validate configuration settings.
@@ -0,0 +1,136 @@
+# modules/content_extractor.py
+
+"""
+Main Content Extractor
+This module strips page boilerplate (navigation, footers, cookie banners, comments, related links)
+from a parsed document before its text is sent to the language model. Obvious boilerplate elements
+are removed by tag name and class/id, then paragraph-level blocks are scored by text length and
+link density and the best-scoring container is kept. The extractor works on the BeautifulSoup tree
+the scraper has already built, so the document is still parsed only once.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+# Elements that never carry article text
+BOILERPLATE_TAGS = [
+    'script', 'style', 'noscript', 'template', 'nav', 'footer', 'aside', 'iframe',
+    'svg', 'button', 'select', 'figcaption'
+]
+# 'form' is not listed: ASP.NET WebForms pages wrap the whole page, article included, in one <form>
+
+# Words of a class or id that mark page chrome rather than article content. Whole words only
+# ('share-buttons' but not 'shareable', 'comments' but not 'commentary').
+BOILERPLATE_WORDS = {
+    'cookie', 'cookies', 'consent', 'banner', 'newsletter', 'subscribe', 'subscription', 'signup',
+    'share', 'sharing', 'social', 'comment', 'comments', 'related', 'recommended', 'recommendations',
+    'promo', 'promos', 'sponsor', 'sponsored', 'advert', 'advertisement', 'ad', 'ads', 'sidebar',
+    'footer', 'breadcrumb', 'breadcrumbs', 'popup', 'modal', 'menu', 'nav', 'navbar', 'navigation',
+}
+IDENTIFIER_SEPARATOR = re.compile(r'[\s_-]+')
+
+# Containers that are never removed even if their class matches the pattern
+PROTECTED_TAGS = {'html', 'body', 'main', 'article'}
+
+# Blocks scored to locate the main content container
+SCORED_TAGS = ['p', 'pre', 'blockquote', 'td']
+
+# Blocks emitted, one per paragraph, from the selected container
+BLOCK_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'blockquote', 'pre', 'td', 'dd', 'dt']
+
+MIN_SCORED_BLOCK_LENGTH = 25
+MAX_BLOCK_LINK_DENSITY = 0.5
+
+
+def _link_density(element: Tag, text_length: int) -> float:
+    if not text_length:
+        return 0.0
+    link_length = sum(len(link.get_text(' ', strip=True)) for link in element.find_all('a'))
+    return min(link_length / text_length, 1.0)
+
+
+def remove_boilerplate(soup: BeautifulSoup) -> None:
+    """Remove boilerplate elements from the tree in place."""
+    for element in soup(BOILERPLATE_TAGS):
+        if not element.decomposed:
+            element.decompose()
+
+    for element in soup.find_all(True):
+        if element.decomposed or element.name in PROTECTED_TAGS or element.attrs is None:
+            continue
+        classes = element.get('class') or []
+        identifier = ' '.join(classes) + ' ' + (element.get('id') or '')
+        words = IDENTIFIER_SEPARATOR.split(identifier.lower())
+        if not BOILERPLATE_WORDS.isdisjoint(words):
+            element.decompose()
+
+
+def find_content_root(soup: BeautifulSoup) -> Optional[Tag]:
+    """
+    Score each scored block's parent (full score) and grandparent (half score) by text length
+    and comma count, penalise by link density, and return the best container.
+    """
+    scores: Dict[int, float] = {}
+    candidates: Dict[int, Tag] = {}
+
+    for block in soup.find_all(SCORED_TAGS):
+        text = block.get_text(' ', strip=True)
+        if len(text) < MIN_SCORED_BLOCK_LENGTH:
+            continue
+        score = 1 + text.count(',') + min(len(text) // 100, 3)
+        for ancestor, weight in ((block.parent, 1.0), (block.parent.parent if block.parent else None, 0.5)):
+            if ancestor is None or not isinstance(ancestor, Tag):
+                continue
+            candidates[id(ancestor)] = ancestor
+            scores[id(ancestor)] = scores.get(id(ancestor), 0.0) + score * weight
+
+    best, best_score = None, 0.0
+    for key, candidate in candidates.items():
+        text_length = len(candidate.get_text(' ', strip=True))
+        score = scores[key] * (1 - _link_density(candidate, text_length))
+        if score > best_score:
+            best, best_score = candidate, score
+    return best
+
+
+def _is_nested_block(block: Tag, root: Tag) -> bool:
+    """True if block sits inside another block element below root."""
+    for parent in block.parents:
+        if parent is root:
+            return False
+        if parent.name in BLOCK_TAGS:
+            return True
+    return False
+
+
+def _collect_blocks(root: Tag) -> List[str]:
+    """Return the text of the outermost block elements under root, skipping link lists."""
+    blocks = []
+    for block in root.find_all(BLOCK_TAGS):
+        if _is_nested_block(block, root):
+            continue
+        text = block.get_text(' ', strip=True)
+        if not text or _link_density(block, len(text)) > MAX_BLOCK_LINK_DENSITY:
+            continue
+        blocks.append(text)
+    return blocks
+
+
+def extract_main_text(soup: BeautifulSoup) -> Optional[str]:
+    """
+    Extract the main article text from a parsed document, one block per paragraph.
+    The tree is modified in place.
+
+    :param soup: The parsed document.
+    :return: The extracted text, or None if no content container was found.
+    """
+    remove_boilerplate(soup)
+    root = find_content_root(soup)
+    if root is None:
+        return None
+    blocks = _collect_blocks(root)
+    if not blocks:
+        return None
+    return '\n\n'.join(blocks)
@@ -8,19 +8,17 @@ Designed to work with a Flask application using Google Cloud Firestore as the da
 and Google Cloud Storage for audio file storage.
 """
 
-from google.cloud.firestore_v1 import AsyncClient
-from google.cloud import firestore
-from google.cloud import storage
 from google.cloud import exceptions as gcp_exceptions
 from modules.common_logger import setup_logger
+from modules.lazy_imports import lazy_import
+from modules.fingerprint import fingerprint_bands, format_fingerprint, parse_fingerprint
+from modules.llm_cache import LLM_CACHE_TTL_SECONDS
 from typing import Optional, List, Dict, Union
 import datetime
 import os
-from google.auth.credentials import AnonymousCredentials
-from google.oauth2 import service_account
 import json
 from io import BytesIO
-from google.cloud import storage
+from functools import lru_cache
 
 import asyncio
 from functools import partial
@@ -35,13 +33,21 @@ DATABASE_NAME = os.getenv('FIRESTORE_DATABASE', 'clean-scrape-articles')
 GCS_BUCKET_NAME = os.getenv('GCS_BUCKET_NAME', 'clean-scrape-audio-files')
 
 
-# Initialize clients based on environment
-if is_appengine:
-    # On App Engine, use default credentials
-    db = AsyncClient(project=PROJECT_ID, database=DATABASE_NAME)
+# Clients are built on first use rather than at import, so starting the application
+# (and routes that never touch the database) do not pay for credential loading and client setup.
+def _firestore():
+    """The google.cloud.firestore module (SERVER_TIMESTAMP, Query, ...), imported on first use."""
+    return lazy_import('google.cloud.firestore')
+
+
+@lru_cache(maxsize=None)
+def _get_credentials():
+    """
+    Service account credentials for local runs; None on App Engine, which uses default credentials.
+    """
+    if is_appengine:
+        return None
 
-    storage_client = storage.Client()
-else:
     # Clear any local emulator settings
     os.environ.pop('FIRESTORE_EMULATOR_HOST', None)
     os.environ.pop('GOOGLE_CLOUD_FIRESTORE_EMULATOR_HOST', None)
@@ -50,23 +56,44 @@ else:
     json_path = os.path.join(os.getcwd(), 'service-account-key.json')
     with open(json_path, 'r') as file:
         service_account_info = json.load(file)
-    
-    credentials = service_account.Credentials.from_service_account_info(
+
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_info(
         service_account_info,
         scopes=['https://www.googleapis.com/auth/cloud-platform']
     )
-    
-    db = AsyncClient(
-        project=PROJECT_ID,
-        credentials=credentials,
-        database=DATABASE_NAME
-    )
-    storage_client = storage.Client(project=PROJECT_ID, credentials=credentials)
 
 
-bucket = storage_client.bucket(GCS_BUCKET_NAME)
+@lru_cache(maxsize=None)
+def get_db():
+    """
+    Return the process-wide Firestore AsyncClient, creating it on first use.
+    """
+    from google.cloud.firestore_v1 import AsyncClient
+    credentials = _get_credentials()
+    if credentials is None:
+        return AsyncClient(project=PROJECT_ID, database=DATABASE_NAME)
+    return AsyncClient(project=PROJECT_ID, credentials=credentials, database=DATABASE_NAME)
+
+
+@lru_cache(maxsize=None)
+def get_storage_client():
+    """
+    Return the process-wide Cloud Storage client, creating it on first use.
+    """
+    from google.cloud import storage
+    credentials = _get_credentials()
+    if credentials is None:
+        return storage.Client()
+    return storage.Client(project=PROJECT_ID, credentials=credentials)
 
 
+@lru_cache(maxsize=None)
+def get_bucket():
+    """
+    Return the audio file bucket.
+    """
+    return get_storage_client().bucket(GCS_BUCKET_NAME)
 
 
 logger = setup_logger("database")
@@ -78,7 +105,7 @@ async def get_all_articles():
     Retrieve all articles from the database.
     """
     try:        
-        articles = await db.collection('articles').order_by('id', direction=firestore.Query.DESCENDING).get()
+        articles = await get_db().collection('articles').order_by('id', direction=_firestore().Query.DESCENDING).get()
         logger.debug(f"Retrieved {len(articles)} articles from the database.")
         return [doc.to_dict() for doc in articles]
     except Exception as e:
@@ -90,7 +117,7 @@ async def get_article_by_id(article_id):
     Retrieve a specific article by its ID.
     """
     try:
-        doc_ref = db.collection('articles').document(str(article_id))
+        doc_ref = get_db().collection('articles').document(str(article_id))
         doc = await doc_ref.get()
         if doc.exists:
             logger.debug(f"Article found with ID {article_id}.")
@@ -110,7 +137,7 @@ async def get_articles_with_audio_status() -> List[Dict]:
     :return: List of articles with 'has_audio' boolean field.
     """
     try:
-        articles_ref = db.collection('articles').order_by('created_at', direction=firestore.Query.DESCENDING)
+        articles_ref = get_db().collection('articles').order_by('created_at', direction=_firestore().Query.DESCENDING)
         articles = await articles_ref.get()
         articles_with_status = []
         for doc in articles:
@@ -133,12 +160,14 @@ async def get_articles_with_audio_status() -> List[Dict]:
         logger.error(f"Error retrieving articles with audio status: {e}")
         return []
     
-async def save_article(content, title="", author="", date="", description="", url=None, source_type="url"):
+async def save_article(content, title="", author="", date="", description="", url=None, source_type="url",
+                       fingerprint=None):
     """
     Save a new article to the database.
+    The optional content fingerprint is stored with its band keys for near-duplicate lookups.
     """
     try:
-        doc_ref = db.collection('articles').document()
+        doc_ref = get_db().collection('articles').document()
         article_data = {
             'id': doc_ref.id,
             'url': url,
@@ -148,21 +177,99 @@ async def save_article(content, title="", author="", date="", description="", ur
             'date': date,
             'description': description,
             'source_type': source_type,
-            'created_at': firestore.SERVER_TIMESTAMP
+            'created_at': _firestore().SERVER_TIMESTAMP
         }
+        if fingerprint is not None:
+            article_data['fingerprint'] = format_fingerprint(fingerprint)
+            article_data['fingerprint_bands'] = fingerprint_bands(fingerprint)
         await doc_ref.set(article_data)
         logger.info(f"Article saved successfully: {title or 'N/A'} (Source: {source_type})")
-        return True
+        return doc_ref.id
     except Exception as e:
         logger.error(f"Error saving article: {str(e)}")
         return False
 
+async def find_articles_by_fingerprint_bands(band_keys: List[str]) -> List[tuple]:
+    """
+    Find articles whose content fingerprint shares at least one band with the given keys.
+    Served by Firestore's single-field index on 'fingerprint_bands', not a collection scan.
+
+    :param band_keys: Band keys from fingerprint.fingerprint_bands
+    :return: List of (article_id, fingerprint) tuples
+    """
+    docs = await get_db().collection('articles') \
+        .where('fingerprint_bands', 'array_contains_any', band_keys) \
+        .select(['fingerprint']) \
+        .limit(50) \
+        .get()
+    return [(doc.id, parse_fingerprint(doc.get('fingerprint'))) for doc in docs]
+
+async def get_url_index_entry(url_key: str) -> Optional[str]:
+    """
+    Look up the article ID stored for a canonical URL.
+
+    :param url_key: Document ID of the canonical URL (see url_index.url_key)
+    :return: The article ID, or None if the URL has not been ingested
+    """
+    doc = await get_db().collection('url_index').document(url_key).get()
+    if doc.exists:
+        return doc.to_dict().get('article_id')
+    return None
+
+async def save_url_index_entry(url_key: str, canonical_url: str, article_id: str) -> bool:
+    """
+    Record that a canonical URL has been ingested as the given article.
+    """
+    await get_db().collection('url_index').document(url_key).set({
+        'url': canonical_url,
+        'article_id': article_id,
+        'created_at': _firestore().SERVER_TIMESTAMP
+    })
+    return True
+
+async def get_llm_cache_entry(key: str) -> Optional[tuple]:
+    """
+    Look up a cached language model response.
+
+    :param key: Document ID of the request (see llm_cache.cache_key)
+    :return: (text, created_at epoch seconds), or None if the request has not been cached
+    """
+    doc = await get_db().collection('llm_cache').document(key).get()
+    if doc.exists:
+        entry = doc.to_dict()
+        return entry.get('text'), entry.get('created_at', 0.0)
+    return None
+
+async def save_llm_cache_entry(key: str, text: str, model_name: str, created_at: float) -> bool:
+    """
+    Store a language model response. 'expires_at' can back a Firestore TTL policy on the collection.
+    """
+    await get_db().collection('llm_cache').document(key).set({
+        'text': text,
+        'model': model_name,
+        'created_at': created_at,
+        'expires_at': datetime.datetime.fromtimestamp(created_at, datetime.timezone.utc)
+                      + datetime.timedelta(seconds=LLM_CACHE_TTL_SECONDS)
+    })
+    return True
+
+async def delete_url_index_entries(article_id: str) -> int:
+    """
+    Remove the URL index entries pointing at an article, so the URL can be ingested again.
+
+    :return: Number of entries removed
+    """
+    entries = await get_db().collection('url_index').where('article_id', '==', str(article_id)).get()
+    for doc in entries:
+        await doc.reference.delete()
+    return len(entries)
+
 async def get_last_article_id() -> Optional[str]:
     """
     Retrieve the ID of the last inserted article.
     """
     try:
-        articles = await db.collection('articles').order_by('created_at', direction=firestore.Query.DESCENDING).limit(1).get()
+        articles = await get_db().collection('articles').order_by('created_at', direction=_firestore().Query.DESCENDING).limit(1).get()
         for doc in articles:
             logger.info(f"Retrieved last article ID: {doc.id}")
             return doc.id
@@ -177,8 +284,8 @@ async def update_article_by_id(article_id, content, title=None, author=None, des
     Update an existing article in the database.
     """
     try:
-        doc_ref = db.collection('articles').document(str(article_id))
-        update_data = {'content': content, 'updated_at': firestore.SERVER_TIMESTAMP}
+        doc_ref = get_db().collection('articles').document(str(article_id))
+        update_data = {'content': content, 'updated_at': _firestore().SERVER_TIMESTAMP}
         if title is not None:
             update_data['title'] = title
         if author is not None:
@@ -199,12 +306,18 @@ async def delete_article_by_id(article_id):
     """
     try:
         # Delete the article from Firestore
-        await db.collection('articles').document(str(article_id)).delete()
+        await get_db().collection('articles').document(str(article_id)).delete()
         logger.info(f"Article {article_id} deleted from Firestore.")
 
+        try:
+            removed = await delete_url_index_entries(article_id)
+            logger.info(f"Removed {removed} URL index entries for article {article_id}.")
+        except Exception as index_error:
+            logger.warning(f"Error removing URL index entries for article {article_id}: {str(index_error)}")
+
         # Attempt to delete associated audio file from Cloud Storage
         try:
-            blob = bucket.blob(f'audio_files/{article_id}.m4a')
+            blob = get_bucket().blob(f'audio_files/{article_id}.m4a')
             await asyncio.to_thread(blob.delete)
             logger.info(f"Associated audio file for article {article_id} deleted successfully.")
         except gcp_exceptions.NotFound:
@@ -227,7 +340,7 @@ async def create_audio_file(article_id: str, m4a_audio: Union[BytesIO, bytes]) -
     :return: True if successful, False otherwise
     """
     try:
-        blob = bucket.blob(f'audio_files/{article_id}.m4a')
+        blob = get_bucket().blob(f'audio_files/{article_id}.m4a')
         
         # Convert bytes to BytesIO if necessary
         if isinstance(m4a_audio, bytes):
@@ -237,10 +350,10 @@ async def create_audio_file(article_id: str, m4a_audio: Union[BytesIO, bytes]) -
         await asyncio.to_thread(blob.upload_from_file, m4a_audio, content_type='audio/mp4')
         
         # Update the article document in Firestore with the audio file reference
-        doc_ref = db.collection('articles').document(str(article_id))
+        doc_ref = get_db().collection('articles').document(str(article_id))
         await doc_ref.update({
             'audio_file_path': f'audio_files/{article_id}.m4a',
-            'audio_updated_at': firestore.SERVER_TIMESTAMP
+            'audio_updated_at': _firestore().SERVER_TIMESTAMP
         })
         logger.info(f"M4A audio file created for article ID {article_id}.")
         return True
@@ -257,7 +370,7 @@ async def get_audio_file_by_article_id(article_id: str) -> Optional[BytesIO]:
     :return: BytesIO object containing the audio file data, or None if not found
     """
     try:
-        blob = bucket.blob(f'audio_files/{article_id}.m4a')
+        blob = get_bucket().blob(f'audio_files/{article_id}.m4a')
         audio_content = await asyncio.to_thread(blob.download_as_bytes)
         logger.info(f"M4A audio file retrieved for article ID {article_id}.")
         return BytesIO(audio_content)
@@ -275,7 +388,7 @@ async def update_audio_file(article_id: str, new_audio_content: Union[BytesIO, b
     :return: True if successful, False otherwise
     """
     try:
-        blob = bucket.blob(f'audio_files/{article_id}.m4a')
+        blob = get_bucket().blob(f'audio_files/{article_id}.m4a')
         
         # Convert bytes to BytesIO if necessary
         if isinstance(new_audio_content, bytes):
@@ -285,9 +398,9 @@ async def update_audio_file(article_id: str, new_audio_content: Union[BytesIO, b
         await asyncio.to_thread(blob.upload_from_file, new_audio_content, content_type='audio/mp4')
         
         # Update the article document in Firestore
-        doc_ref = db.collection('articles').document(str(article_id))
+        doc_ref = get_db().collection('articles').document(str(article_id))
         await doc_ref.update({
-            'audio_updated_at': firestore.SERVER_TIMESTAMP
+            'audio_updated_at': _firestore().SERVER_TIMESTAMP
         })
         logger.info(f"M4A audio file updated for article ID {article_id}.")
         return True
@@ -300,14 +413,14 @@ async def delete_audio_file(article_id: str) -> bool:
     Delete the M4A audio file associated with a specific article from Cloud Storage.
     """
     try:
-        blob = bucket.blob(f'audio_files/{article_id}.m4a')
+        blob = get_bucket().blob(f'audio_files/{article_id}.m4a')
         await asyncio.to_thread(blob.delete)
         
         # Update the article document in Firestore
-        doc_ref = db.collection('articles').document(str(article_id))
+        doc_ref = get_db().collection('articles').document(str(article_id))
         await doc_ref.update({
-            'audio_file_path': firestore.DELETE_FIELD,
-            'audio_updated_at': firestore.DELETE_FIELD
+            'audio_file_path': _firestore().DELETE_FIELD,
+            'audio_updated_at': _firestore().DELETE_FIELD
         })
         logger.info(f"M4A audio file deleted for article ID {article_id}.")
         return True
@@ -321,7 +434,7 @@ async def get_audio_files_info() -> List[Dict]:
     """
     try:
         # First, get all articles
-        articles = await db.collection('articles').get()
+        articles = await get_db().collection('articles').get()
         audio_files_info = []
         for doc in articles:
             data = doc.to_dict()
@@ -0,0 +1,223 @@
+# modules/fingerprint.py
+
+"""
+Content Fingerprinting
+This module detects near-duplicate articles, such as syndicated copies of a story published under
+different URLs, so they can reuse the text and audio already produced instead of going through the
+language model and text-to-speech again.
+
+Each article gets a 64-bit SimHash over word shingles of its extracted text. Similar texts have
+fingerprints that differ in only a few bits. To find fingerprints within Hamming distance k without
+comparing against every stored article, the fingerprint is split into k + 1 bands: by the pigeonhole
+principle, two fingerprints that differ in at most k bits agree exactly on at least one band, so only
+articles sharing a band need to be compared. Band keys are stored with each article so the same
+lookup can be answered by the database.
+
+Like the URL index, fingerprints are only served from memory for a short time, after which the store
+is asked again: an article deleted through another worker or instance must stop matching. Matches
+report whether the store confirmed them, so callers only persist what follows from a confirmed one.
+
+Short texts (cookie walls, paywall teasers, "page not found" bodies) are not fingerprinted: pages that
+share one would collapse onto a single article and their URLs would be indexed as duplicates of it.
+"""
+
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("fingerprint")
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+MAX_HAMMING_DISTANCE = 3
+# Texts with fewer shingles (about as many words) get no fingerprint
+MIN_FINGERPRINT_SHINGLES = int(os.getenv('MIN_FINGERPRINT_SHINGLES', '50'))
+# Seconds a fingerprint is served from memory before the store is asked again
+FINGERPRINT_INDEX_MEMORY_TTL_SECONDS = float(os.getenv('FINGERPRINT_INDEX_MEMORY_TTL_SECONDS', '60'))
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Bit positions of a 64-bit value, least significant first
+_BIT_MASKS = np.uint64(1) << np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def _shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+         for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def shingle_count(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """Number of word shingles in a text."""
+    return max(len(WORD_PATTERN.findall(text or '')) - shingle_size + 1, 0)
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE,
+            min_shingles: int = MIN_FINGERPRINT_SHINGLES) -> Optional[int]:
+    """
+    Compute the 64-bit SimHash of a text over word shingles.
+
+    :param text: The extracted article text.
+    :param shingle_size: Number of consecutive words per shingle.
+    :param min_shingles: Minimum number of shingles for the fingerprint to be meaningful.
+    :return: The fingerprint, or None if the text is too short.
+    """
+    hashes = _shingle_hashes(text or '', shingle_size)
+    if len(hashes) < max(min_shingles, 1):
+        return None
+    # For each bit position: +1 for every shingle hash with the bit set, -1 otherwise
+    bit_set = (hashes[:, None] & _BIT_MASKS) != 0
+    weights = 2 * bit_set.sum(axis=0, dtype=np.int64) - len(hashes)
+    return sum(1 << bit for bit in np.flatnonzero(weights > 0).tolist())
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def fingerprint_bands(fingerprint: int, max_distance: int = MAX_HAMMING_DISTANCE) -> List[str]:
+    """
+    Split a fingerprint into max_distance + 1 bands and return a key per band,
+    e.g. '0:1f2e' for the lowest band.
+    """
+    band_count = max_distance + 1
+    keys = []
+    for band in range(band_count):
+        start = band * FINGERPRINT_BITS // band_count
+        end = (band + 1) * FINGERPRINT_BITS // band_count
+        value = (fingerprint >> start) & ((1 << (end - start)) - 1)
+        keys.append(f"{band}:{value:x}")
+    return keys
+
+
+def format_fingerprint(fingerprint: int) -> str:
+    """Fixed-width hex form for storage (Firestore integers are signed 64-bit)."""
+    return f"{fingerprint:016x}"
+
+
+def parse_fingerprint(value: str) -> int:
+    return int(value, 16)
+
+
+class FingerprintMatch(NamedTuple):
+    article_id: str
+    distance: int
+    # Found in the persistent store by this lookup, rather than in this process's memory
+    confirmed: bool
+
+
+class FingerprintIndex:
+    """
+    Banded in-memory index of article fingerprints, optionally backed by a persistent store
+    reached through a coroutine function:
+        lookup(band_keys) -> list of (article_id, fingerprint) sharing at least one band
+    """
+
+    def __init__(self, max_distance: int = MAX_HAMMING_DISTANCE,
+                 lookup: Optional[Callable[[List[str]], Awaitable[List[Tuple[str, int]]]]] = None,
+                 max_entries: int = 500000,
+                 memory_ttl_seconds: float = FINGERPRINT_INDEX_MEMORY_TTL_SECONDS):
+        self.max_distance = max_distance
+        self.lookup = lookup
+        self.max_entries = max_entries
+        self.memory_ttl_seconds = memory_ttl_seconds
+
+        self._fingerprints: 'OrderedDict[str, int]' = OrderedDict()
+        # Article ID -> time after which its fingerprint is no longer served from memory
+        self._expires_at: Dict[str, float] = {}
+        self._bands: Dict[str, set] = {}
+        self._counters = {'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'expired': 0, 'store_errors': 0,
+                          'candidates_compared': 0}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add(self, article_id: str, fingerprint: int) -> None:
+        """Index an article's fingerprint, replacing any previous one."""
+        self.remove(article_id)
+        self._fingerprints[article_id] = fingerprint
+        self._expires_at[article_id] = time.monotonic() + self.memory_ttl_seconds
+        for key in fingerprint_bands(fingerprint, self.max_distance):
+            self._bands.setdefault(key, set()).add(article_id)
+        while len(self._fingerprints) > self.max_entries:
+            self.remove(next(iter(self._fingerprints)))
+
+    def remove(self, article_id: str) -> None:
+        fingerprint = self._fingerprints.pop(article_id, None)
+        self._expires_at.pop(article_id, None)
+        if fingerprint is None:
+            return
+        for key in fingerprint_bands(fingerprint, self.max_distance):
+            members = self._bands.get(key)
+            if members is not None:
+                members.discard(article_id)
+                if not members:
+                    del self._bands[key]
+
+    def _nearest(self, fingerprint: int, candidates) -> Optional[Tuple[str, int]]:
+        best = None
+        for article_id, candidate in candidates:
+            self._counters['candidates_compared'] += 1
+            distance = hamming_distance(fingerprint, candidate)
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (article_id, distance)
+        return best
+
+    def find_in_memory(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        """Return (article_id, distance) of the nearest indexed fingerprint within max_distance."""
+        article_ids = set()
+        for key in fingerprint_bands(fingerprint, self.max_distance):
+            article_ids.update(self._bands.get(key, ()))
+        now = time.monotonic()
+        for article_id in [article_id for article_id in article_ids if self._expires_at[article_id] <= now]:
+            # Confirm against the store, which reflects deletions made by other processes
+            self.remove(article_id)
+            article_ids.discard(article_id)
+            self._counters['expired'] += 1
+        return self._nearest(fingerprint, ((article_id, self._fingerprints[article_id])
+                                           for article_id in article_ids))
+
+    async def find(self, fingerprint: int) -> Optional[FingerprintMatch]:
+        """
+        Return the nearest near-duplicate, looking in memory first and then in the persistent store.
+        """
+        match = self.find_in_memory(fingerprint)
+        if match:
+            self._counters['memory_hits'] += 1
+            return FingerprintMatch(*match, confirmed=False)
+
+        if self.lookup is not None:
+            try:
+                candidates = await self.lookup(fingerprint_bands(fingerprint, self.max_distance))
+            except Exception as e:
+                self._counters['store_errors'] += 1
+                logger.warning(f"Fingerprint lookup failed: {e}")
+                candidates = []
+            for article_id, candidate in candidates:
+                self.add(article_id, candidate)
+            match = self._nearest(fingerprint, candidates)
+            if match:
+                self._counters['store_hits'] += 1
+                return FingerprintMatch(*match, confirmed=True)
+
+        self._counters['misses'] += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(self._fingerprints), 'bands': len(self._bands),
+                'max_distance': self.max_distance, **self._counters}
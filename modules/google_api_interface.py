@@ -9,18 +9,27 @@ and adheres to common development standards to ensure high-quality, maintainable
 
 Key Components:
 - ContentGenerator: Handles initialization and interaction with Vertex AI for content generation.
+  The model comes from a backend in llm_backends (LLM_BACKEND=fake simulates it offline).
+- Every call is recorded in llm_metrics (timings, tokens, cost, cache hits, retries per prompt type).
+- ContentGeneratorRegistry: One ContentGenerator per model name per process, so Vertex AI is
+  initialized once and requests share the model's client.
 - get_content_response: Public function to generate content using ContentGenerator.
 - Logging Configuration: Utilizes the common_logger for centralized logging.
 """
 
+import concurrent.futures
 import os
 import traceback
-from typing import List, Optional
+import threading
+from typing import AsyncIterator, List, Optional, Tuple
 import json
-import vertexai
-from vertexai.generative_models import GenerativeModel, SafetySetting
 from google.oauth2 import service_account
 from modules.common_logger import setup_logger, truncate_text
+from modules.chunked_generation import estimate_tokens
+from modules.llm_backends import PROJECT_ID, ModelBackend, VertexBackend, get_backend
+from modules.llm_cache import LLMResponseCache, cache_key
+from modules.llm_metrics import LLMMetrics, llm_metrics
+from modules.quota_governor import QuotaGovernor
 from google.auth import default
 import asyncio
 import time
@@ -28,9 +37,15 @@ from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_excep
 from google.api_core.exceptions import ResourceExhausted
 
 # Fixed Variables
-PROJECT_ID = 'resewrch-agent'  # Replace with your GCP project ID
 DEFAULT_MODEL_NAME = 'gemini-1.5-flash-002'
 
+# Text deltas buffered between the streaming worker thread and the consumer
+STREAM_QUEUE_SIZE = 64
+# The worker thread gives up on a consumer that has taken nothing from a full queue for this long
+STREAM_STALL_SECONDS = float(os.getenv('LLM_STREAM_STALL_SECONDS', '300'))
+# How often a blocked worker checks whether the consumer has stopped or the event loop has closed
+STREAM_PUT_POLL_SECONDS = 1.0
+
 GENERATION_CONFIG = {
     "max_output_tokens": 8192,  # Limit the number of tokens for testing
     "temperature": 0,
@@ -38,70 +53,111 @@ GENERATION_CONFIG = {
 }
 
 
+# Create the default generator at application startup, and optionally send it a short request
+LLM_PRELOAD = os.getenv('LLM_PRELOAD', 'true').lower() != 'false'
+LLM_WARMUP_REQUEST = os.getenv('LLM_WARMUP_REQUEST', 'false').lower() == 'true'
+WARMUP_PROMPT = "Reply with the single word: ready"
+
 # Setup logger for google_api_interface.py
 logger = setup_logger("google_api_interface")
 
 
+def _record_retry(retry_state) -> None:
+    """Tenacity before_sleep hook: runs only for an attempt that is going to be retried."""
+    generator, user_prompt = retry_state.args[0], retry_state.args[1]
+    generator.logger.warning(f"ResourceExhausted error encountered. Retrying in "
+                             f"{retry_state.next_action.sleep:.0f} seconds. "
+                             f"Error: {retry_state.outcome.exception()}")
+    if generator.metrics is not None:
+        generator.metrics.record_retry(user_prompt, generator.model_name)
+
+
 class ContentGenerator:
     """
     ContentGenerator interfaces with Google Vertex AI to generate content based on user prompts.
     It includes logging, error handling, and follows best development practices.
     """
 
-    def __init__(self, model_name: Optional[str] = None):
+    def __init__(self, model_name: Optional[str] = None, cache: Optional[LLMResponseCache] = None,
+                 governor: Optional[QuotaGovernor] = None, backend: Optional[ModelBackend] = None,
+                 metrics: Optional[LLMMetrics] = llm_metrics):
         """
         Initializes the ContentGenerator with Vertex AI configurations and sets up logging.
 
         :param model_name: The name of the generative model to use. Defaults to DEFAULT_MODEL_NAME.
+        :param cache: Response cache consulted before calling the model. No caching if None.
+        :param governor: Quota governor every model call must be admitted by. No limit if None.
+        :param backend: Creates the model. Defaults to the backend selected by LLM_BACKEND.
+        :param metrics: Records every call. Not recorded if None.
         """
         self.logger = logger
+        self.cache = cache
+        self.governor = governor
+        self.metrics = metrics
+        self.backend = backend or get_backend()
         self.generation_config = GENERATION_CONFIG
-        self.safety_settings = self.default_safety_settings()
         self.model_name = model_name or DEFAULT_MODEL_NAME
+        self.requests = {'generate': 0, 'stream': 0}
 
         # Use default application credentials
         try:
-            vertexai.init(project=PROJECT_ID)
-            self.model = GenerativeModel(
-                self.model_name
-            )
+            self.safety_settings = self.backend.safety_settings()
+            self.model = self.backend.create_model(self.model_name)
         except Exception as e:
             self.logger.error(f"Failed to load service account credentials: {e}", exc_info=True)
             raise
 
     @staticmethod
-    def default_safety_settings() -> List[SafetySetting]:
+    def default_safety_settings() -> List['SafetySetting']:
         """
         Defines default safety settings.
 
         :return: List of default SafetySetting instances.
         """
-        return [
-            SafetySetting(
-                category=SafetySetting.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                threshold=SafetySetting.HarmBlockThreshold.OFF
-            ),
-            SafetySetting(
-                category=SafetySetting.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                threshold=SafetySetting.HarmBlockThreshold.OFF
-            ),
-            SafetySetting(
-                category=SafetySetting.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                threshold=SafetySetting.HarmBlockThreshold.OFF
-            ),
-            SafetySetting(
-                category=SafetySetting.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                threshold=SafetySetting.HarmBlockThreshold.OFF
-            ),
-        ]
+        return VertexBackend.default_safety_settings()
 
 
-    @retry(
-        retry=retry_if_exception_type(ResourceExhausted),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=15, max=60),
-        reraise=True
-    )
+    def _estimate_call_tokens(self, user_prompt: str) -> int:
+        """Prompt tokens plus a response about as long as the text in the prompt, up to the output limit."""
+        prompt_tokens = estimate_tokens(user_prompt)
+        return prompt_tokens + min(prompt_tokens, self.generation_config.get('max_output_tokens', prompt_tokens))
+
+    async def _admit(self, user_prompt: str) -> Tuple[int, float]:
+        """Wait for the quota governor to admit a call; returns the tokens it was admitted for and the wait."""
+        estimated_tokens = self._estimate_call_tokens(user_prompt)
+        waited = 0.0
+        if self.governor is not None:
+            waited = await self.governor.acquire(estimated_tokens)
+            if waited:
+                self.logger.info(f"Waited {waited:.2f}s for language model quota")
+        return estimated_tokens, waited
+
+    def _record_usage(self, estimated_tokens: int, response) -> None:
+        usage = getattr(response, 'usage_metadata', None)
+        if self.governor is not None and usage is not None:
+            self.governor.record_usage(estimated_tokens, getattr(usage, 'total_token_count', None) or None)
+
+    def _record_call(self, user_prompt: str, start_time: float, queue_wait: float = 0.0, response=None,
+                     first_delta_seconds: Optional[float] = None, cache_hit: bool = False) -> None:
+        if self.metrics is None:
+            return
+        usage = getattr(response, 'usage_metadata', None)
+        self.metrics.record_call(
+            user_prompt, self.model_name, time.perf_counter() - start_time, queue_wait,
+            input_tokens=getattr(usage, 'prompt_token_count', None),
+            output_tokens=getattr(usage, 'candidates_token_count', None),
+            first_delta_seconds=first_delta_seconds,
+            cache_hit=cache_hit
+        )
+
+    def _record_throttled(self) -> None:
+        if self.governor is not None:
+            self.governor.record_throttled()
+
+    def _record_error(self, user_prompt: str) -> None:
+        if self.metrics is not None:
+            self.metrics.record_error(user_prompt, self.model_name)
+
     async def generate_content(self, user_prompt: str) -> str:
         """
         Generates content based on the user prompt and logs the response.
@@ -109,25 +165,272 @@ class ContentGenerator:
         :param user_prompt: The input prompt from the user.
         :return: Generated content as a string.
         """
+        start_time = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.model_name, self.generation_config, user_prompt)
+            cached_text = await self.cache.get(key)
+            if cached_text is not None:
+                self.logger.info(f"Using cached response for prompt {key[:12]} ({len(cached_text)} chars)")
+                self._record_call(user_prompt, start_time, cache_hit=True)
+                return cached_text
+
+        call = {'queue_wait': 0.0, 'response': None}
+        try:
+            generated_text = await self._generate(user_prompt, call)
+        except Exception:
+            self._record_error(user_prompt)
+            raise
+        self._record_call(user_prompt, start_time, call['queue_wait'], call['response'])
+        if key is not None:
+            await self.cache.put(key, generated_text, self.model_name)
+        return generated_text
+
+    @retry(
+        retry=retry_if_exception_type(ResourceExhausted),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=15, max=60),
+        before_sleep=_record_retry,
+        reraise=True
+    )
+    async def _generate(self, user_prompt: str, call: dict) -> str:
+        """One attempt at a model call; `call` accumulates the quota wait and keeps the response."""
         try:
             self.logger.info(f"Generating content for prompt: \n'{truncate_text(user_prompt)}'")
-            chat = self.model.start_chat(response_validation=False)
+            # Stateless call on the shared model; a chat session per request would only add history handling
+            estimated_tokens, waited = await self._admit(user_prompt)
+            call['queue_wait'] += waited
+            self.requests['generate'] += 1
             response = await asyncio.to_thread(
-                chat.send_message,
+                self.model.generate_content,
                 [user_prompt],
                 generation_config=self.generation_config,
                 safety_settings=self.safety_settings
             )
             generated_text = response.text
-            
+            call['response'] = response
+            self._record_usage(estimated_tokens, response)
+
             self.logger.info(f"Content generation successful: \n'{truncate_text(generated_text)}'")
             return generated_text
-        except ResourceExhausted as e:
-            self.logger.warning(f"ResourceExhausted error encountered. Retrying in 15 seconds. Error: {str(e)}")
-            raise  # This will trigger the retry
+        except ResourceExhausted:
+            self._record_throttled()
+            raise  # This will trigger the retry, unless it was the last attempt
         except Exception as e:
             self.logger.error(
                 f"Error during content generation: {str(e)}",
                 exc_info=True
             )
             raise
+
+    @retry(
+        retry=retry_if_exception_type(ResourceExhausted),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=15, max=60),
+        before_sleep=_record_retry,
+        reraise=True
+    )
+    async def _open_stream(self, user_prompt: str) -> Tuple[asyncio.Queue, object, threading.Event, dict]:
+        """
+        Start a streaming request in a worker thread that feeds an asyncio queue, and wait for its
+        first item. Only this part is retried: once text has been handed out, a retry would repeat it.
+        The queue is bounded, so a slow consumer holds the worker back instead of buffering the
+        whole response.
+
+        :return: The queue, the first item taken from it, an event that stops the worker, and a dict
+            with the quota wait that receives the last usage metadata of the stream.
+        """
+        estimated_tokens, waited = await self._admit(user_prompt)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        stop = threading.Event()
+        usage = {'estimated_tokens': estimated_tokens, 'queue_wait': waited, 'response': None}
+
+        def put(item) -> bool:
+            """Hand an item to the consumer. False if it is gone and the worker should exit."""
+            try:
+                future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            except RuntimeError:
+                # The event loop has been closed
+                return False
+            deadline = time.monotonic() + STREAM_STALL_SECONDS
+            while True:
+                try:
+                    future.result(timeout=STREAM_PUT_POLL_SECONDS)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if stop.is_set() or loop.is_closed():
+                        future.cancel()
+                        return False
+                    if time.monotonic() >= deadline:
+                        future.cancel()
+                        self.logger.warning(f"Stream consumer took nothing for {STREAM_STALL_SECONDS:.0f}s; "
+                                            f"abandoning the stream")
+                        return False
+
+        def produce():
+            try:
+                responses = self.model.generate_content(
+                    [user_prompt],
+                    generation_config=self.generation_config,
+                    safety_settings=self.safety_settings,
+                    stream=True
+                )
+                for response in responses:
+                    if stop.is_set():
+                        return
+                    if getattr(response, 'usage_metadata', None) is not None:
+                        usage['response'] = response
+                    try:
+                        delta = response.text
+                    except ValueError:
+                        # A chunk carrying only the finish reason or safety ratings has no text
+                        continue
+                    if not put(delta):
+                        return
+                put(None)
+            except Exception as e:
+                if not stop.is_set():
+                    put(e)
+
+        self.requests['stream'] += 1
+        loop.run_in_executor(None, produce)
+        first_item = await queue.get()
+        if isinstance(first_item, ResourceExhausted):
+            self._record_throttled()
+            raise first_item
+        return queue, first_item, stop, usage
+
+    async def generate_content_stream(self, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Generates content based on the user prompt, yielding the text as the model produces it.
+        The complete response is cached like generate_content's; a cached response is yielded at once.
+        Implements retry logic for ResourceExhausted errors raised before any text has arrived.
+        :param user_prompt: The input prompt from the user.
+        :return: Async iterator of text deltas.
+        """
+        start_time = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.model_name, self.generation_config, user_prompt)
+            cached_text = await self.cache.get(key)
+            if cached_text is not None:
+                self.logger.info(f"Using cached response for prompt {key[:12]} ({len(cached_text)} chars)")
+                self._record_call(user_prompt, start_time, cache_hit=True)
+                yield cached_text
+                return
+
+        self.logger.info(f"Streaming content for prompt: \n'{truncate_text(user_prompt)}'")
+        try:
+            queue, item, stop, usage = await self._open_stream(user_prompt)
+        except Exception:
+            self._record_error(user_prompt)
+            raise
+        first_delta_seconds = time.perf_counter() - start_time
+        parts = []
+        try:
+            while item is not None:
+                if isinstance(item, Exception):
+                    self.logger.error(f"Error during content generation: {str(item)}")
+                    self._record_error(user_prompt)
+                    raise item
+                if item:
+                    parts.append(item)
+                    yield item
+                item = await queue.get()
+        finally:
+            # If the consumer gave up early, stop the worker and unblock a pending put
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+
+        generated_text = ''.join(parts)
+        self._record_usage(usage['estimated_tokens'], usage['response'])
+        self._record_call(user_prompt, start_time, usage['queue_wait'], usage['response'],
+                          first_delta_seconds=first_delta_seconds)
+        self.logger.info(f"Content streaming successful: {len(parts)} deltas, first after "
+                         f"{first_delta_seconds:.2f}s, complete after {time.perf_counter() - start_time:.2f}s: "
+                         f"\n'{truncate_text(generated_text)}'")
+        if key is not None:
+            await self.cache.put(key, generated_text, self.model_name)
+
+
+class ContentGeneratorRegistry:
+    """
+    Process-wide ContentGenerators keyed by model name. Creating a generator initializes Vertex AI
+    and builds the model and its client; doing that once and sharing the generator between requests
+    (and threads) removes that setup from every request and keeps every call on the same client.
+    stats() reports how many model instances (each holding one client) exist per backend and how many
+    calls each has served. The gRPC channel under a client is managed by the Vertex AI SDK and its
+    reconnects are not visible here, so these figures show client reuse, not channel reuse.
+    """
+
+    def __init__(self, cache: Optional[LLMResponseCache] = None, governor: Optional[QuotaGovernor] = None,
+                 factory=ContentGenerator):
+        """
+        :param cache: Response cache given to every generator created.
+        :param governor: Quota governor given to every generator created.
+        :param factory: Called as factory(model_name, cache=cache, governor=governor) to create a generator.
+        """
+        self.cache = cache
+        self.governor = governor
+        self.factory = factory
+        self._generators = {}
+        self._lock = threading.Lock()
+        self._counters = {'created': 0, 'reused': 0}
+        self._warmup_seconds = {}
+
+    def get(self, model_name: Optional[str] = None) -> ContentGenerator:
+        """Return the generator for a model, creating it on first use."""
+        model_name = model_name or DEFAULT_MODEL_NAME
+        generator = self._generators.get(model_name)
+        if generator is None:
+            with self._lock:
+                generator = self._generators.get(model_name)
+                if generator is None:
+                    start_time = time.perf_counter()
+                    generator = self.factory(model_name, cache=self.cache, governor=self.governor)
+                    self._generators[model_name] = generator
+                    self._counters['created'] += 1
+                    logger.info(f"Created content generator for {model_name} in {time.perf_counter() - start_time:.2f}s")
+                    return generator
+        self._counters['reused'] += 1
+        return generator
+
+    async def warmup(self, model_names: Optional[List[str]] = None, send_request: bool = False) -> None:
+        """
+        Create generators off the event loop and optionally send each model a short request, so the
+        first article does not pay for client setup and connection establishment. Failures are
+        logged, not raised.
+        """
+        for model_name in model_names or [DEFAULT_MODEL_NAME]:
+            try:
+                generator = await asyncio.to_thread(self.get, model_name)
+                if send_request:
+                    start_time = time.perf_counter()
+                    # Bypasses the cache: the point is to open the connection
+                    await asyncio.to_thread(generator.model.generate_content, [WARMUP_PROMPT],
+                                            generation_config={"max_output_tokens": 5, "temperature": 0})
+                    self._warmup_seconds[generator.model_name] = round(time.perf_counter() - start_time, 3)
+                    logger.info(f"Warmed up {generator.model_name} in {self._warmup_seconds[generator.model_name]:.2f}s")
+            except Exception as e:
+                logger.error(f"Failed to preload content generator '{model_name}': {str(e)}")
+
+    def stats(self):
+        generators = dict(self._generators)
+        model_instances: dict = {}
+        for generator in generators.values():
+            backend_name = getattr(getattr(generator, 'backend', None), 'name', 'unknown')
+            model_instances[backend_name] = model_instances.get(backend_name, 0) + 1
+        calls = sum(sum(generator.requests.values()) for generator in generators.values())
+        return {
+            **self._counters,
+            'vertexai_initialized': VertexBackend.initialized,
+            'backend': get_backend().stats(),
+            # Requests sent through each model instance, and instances (clients) per backend
+            'models': {name: {**generator.requests, 'calls': sum(generator.requests.values())}
+                       for name, generator in generators.items()},
+            'model_instances': model_instances,
+            'calls_per_model_instance': round(calls / len(generators), 1) if generators else 0,
+            'warmup_seconds': dict(self._warmup_seconds),
+        }
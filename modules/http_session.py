@@ -0,0 +1,119 @@
+# modules/http_session.py
+
+"""
+HTTP Session Manager
+This module provides a process-wide pooled aiohttp ClientSession for the scraper. The session is
+created on application startup and closed on shutdown, so every article fetch reuses pooled
+keep-alive connections and cached DNS lookups instead of paying a new TCP+TLS handshake.
+Connection reuse and DNS cache counters are collected through aiohttp tracing and exposed
+through stats().
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("http_session")
+
+
+class HttpSessionManager:
+    """
+    Owns a single aiohttp ClientSession shared by all scrapers in the process.
+    The session is bound to the event loop it was created on; if it is requested from a
+    different loop it is transparently rebuilt.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 8, ttl_dns_cache: int = 300,
+                 keepalive_timeout: float = 30.0, verify_ssl: bool = True):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.verify_ssl = verify_ssl
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._counters = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+        }
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Count requests, new/reused connections and DNS cache hits."""
+        trace_config = aiohttp.TraceConfig()
+
+        def counter(name):
+            async def _increment(session, context, params):
+                self._counters[name] += 1
+            return _increment
+
+        trace_config.on_request_start.append(counter('requests'))
+        trace_config.on_connection_create_end.append(counter('connections_created'))
+        trace_config.on_connection_reuseconn.append(counter('connections_reused'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace_config
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Create the shared session on the running loop if it does not exist yet."""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            # A session from another loop can't be closed from here; drop the reference.
+            self._session = None
+            self._loop = loop
+
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=self.ttl_dns_cache,
+                    use_dns_cache=True,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ssl=None if self.verify_ssl else False,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    trace_configs=[self._build_trace_config()]
+                )
+                logger.info(f"Shared HTTP session created (limit={self.limit}, "
+                            f"limit_per_host={self.limit_per_host}, ttl_dns_cache={self.ttl_dns_cache}s)")
+        return self._session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it lazily if startup has not run."""
+        return await self.start()
+
+    async def close(self) -> None:
+        """Close the shared session and its connector."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"Shared HTTP session closed. Stats: {self.stats()}")
+        self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection reuse and DNS cache counters."""
+        stats = dict(self._counters)
+        total_connections = stats['connections_created'] + stats['connections_reused']
+        stats['connection_reuse_ratio'] = (
+            round(stats['connections_reused'] / total_connections, 3) if total_connections else 0.0
+        )
+        stats['active'] = self._session is not None and not self._session.closed
+        stats['limit'] = self.limit
+        stats['limit_per_host'] = self.limit_per_host
+        return stats
+
+
+# Process-wide session manager shared by all scrapers
+session_manager = HttpSessionManager()
@@ -0,0 +1,49 @@
+# modules/lazy_imports.py
+
+"""
+Lazy Imports
+Heavy third-party modules (spaCy, Vertex AI, Cloud Text-to-Speech, pydub, Cloud Logging) are
+imported on first use rather than when the application starts, so routes that never need them do
+not pay for them and a cold instance starts serving sooner. The first import of each module is
+timed and logged, which shows where that cost lands at runtime; `helper scripts/profile_imports.py`
+reports the import-time cost of the startup path itself.
+"""
+
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("lazy_imports")
+
+_import_seconds: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module on first use and return it; later calls return the loaded module.
+
+    :param name: Dotted module name, e.g. 'vertexai.generative_models'.
+    :return: The imported module.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        already_loaded = name in sys.modules
+        start_time = time.perf_counter()
+        module = importlib.import_module(name)
+        if not already_loaded:
+            _import_seconds[name] = time.perf_counter() - start_time
+            logger.info(f"Imported {name} on first use in {_import_seconds[name]:.3f}s")
+    return module
+
+
+def import_stats() -> Dict[str, float]:
+    """Seconds spent on each deferred import so far."""
+    return {name: round(seconds, 3) for name, seconds in _import_seconds.items()}
@@ -0,0 +1,284 @@
+# modules/llm_backends.py
+
+"""
+Language Model Backends
+ContentGenerator calls a model object with the Vertex AI GenerativeModel interface:
+    model.generate_content([prompt], generation_config=..., safety_settings=..., stream=False)
+returning a response with .text and .usage_metadata, or an iterator of such chunks when streaming.
+A backend creates those model objects.
+- VertexBackend: the real Gemini models on Vertex AI (the default).
+- FakeBackend: a local stand-in that returns the article from the prompt (optionally run through the
+  TTS normalizer) after a simulated latency and token rate, streams it in chunks, and raises
+  ResourceExhausted at a configurable rate. It makes load and latency tests of /process possible
+  without network access or spending quota, and lets our own overhead be measured against a known
+  model time.
+
+LLM_BACKEND selects the backend: 'vertex' or 'fake'. The fake is configured with FAKE_LLM_* variables.
+"""
+
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from google.api_core.exceptions import ResourceExhausted
+
+from modules.chunked_generation import CHARS_PER_TOKEN, estimate_tokens
+from modules.common_logger import setup_logger
+from modules.config import ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT
+from modules.lazy_imports import lazy_import
+from modules.tts_normalizer import normalize_for_tts
+
+logger = setup_logger("llm_backends")
+
+PROJECT_ID = 'resewrch-agent'  # Replace with your GCP project ID
+
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'vertex').lower()
+
+# Fake backend: seconds before the first token, drawn from a distribution
+# ('constant', 'uniform' between mean - jitter and mean + jitter, or 'lognormal' with sigma jitter),
+# then output tokens at a fixed rate
+FAKE_LLM_LATENCY = float(os.getenv('FAKE_LLM_LATENCY', '0.8'))
+FAKE_LLM_LATENCY_JITTER = float(os.getenv('FAKE_LLM_LATENCY_JITTER', '0.3'))
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv('FAKE_LLM_LATENCY_DISTRIBUTION', 'lognormal').lower()
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv('FAKE_LLM_TOKENS_PER_SECOND', '150'))
+FAKE_LLM_STREAM_CHUNK_TOKENS = int(os.getenv('FAKE_LLM_STREAM_CHUNK_TOKENS', '20'))
+FAKE_LLM_ERROR_RATE = float(os.getenv('FAKE_LLM_ERROR_RATE', '0'))
+# 'echo' returns the article unchanged, 'normalize' runs it through the TTS normalizer
+FAKE_LLM_TRANSFORM = os.getenv('FAKE_LLM_TRANSFORM', 'echo').lower()
+FAKE_LLM_SEED = os.getenv('FAKE_LLM_SEED')
+
+
+class ModelBackend:
+    """Creates model objects for ContentGenerator."""
+
+    name = 'base'
+
+    def create_model(self, model_name: str):
+        """
+        :param model_name: Model to create, e.g. 'gemini-1.5-flash-002'.
+        :return: An object with the GenerativeModel generate_content interface.
+        """
+        raise NotImplementedError
+
+    def safety_settings(self) -> list:
+        """Safety settings passed with every call."""
+        return []
+
+    def stats(self) -> Dict:
+        return {'backend': self.name}
+
+
+class VertexBackend(ModelBackend):
+    """Gemini models on Vertex AI. The SDK is initialized once per process, on the first model."""
+
+    name = 'vertex'
+    initialized = False
+    _lock = threading.Lock()
+
+    def __init__(self, project_id: str = PROJECT_ID):
+        self.project_id = project_id
+
+    def _init_vertexai(self) -> None:
+        if VertexBackend.initialized:
+            return
+        with VertexBackend._lock:
+            if not VertexBackend.initialized:
+                # Vertex AI is imported on first use; it is not needed to serve most routes
+                lazy_import('vertexai').init(project=self.project_id)
+                VertexBackend.initialized = True
+                logger.info(f"Vertex AI initialized for project {self.project_id}")
+
+    def create_model(self, model_name: str):
+        self._init_vertexai()
+        return lazy_import('vertexai.generative_models').GenerativeModel(model_name)
+
+    def safety_settings(self) -> list:
+        return self.default_safety_settings()
+
+    @staticmethod
+    def default_safety_settings() -> List['SafetySetting']:
+        """
+        Defines default safety settings.
+
+        :return: List of default SafetySetting instances.
+        """
+        SafetySetting = lazy_import('vertexai.generative_models').SafetySetting
+        return [
+            SafetySetting(
+                category=SafetySetting.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+                threshold=SafetySetting.HarmBlockThreshold.OFF
+            ),
+            SafetySetting(
+                category=SafetySetting.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+                threshold=SafetySetting.HarmBlockThreshold.OFF
+            ),
+            SafetySetting(
+                category=SafetySetting.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+                threshold=SafetySetting.HarmBlockThreshold.OFF
+            ),
+            SafetySetting(
+                category=SafetySetting.HarmCategory.HARM_CATEGORY_HARASSMENT,
+                threshold=SafetySetting.HarmBlockThreshold.OFF
+            ),
+        ]
+
+    def stats(self) -> Dict:
+        return {'backend': self.name, 'vertexai_initialized': VertexBackend.initialized}
+
+
+def extract_article_text(prompt: str,
+                         templates: Sequence[str] = (ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT)) -> str:
+    """The text a prompt template was formatted with, or the whole prompt if no template matches."""
+    for template in templates:
+        prefix, _, suffix = template.partition('{article_text}')
+        if prompt.startswith(prefix) and prompt.endswith(suffix) and len(prompt) >= len(prefix) + len(suffix):
+            return prompt[len(prefix):len(prompt) - len(suffix)]
+    return prompt
+
+
+TRANSFORMS: Dict[str, Callable[[str], str]] = {
+    'echo': extract_article_text,
+    'normalize': lambda prompt: normalize_for_tts(extract_article_text(prompt)),
+}
+
+
+class FakeModel:
+    """A GenerativeModel stand-in whose timing and failures are simulated; see FakeBackend."""
+
+    def __init__(self, model_name: str, backend: 'FakeBackend'):
+        self.model_name = model_name
+        self.backend = backend
+
+    def generate_content(self, contents, generation_config=None, safety_settings=None, stream=False):
+        prompt = contents[0] if isinstance(contents, (list, tuple)) else contents
+        backend = self.backend
+        # Time to first token, then the quota check, as the API answers ResourceExhausted up front
+        backend.sleep(backend.sample_latency())
+        backend.record_call()
+        if backend.should_fail():
+            raise ResourceExhausted("429 Quota exceeded (simulated by the fake backend)")
+
+        text = backend.transform(prompt)
+        max_output_tokens = (generation_config or {}).get('max_output_tokens')
+        if max_output_tokens:
+            text = text[:max_output_tokens * CHARS_PER_TOKEN]
+        prompt_tokens = estimate_tokens(prompt)
+        if stream:
+            return self._stream(text, prompt_tokens)
+        backend.sleep(estimate_tokens(text) / backend.tokens_per_second)
+        return self._response(text, prompt_tokens, estimate_tokens(text))
+
+    def _stream(self, text: str, prompt_tokens: int) -> Iterator[SimpleNamespace]:
+        chunk_chars = self.backend.stream_chunk_tokens * CHARS_PER_TOKEN
+        for start in range(0, len(text), chunk_chars):
+            chunk = text[start:start + chunk_chars]
+            self.backend.sleep(estimate_tokens(chunk) / self.backend.tokens_per_second)
+            yield SimpleNamespace(text=chunk, usage_metadata=None)
+        # Like the API, the last chunk carries the usage of the whole call
+        yield self._response('', prompt_tokens, estimate_tokens(text))
+
+    @staticmethod
+    def _response(text: str, prompt_tokens: int, output_tokens: int) -> SimpleNamespace:
+        return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens
+        ))
+
+
+class FakeBackend(ModelBackend):
+    """
+    Local models for load and latency testing. A call sleeps for a sampled time to first token, fails
+    with ResourceExhausted with probability error_rate, and otherwise returns transform(prompt) at
+    tokens_per_second (in chunks of stream_chunk_tokens when streaming). The sleeps run in the worker
+    thread ContentGenerator calls the model from, as the real client blocks there.
+    """
+
+    name = 'fake'
+
+    def __init__(self,
+                 latency: float = FAKE_LLM_LATENCY,
+                 jitter: float = FAKE_LLM_LATENCY_JITTER,
+                 distribution: str = FAKE_LLM_LATENCY_DISTRIBUTION,
+                 tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND,
+                 stream_chunk_tokens: int = FAKE_LLM_STREAM_CHUNK_TOKENS,
+                 error_rate: float = FAKE_LLM_ERROR_RATE,
+                 transform: Optional[Callable[[str], str]] = None,
+                 seed: Optional[int] = None):
+        if distribution not in ('constant', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution '{distribution}'")
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.tokens_per_second = tokens_per_second
+        self.stream_chunk_tokens = max(1, stream_chunk_tokens)
+        self.error_rate = error_rate
+        self.transform = transform or TRANSFORMS[FAKE_LLM_TRANSFORM]
+        self._random = random.Random(seed if seed is not None else FAKE_LLM_SEED)
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'errors': 0, 'simulated_seconds': 0.0}
+
+    def sample_latency(self) -> float:
+        with self._lock:
+            if self.distribution == 'uniform':
+                return max(0.0, self._random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+            if self.distribution == 'lognormal' and self.latency > 0:
+                # Median at `latency`, with a long tail like real model latencies
+                return self.latency * self._random.lognormvariate(0, self.jitter)
+            return self.latency
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self._counters['errors'] += 1
+            return failed
+
+    def sleep(self, seconds: float) -> None:
+        """Block the calling thread for simulated model time, and count it."""
+        with self._lock:
+            self._counters['simulated_seconds'] += seconds
+        time.sleep(seconds)
+
+    def record_call(self) -> None:
+        with self._lock:
+            self._counters['calls'] += 1
+
+    def create_model(self, model_name: str) -> FakeModel:
+        return FakeModel(model_name, self)
+
+    def stats(self) -> Dict:
+        return {
+            'backend': self.name,
+            **self._counters,
+            'simulated_seconds': round(self._counters['simulated_seconds'], 3),
+            'latency': self.latency,
+            'distribution': self.distribution,
+            'tokens_per_second': self.tokens_per_second,
+            'error_rate': self.error_rate,
+        }
+
+
+BACKENDS = {'vertex': VertexBackend, 'fake': FakeBackend}
+_backends: Dict[str, ModelBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None) -> ModelBackend:
+    """
+    The process-wide backend named by LLM_BACKEND (or `name`), created on first use.
+
+    :raises ValueError: If the name is not a known backend.
+    """
+    name = (name or LLM_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}'; expected one of {', '.join(BACKENDS)}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+            if name != 'vertex':
+                logger.warning(f"Using the '{name}' language model backend; responses are simulated")
+        return _backends[name]
@@ -0,0 +1,138 @@
+# modules/llm_cache.py
+
+"""
+LLM Response Cache
+Generation runs at temperature 0, so the same prompt sent to the same model with the same
+generation config returns the same text. This module caches responses under a hash of those
+three inputs, so re-processing an article, retrying after a later stage failed, or a duplicate
+submission does not call the model again. Responses are kept in an in-memory LRU in front of a
+persistent store (the Firestore 'llm_cache' collection); entries expire after a TTL in both tiers.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("llm_cache")
+
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() != 'false'
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '500'))
+LLM_CACHE_TTL_SECONDS = float(os.getenv('LLM_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+
+
+def cache_key(model_name: str, generation_config: Dict[str, Any], prompt: str) -> str:
+    """
+    Content address of a generation request.
+
+    :param model_name: The model the prompt is sent to.
+    :param generation_config: Generation parameters; key order does not matter.
+    :param prompt: The full prompt text.
+    :return: Hex sha256 digest, usable as a Firestore document ID.
+    """
+    request = json.dumps([model_name, generation_config, prompt], sort_keys=True, default=str)
+    return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Prompt hash -> generated text. The persistent store is reached through the coroutine
+    functions passed in, so the cache itself has no database dependency:
+        lookup(key) -> Optional[(text, created_at)]     stored response and its epoch time
+        store(key, text, model_name, created_at) -> bool  persist a response
+    """
+
+    def __init__(self,
+                 lookup: Optional[Callable[[str], Awaitable[Optional[Tuple[str, float]]]]] = None,
+                 store: Optional[Callable[[str, str, str, float], Awaitable[bool]]] = None,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 enabled: bool = LLM_CACHE_ENABLED):
+        self.lookup = lookup
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        self._counters = {'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'expired': 0,
+                          'store_errors': 0, 'saved_chars': 0}
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return time.time() - created_at < self.ttl_seconds
+
+    def _remember(self, key: str, text: str, created_at: float) -> None:
+        self._entries[key] = (text, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for a key, or None if there is no fresh entry.
+
+        :param key: Key from cache_key.
+        :return: The generated text, or None.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._is_fresh(entry[1]):
+                self._entries.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                self._counters['saved_chars'] += len(entry[0])
+                return entry[0]
+            del self._entries[key]
+            self._counters['expired'] += 1
+
+        if self.lookup is not None:
+            try:
+                stored = await self.lookup(key)
+            except Exception as e:
+                self._counters['store_errors'] += 1
+                logger.warning(f"LLM cache lookup failed for {key[:12]}: {e}")
+                stored = None
+            if stored is not None:
+                text, created_at = stored
+                if self._is_fresh(created_at):
+                    self._counters['store_hits'] += 1
+                    self._counters['saved_chars'] += len(text)
+                    self._remember(key, text, created_at)
+                    return text
+                self._counters['expired'] += 1
+
+        self._counters['misses'] += 1
+        return None
+
+    async def put(self, key: str, text: str, model_name: str) -> None:
+        """Cache a response in memory and in the persistent store."""
+        if not self.enabled or not text:
+            return
+        created_at = time.time()
+        self._remember(key, text, created_at)
+        if self.store is None:
+            return
+        try:
+            await self.store(key, text, model_name, created_at)
+        except Exception as e:
+            self._counters['store_errors'] += 1
+            logger.warning(f"Failed to persist LLM cache entry {key[:12]}: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-memory tier."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self._counters['memory_hits'] + self._counters['store_hits']
+        lookups = hits + self._counters['misses']
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            **self._counters
+        }
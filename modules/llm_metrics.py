@@ -0,0 +1,260 @@
+# modules/llm_metrics.py
+
+"""
+Language Model Call Metrics
+Records every ContentGenerator call: wall time, time to first text (streaming), time queued for
+quota, input and output tokens from the response usage metadata, estimated cost, cache hits,
+ResourceExhausted retries and errors. Calls are tagged by prompt type (the template the prompt was
+formatted from: clean, readability, other) and model, and aggregated two ways:
+- process-wide histograms per (prompt type, model), served by /metrics;
+- a summary per job, collected while job_llm_metrics() is active and logged when it exits, so the
+  job's log shows how its time split between the clean and readability passes.
+Histograms have fixed exponential buckets, so recording is constant time and memory; percentiles
+are estimated as the upper bound of the bucket they fall in.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from modules.common_logger import setup_logger
+from modules.config import ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT
+
+logger = setup_logger("llm_metrics")
+
+# USD per million tokens (Gemini 1.5 Flash list price, prompts up to 128k tokens)
+LLM_COST_PER_MILLION_INPUT_TOKENS = float(os.getenv('LLM_COST_PER_MILLION_INPUT_TOKENS', '0.075'))
+LLM_COST_PER_MILLION_OUTPUT_TOKENS = float(os.getenv('LLM_COST_PER_MILLION_OUTPUT_TOKENS', '0.30'))
+
+# Prompt type -> template; a prompt formatted from a template starts with the text before {article_text}
+PROMPT_TEMPLATES = {
+    'clean': ARTICLE_CLEAN_PROMPT,
+    'readability': ARTICLE_IMPROVE_READABILITY_PROMPT,
+}
+_PROMPT_PREFIXES = [(name, template.partition('{article_text}')[0]) for name, template in PROMPT_TEMPLATES.items()]
+
+
+def prompt_type(prompt: str) -> str:
+    """The name of the template a prompt was formatted from, or 'other'."""
+    for name, prefix in _PROMPT_PREFIXES:
+        if prompt.startswith(prefix):
+            return name
+    return 'other'
+
+
+def exponential_bounds(start: float, factor: float, count: int) -> List[float]:
+    return [start * factor ** index for index in range(count)]
+
+
+SECONDS_BOUNDS = exponential_bounds(0.01, 2, 17)     # 10ms .. ~11 minutes
+TOKEN_BOUNDS = exponential_bounds(16, 2, 16)         # 16 .. ~500k tokens
+COST_BOUNDS = exponential_bounds(0.000001, 4, 12)    # $0.000001 .. ~$4
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets, plus count, sum, min and max."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        # One count per bucket upper bound, and one for values above the last bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations (the maximum in the last)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6),
+            'min': round(self.min, 6),
+            'p50': round(self.percentile(0.50), 6),
+            'p95': round(self.percentile(0.95), 6),
+            'p99': round(self.percentile(0.99), 6),
+            'max': round(self.max, 6),
+            # Bucket upper bound -> observations, for the non-empty buckets
+            'buckets': {(f"{bound:g}" if index < len(self.bounds) else '+Inf'): bucket_count
+                        for index, (bound, bucket_count)
+                        in enumerate(zip(self.bounds + [float('inf')], self.counts)) if bucket_count},
+        }
+
+
+class CallMetrics:
+    """Histograms and counters for the calls of one prompt type to one model."""
+
+    def __init__(self):
+        self.counters = {'calls': 0, 'cache_hits': 0, 'retries': 0, 'errors': 0}
+        self.histograms = {
+            'wall_seconds': Histogram(SECONDS_BOUNDS),
+            'first_delta_seconds': Histogram(SECONDS_BOUNDS),
+            'queue_wait_seconds': Histogram(SECONDS_BOUNDS),
+            'input_tokens': Histogram(TOKEN_BOUNDS),
+            'output_tokens': Histogram(TOKEN_BOUNDS),
+            'cost_usd': Histogram(COST_BOUNDS),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.counters, **{name: histogram.snapshot() for name, histogram in self.histograms.items()}}
+
+
+def call_cost(input_tokens: Optional[int], output_tokens: Optional[int]) -> Optional[float]:
+    if input_tokens is None and output_tokens is None:
+        return None
+    return ((input_tokens or 0) * LLM_COST_PER_MILLION_INPUT_TOKENS
+            + (output_tokens or 0) * LLM_COST_PER_MILLION_OUTPUT_TOKENS) / 1e6
+
+
+# Per-job summary of the calls made by the current task and the tasks it starts. A ContextVar,
+# like the job ID, so concurrent batch items each collect their own.
+_job_metrics = contextvars.ContextVar('llm_job_metrics', default=None)
+
+
+@contextmanager
+def job_llm_metrics():
+    """
+    Collect a summary of the language model calls made inside the block, and log it on exit.
+    Usage:
+    with job_context(job_id), job_llm_metrics() as summary:
+        await generate_article_text(content)
+    """
+    summary: Dict[str, Dict[str, float]] = {}
+    token = _job_metrics.set(summary)
+    try:
+        yield summary
+    finally:
+        _job_metrics.reset(token)
+        if summary:
+            logger.info("Language model calls: " + "; ".join(
+                f"{name} {totals['calls']} calls ({totals['cache_hits']} cached, {totals['retries']} retries) "
+                f"{totals['wall_seconds']:.2f}s, {totals['queue_wait_seconds']:.2f}s queued, "
+                f"{totals['input_tokens']} in / {totals['output_tokens']} out tokens, ${totals['cost_usd']:.5f}"
+                for name, totals in summary.items()
+            ))
+
+
+def get_job_llm_metrics() -> Optional[Dict[str, Dict[str, float]]]:
+    """The summary collected by the enclosing job_llm_metrics(), or None outside one."""
+    return _job_metrics.get()
+
+
+class LLMMetrics:
+    """Process-wide language model call metrics keyed by (prompt type, model)."""
+
+    def __init__(self):
+        self._metrics: Dict[tuple, CallMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, prompt_name: str, model_name: str) -> CallMetrics:
+        key = (prompt_name, model_name)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics.setdefault(key, CallMetrics())
+        return metrics
+
+    def _job_totals(self, prompt_name: str) -> Optional[Dict[str, float]]:
+        summary = _job_metrics.get()
+        if summary is None:
+            return None
+        return summary.setdefault(prompt_name, {
+            'calls': 0, 'cache_hits': 0, 'retries': 0, 'errors': 0, 'wall_seconds': 0.0,
+            'queue_wait_seconds': 0.0, 'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0,
+        })
+
+    def record_call(self, prompt: str, model_name: str, wall_seconds: float, queue_wait_seconds: float = 0.0,
+                    input_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+                    first_delta_seconds: Optional[float] = None, cache_hit: bool = False) -> None:
+        """
+        Record a completed call.
+
+        :param prompt: The prompt sent, used to find its prompt type.
+        :param model_name: Model called.
+        :param wall_seconds: Time from the call to the complete response, including queueing and retries.
+        :param queue_wait_seconds: Time spent waiting for the quota governor.
+        :param input_tokens: prompt_token_count from the usage metadata, if reported.
+        :param output_tokens: candidates_token_count from the usage metadata, if reported.
+        :param first_delta_seconds: Time to the first streamed text, for streaming calls.
+        :param cache_hit: The response came from the cache; the model was not called.
+        """
+        prompt_name = prompt_type(prompt)
+        cost = None if cache_hit else call_cost(input_tokens, output_tokens)
+        with self._lock:
+            metrics = self._get(prompt_name, model_name)
+            metrics.counters['calls'] += 1
+            histograms = metrics.histograms
+            histograms['wall_seconds'].observe(wall_seconds)
+            if cache_hit:
+                metrics.counters['cache_hits'] += 1
+            else:
+                histograms['queue_wait_seconds'].observe(queue_wait_seconds)
+                if first_delta_seconds is not None:
+                    histograms['first_delta_seconds'].observe(first_delta_seconds)
+                if input_tokens is not None:
+                    histograms['input_tokens'].observe(input_tokens)
+                if output_tokens is not None:
+                    histograms['output_tokens'].observe(output_tokens)
+                if cost is not None:
+                    histograms['cost_usd'].observe(cost)
+
+        totals = self._job_totals(prompt_name)
+        if totals is not None:
+            totals['calls'] += 1
+            totals['cache_hits'] += int(cache_hit)
+            totals['wall_seconds'] += wall_seconds
+            totals['queue_wait_seconds'] += queue_wait_seconds
+            totals['input_tokens'] += input_tokens or 0
+            totals['output_tokens'] += output_tokens or 0
+            totals['cost_usd'] += cost or 0.0
+
+    def record_retry(self, prompt: str, model_name: str) -> None:
+        """A call was answered ResourceExhausted and will be retried."""
+        self._count(prompt, model_name, 'retries')
+
+    def record_error(self, prompt: str, model_name: str) -> None:
+        """A call failed for good."""
+        self._count(prompt, model_name, 'errors')
+
+    def _count(self, prompt: str, model_name: str, counter: str) -> None:
+        prompt_name = prompt_type(prompt)
+        with self._lock:
+            self._get(prompt_name, model_name).counters[counter] += 1
+        totals = self._job_totals(prompt_name)
+        if totals is not None:
+            totals[counter] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {f"{prompt_name}/{model_name}": metrics.snapshot()
+                    for (prompt_name, model_name), metrics in sorted(self._metrics.items())}
+
+
+# Metrics of every language model call in this process
+llm_metrics = LLMMetrics()
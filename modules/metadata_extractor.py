@@ -0,0 +1,203 @@
+# modules/metadata_extractor.py
+
+"""
+Head Metadata Extractor
+This module reads article metadata (title, author, date, description, canonical URL) from the
+<head> of a page with an incremental tokenizer. It can be fed chunks while the body is still
+downloading and stops as soon as the head ends, so metadata never requires a second pass over
+the body. Sources are used in priority order:
+    JSON-LD (NewsArticle, Article, BlogPosting, ...) > OpenGraph > Twitter cards > <meta> > <title>
+"""
+
+import json
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+from dateutil import parser as date_parser
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("metadata_extractor")
+
+# schema.org types whose JSON-LD describes the article itself
+ARTICLE_TYPES = {
+    'Article', 'NewsArticle', 'ReportageNewsArticle', 'AnalysisNewsArticle', 'OpinionNewsArticle',
+    'BackgroundNewsArticle', 'ReviewNewsArticle', 'BlogPosting', 'LiveBlogPosting', 'TechArticle',
+    'ScholarlyArticle', 'Report'
+}
+
+METADATA_FIELDS = ('title', 'author', 'date', 'description', 'canonical_url')
+
+# Meta tag names/properties per field, highest priority first, grouped by source
+META_SOURCES = {
+    'opengraph': {
+        'title': ['og:title'],
+        'author': ['article:author', 'og:article:author'],
+        'date': ['article:published_time', 'og:article:published_time'],
+        'description': ['og:description'],
+        'canonical_url': ['og:url'],
+    },
+    'twitter': {
+        'title': ['twitter:title'],
+        'description': ['twitter:description'],
+    },
+    'meta': {
+        'author': ['author', 'byl', 'parsely-author', 'sailthru.author', 'dc.creator'],
+        'date': ['date', 'pubdate', 'publishdate', 'parsely-pub-date', 'sailthru.date',
+                 'dc.date', 'dc.date.issued', 'dcterms.created'],
+        'description': ['description', 'dc.description'],
+    },
+}
+
+FEED_CHUNK_SIZE = 16384
+
+
+def _normalize_date(value: str) -> str:
+    try:
+        return date_parser.parse(value).isoformat()
+    except (ValueError, OverflowError, TypeError):
+        logger.warning(f"Could not parse date: {value}")
+        return ''
+
+
+def _is_url(value: str) -> bool:
+    # article:author is often a profile URL rather than a name
+    return value.startswith(('http://', 'https://', '/'))
+
+
+def _person_names(value: Any) -> str:
+    """Flatten a JSON-LD author value (string, Person object or list of either) to names."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return _person_names(value.get('name', ''))
+    if isinstance(value, list):
+        names = [_person_names(item) for item in value]
+        return ', '.join(name for name in names if name)
+    return ''
+
+
+def _json_ld_objects(data: Any) -> List[Dict[str, Any]]:
+    """Yield every object in a JSON-LD document, descending into lists and @graph."""
+    if isinstance(data, list):
+        return [obj for item in data for obj in _json_ld_objects(item)]
+    if isinstance(data, dict):
+        return [data] + _json_ld_objects(data.get('@graph', []))
+    return []
+
+
+def _is_article(obj: Dict[str, Any]) -> bool:
+    types = obj.get('@type', [])
+    types = types if isinstance(types, list) else [types]
+    return any(t in ARTICLE_TYPES for t in types)
+
+
+class HeadMetadataParser(HTMLParser):
+    """
+    Incremental parser for <head> metadata. Call feed() with decoded chunks; once the head has
+    ended, `done` is set and further input is ignored. Call metadata() for the result.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self._meta: Dict[str, str] = {}
+        self._canonical = ''
+        self._title_parts: List[str] = []
+        self._in_title = False
+        self._json_ld_parts: Optional[List[str]] = None
+        self._json_ld_blocks: List[str] = []
+
+    def feed(self, data: str) -> None:
+        if not self.done:
+            super().feed(data)
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'body':
+            self.done = True
+            return
+        attributes = {name.lower(): (value or '') for name, value in attrs}
+        if tag == 'meta':
+            key = (attributes.get('property') or attributes.get('name') or '').strip().lower()
+            content = attributes.get('content', '').strip()
+            if key and content:
+                self._meta.setdefault(key, content)
+        elif tag == 'link':
+            if 'canonical' in attributes.get('rel', '').lower().split() and attributes.get('href'):
+                self._canonical = self._canonical or attributes['href'].strip()
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'script' and attributes.get('type', '').strip().lower() == 'application/ld+json':
+            self._json_ld_parts = []
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
+        elif tag == 'title':
+            self._in_title = False
+        elif tag == 'script' and self._json_ld_parts is not None:
+            self._json_ld_blocks.append(''.join(self._json_ld_parts))
+            self._json_ld_parts = None
+
+    def handle_data(self, data):
+        if self._json_ld_parts is not None:
+            self._json_ld_parts.append(data)
+        elif self._in_title:
+            self._title_parts.append(data)
+
+    def _json_ld_metadata(self) -> Dict[str, str]:
+        for block in self._json_ld_blocks:
+            try:
+                data = json.loads(block)
+            except ValueError:
+                logger.debug("Skipping malformed JSON-LD block")
+                continue
+            for obj in _json_ld_objects(data):
+                if not _is_article(obj):
+                    continue
+                page = obj.get('mainEntityOfPage')
+                page_url = page.get('@id', '') if isinstance(page, dict) else page
+                return {
+                    'title': str(obj.get('headline') or obj.get('name') or '').strip(),
+                    'author': _person_names(obj.get('author')),
+                    'date': str(obj.get('datePublished') or obj.get('dateCreated') or '').strip(),
+                    'description': str(obj.get('description') or '').strip(),
+                    'canonical_url': str(obj.get('url') or page_url or '').strip(),
+                }
+        return {}
+
+    def metadata(self) -> Dict[str, str]:
+        """Return the metadata found so far, filling each field from the highest-priority source."""
+        candidates = [self._json_ld_metadata()]
+        for fields in META_SOURCES.values():
+            candidates.append({field: next((self._meta[name] for name in names if name in self._meta), '')
+                               for field, names in fields.items()})
+        candidates.append({'title': ' '.join(''.join(self._title_parts).split()),
+                           'canonical_url': self._canonical})
+
+        metadata = {field: '' for field in METADATA_FIELDS}
+        for field in METADATA_FIELDS:
+            # <link rel=canonical> is the authoritative canonical URL
+            sources = candidates[::-1] if field == 'canonical_url' else candidates
+            metadata[field] = next((source[field] for source in sources
+                                    if source.get(field) and not (field == 'author' and _is_url(source[field]))), '')
+        if metadata['date']:
+            metadata['date'] = _normalize_date(metadata['date'])
+        return metadata
+
+
+def extract_head_metadata(html_content: str) -> Dict[str, str]:
+    """
+    Extract metadata from the head of a complete HTML document, stopping at the end of the head.
+
+    :param html_content: The HTML document.
+    :return: Dict with title, author, date, description and canonical_url ('' when missing).
+    """
+    parser = HeadMetadataParser()
+    for start in range(0, len(html_content), FEED_CHUNK_SIZE):
+        parser.feed(html_content[start:start + FEED_CHUNK_SIZE])
+        if parser.done:
+            break
+    return parser.metadata()
@@ -0,0 +1,98 @@
+# modules/nlp_registry.py
+
+"""
+NLP Model Registry
+This module holds the sentence segmentation pipelines loaded in the current process. Each backend
+is loaded at most once per process, however many scrapers or threads ask for it, and can be
+preloaded with a warmup document at application startup so the first request does not pay for
+the model load. Load time and resident memory are logged for every pipeline loaded.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import psutil
+
+from modules.common_logger import setup_logger
+from modules.config import initialize_nlp, NLP_BACKEND
+
+logger = setup_logger("nlp_registry")
+
+WARMUP_TEXT = (
+    "The council met on Tuesday. Dr. Smith presented the budget, which includes $4.5 million "
+    "for road repairs.\n\nResidents asked questions. The vote is expected next week."
+)
+
+
+def _rss_mb() -> float:
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+class NLPModelRegistry:
+    """
+    Process-wide cache of loaded pipelines, keyed by backend. Loading is serialised by a lock so
+    concurrent first requests load a backend once; lookups after that do not take the lock.
+    Loaded pipelines are only used for inference, which is safe to share between threads.
+    """
+
+    def __init__(self, default_backend: Optional[str] = None):
+        self.default_backend = default_backend or NLP_BACKEND
+        self._pipelines: Dict[str, Any] = {}
+        self._load_stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, backend: Optional[str] = None):
+        """Return the pipeline for a backend, loading it on first use."""
+        backend = backend or self.default_backend
+        nlp = self._pipelines.get(backend)
+        if nlp is not None:
+            return nlp
+        with self._lock:
+            if backend not in self._pipelines:
+                self._pipelines[backend] = self._load(backend)
+            return self._pipelines[backend]
+
+    def _load(self, backend: str):
+        rss_before = _rss_mb()
+        start_time = time.perf_counter()
+        nlp = initialize_nlp(backend)
+        load_seconds = time.perf_counter() - start_time
+
+        warmup_start = time.perf_counter()
+        nlp(WARMUP_TEXT)
+        warmup_seconds = time.perf_counter() - warmup_start
+
+        rss_after = _rss_mb()
+        self._load_stats[backend] = {
+            'load_seconds': round(load_seconds, 3),
+            'warmup_seconds': round(warmup_seconds, 3),
+            'rss_delta_mb': round(rss_after - rss_before, 1),
+        }
+        logger.info(f"Loaded NLP backend '{backend}' in {load_seconds:.2f}s (warmup {warmup_seconds:.3f}s), "
+                    f"process {os.getpid()} RSS {rss_before:.0f} MB -> {rss_after:.0f} MB")
+        return nlp
+
+    def is_loaded(self, backend: Optional[str] = None) -> bool:
+        return (backend or self.default_backend) in self._pipelines
+
+    async def warmup(self, backends: Optional[Iterable[str]] = None) -> None:
+        """Load and warm up backends off the event loop; failures are logged, not raised."""
+        for backend in backends or [self.default_backend]:
+            try:
+                await asyncio.to_thread(self.get, backend)
+            except Exception as e:
+                logger.error(f"Failed to preload NLP backend '{backend}': {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'default_backend': self.default_backend,
+            'loaded': dict(self._load_stats),
+            'rss_mb': round(_rss_mb(), 1),
+        }
+
+
+# Pipelines loaded in this process, shared by all scrapers and threads
+nlp_registry = NLPModelRegistry()
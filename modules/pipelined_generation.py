@@ -0,0 +1,135 @@
+# modules/pipelined_generation.py
+
+"""
+Pipelined Generation
+The readability pass used to start only after the cleaning pass had returned its whole response,
+so an article cost the sum of two full generations. Here the cleaning pass is streamed: its output
+is cut at paragraph boundaries as it arrives, and each completed group of paragraphs is sent to
+the readability pass straight away while the cleaning pass keeps generating. The readability
+results are joined in order. Timings of both stages are logged and can be collected per call.
+
+Pipelining is off by default. The readability prompt is written for a whole article: run on
+paragraph groups it re-expands acronyms already introduced in an earlier group, lets formatting
+drift between groups, and doubles the number of calls per article. Enable it with
+LLM_PIPELINING_ENABLED=true where first-byte latency matters more than those costs.
+"""
+
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from modules.chunked_generation import estimate_tokens, split_paragraphs
+from modules.common_logger import setup_logger
+
+logger = setup_logger("pipelined_generation")
+
+LLM_PIPELINING_ENABLED = os.getenv('LLM_PIPELINING_ENABLED', 'false').lower() == 'true'
+# Size of the paragraph groups handed to the second pass. Smaller groups start the second pass
+# sooner; larger ones give it more context and fewer requests.
+PIPELINE_GROUP_TOKENS = int(os.getenv('LLM_PIPELINE_GROUP_TOKENS', '600'))
+PIPELINE_CONCURRENCY = int(os.getenv('LLM_PIPELINE_CONCURRENCY', '4'))
+
+
+class ParagraphGrouper:
+    """
+    Collects streamed text and hands out groups of complete paragraphs once they reach a size.
+    A paragraph is complete when the stream has moved past the newline that ends it.
+    """
+
+    def __init__(self, group_tokens: int = PIPELINE_GROUP_TOKENS):
+        self.group_tokens = group_tokens
+        self._pending = ''
+        self._paragraphs: List[str] = []
+        self._tokens = 0
+
+    def feed(self, delta: str) -> List[str]:
+        """
+        Add a piece of streamed text.
+
+        :return: Groups completed by this piece, paragraphs separated by blank lines.
+        """
+        self._pending += delta
+        if '\n' not in self._pending:
+            return []
+        complete, self._pending = self._pending.rsplit('\n', 1)
+        groups = []
+        for paragraph in split_paragraphs(complete):
+            self._paragraphs.append(paragraph)
+            self._tokens += estimate_tokens(paragraph)
+            if self._tokens >= self.group_tokens:
+                groups.append(self._take())
+        return groups
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the stream has ended, or None."""
+        self._paragraphs.extend(split_paragraphs(self._pending))
+        self._pending = ''
+        return self._take() if self._paragraphs else None
+
+    def _take(self) -> str:
+        group = '\n\n'.join(self._paragraphs)
+        self._paragraphs, self._tokens = [], 0
+        return group
+
+
+async def pipelined_passes(first_pass: AsyncIterator[str],
+                           second_pass: Callable[[str], Awaitable[str]],
+                           group_tokens: int = PIPELINE_GROUP_TOKENS,
+                           concurrency: int = PIPELINE_CONCURRENCY,
+                           timings: Optional[Dict[str, float]] = None) -> str:
+    """
+    Feed the streamed output of one generation pass, group by group, into a second pass.
+
+    :param first_pass: Text deltas of the first pass, in order.
+    :param second_pass: Coroutine function taking a group of paragraphs and returning its text.
+    :param group_tokens: Approximate size of each group sent to the second pass.
+    :param concurrency: Maximum number of second-pass requests in flight at once.
+    :param timings: If given, filled with the stage timings in seconds.
+    :return: The second-pass outputs joined in order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    grouper = ParagraphGrouper(group_tokens)
+    tasks: List[asyncio.Task] = []
+    second_pass_seconds: List[float] = []
+    start_time = time.perf_counter()
+    first_delta_at = None
+
+    async def run_second_pass(group: str) -> str:
+        async with semaphore:
+            group_start = time.perf_counter()
+            output = await second_pass(group)
+            second_pass_seconds.append(time.perf_counter() - group_start)
+            return output
+
+    try:
+        async for delta in first_pass:
+            if first_delta_at is None:
+                first_delta_at = time.perf_counter()
+            for group in grouper.feed(delta):
+                tasks.append(asyncio.create_task(run_second_pass(group)))
+        first_pass_done_at = time.perf_counter()
+        remainder = grouper.flush()
+        if remainder:
+            tasks.append(asyncio.create_task(run_second_pass(remainder)))
+        outputs = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    end_time = time.perf_counter()
+    stage_timings = {
+        'first_pass_first_delta': round((first_delta_at or first_pass_done_at) - start_time, 3),
+        'first_pass': round(first_pass_done_at - start_time, 3),
+        'second_pass_tail': round(end_time - first_pass_done_at, 3),
+        'second_pass_total': round(sum(second_pass_seconds), 3),
+        'groups': len(tasks),
+        'total': round(end_time - start_time, 3),
+    }
+    if timings is not None:
+        timings.update(stage_timings)
+    logger.info(f"Pipelined generation of {len(tasks)} groups: first pass {stage_timings['first_pass']:.2f}s "
+                f"(first text after {stage_timings['first_pass_first_delta']:.2f}s), second pass finished "
+                f"{stage_timings['second_pass_tail']:.2f}s later, {stage_timings['total']:.2f}s in total")
+    return '\n\n'.join(output.strip() for output in outputs if output and output.strip())
@@ -0,0 +1,196 @@
+# modules/quota_governor.py
+
+"""
+Quota Governor
+Vertex AI enforces requests-per-minute and tokens-per-minute quotas. Without a client-side limit,
+a burst of articles is sent at once, the API answers ResourceExhausted, and every request then
+sleeps 15-60s in its retry while holding a worker thread. The governor spaces calls out before
+they are sent instead: each call takes one request and its estimated tokens from two token buckets
+shared by the whole process. Calls that must wait are queued by priority, so interactive /process
+requests go ahead of batch work, and a call is rejected with QuotaExceededError rather than queued
+when the queue is full or it has waited longer than its priority allows.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from modules.common_logger import setup_logger
+from modules.rate_limiting import TokenBucket
+
+logger = setup_logger("quota_governor")
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+LLM_QUOTA_RPM = float(os.getenv('LLM_QUOTA_RPM', '60'))
+LLM_QUOTA_TPM = float(os.getenv('LLM_QUOTA_TPM', '1000000'))
+LLM_QUOTA_MAX_QUEUE = int(os.getenv('LLM_QUOTA_MAX_QUEUE', '100'))
+LLM_QUOTA_MAX_WAIT = {
+    INTERACTIVE: float(os.getenv('LLM_QUOTA_MAX_WAIT_INTERACTIVE', '60')),
+    BATCH: float(os.getenv('LLM_QUOTA_MAX_WAIT_BATCH', '600')),
+}
+# Seconds of quota that may be spent at once; smaller values spread calls more evenly
+LLM_QUOTA_BURST_SECONDS = float(os.getenv('LLM_QUOTA_BURST_SECONDS', '10'))
+
+# Priority of language model calls made by the current task. A ContextVar, like the job ID,
+# so a batch item's calls are marked without passing the priority through every stage.
+_priority = contextvars.ContextVar('llm_priority', default=INTERACTIVE)
+
+
+@contextmanager
+def priority_context(priority: int):
+    """
+    Mark language model calls made inside the block with a priority.
+    Usage:
+    with priority_context(BATCH):
+        await generate_article_text(content)
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_priority() -> int:
+    return _priority.get()
+
+
+class QuotaExceededError(Exception):
+    """Raised when a call is rejected because the quota would not allow it soon enough."""
+
+
+class QuotaGovernor:
+    """
+    Requests-per-minute and tokens-per-minute limits shared by all language model calls in the
+    process. Waiting calls form one queue ordered by (priority, arrival); only the head of the queue
+    takes from the buckets, so a large batch call cannot be overtaken forever by small ones and an
+    interactive call never waits behind queued batch calls.
+    """
+
+    def __init__(self,
+                 requests_per_minute: float = LLM_QUOTA_RPM,
+                 tokens_per_minute: float = LLM_QUOTA_TPM,
+                 max_queue: int = LLM_QUOTA_MAX_QUEUE,
+                 max_wait: Optional[Dict[int, float]] = None,
+                 burst_seconds: float = LLM_QUOTA_BURST_SECONDS):
+        self.requests = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60 * burst_seconds))
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 60 * burst_seconds)
+        self.max_queue = max_queue
+        self.max_wait = {**LLM_QUOTA_MAX_WAIT, **(max_wait or {})}
+        self._waiting: List[list] = []
+        self._sequence = itertools.count()
+        self._counters = {
+            priority: {'admitted': 0, 'queued': 0, 'rejected': 0, 'wait_seconds': 0.0}
+            for priority in PRIORITY_NAMES
+        }
+        self._throttled = 0
+        self._token_corrections = 0
+
+    def _wait_time(self, tokens: float) -> float:
+        return max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def _wake_head(self) -> None:
+        if self._waiting:
+            self._waiting[0][3].set()
+
+    def _reject(self, priority: int, reason: str) -> None:
+        self._counters[priority]['rejected'] += 1
+        logger.warning(f"Rejected {PRIORITY_NAMES[priority]} language model call: {reason}")
+        raise QuotaExceededError(reason)
+
+    async def acquire(self, tokens: float, priority: Optional[int] = None) -> float:
+        """
+        Wait until the quota allows a call of about `tokens` tokens, then take it.
+
+        :param tokens: Estimated prompt plus response tokens.
+        :param priority: INTERACTIVE or BATCH; defaults to the priority of the current context.
+        :return: Seconds spent waiting.
+        :raises QuotaExceededError: If the queue is full or the call waited longer than allowed.
+        """
+        priority = get_priority() if priority is None else priority
+        # A call larger than the bucket could never be admitted; it just takes the whole bucket
+        tokens = min(tokens, self.tokens.capacity)
+        counters = self._counters[priority]
+
+        if not self._waiting and self._wait_time(tokens) <= 0:
+            self.requests.debit(1)
+            self.tokens.debit(tokens)
+            counters['admitted'] += 1
+            return 0.0
+
+        if len(self._waiting) >= self.max_queue:
+            self._reject(priority, f"{len(self._waiting)} calls already waiting for quota")
+
+        entry = [priority, next(self._sequence), tokens, asyncio.Event()]
+        heapq.heappush(self._waiting, entry)
+        counters['queued'] += 1
+        start_time = time.monotonic()
+        try:
+            while True:
+                waited = time.monotonic() - start_time
+                remaining = self.max_wait[priority] - waited
+                if self._waiting[0] is entry:
+                    wait_time = self._wait_time(tokens)
+                    if wait_time <= 0:
+                        heapq.heappop(self._waiting)
+                        self.requests.debit(1)
+                        self.tokens.debit(tokens)
+                        counters['admitted'] += 1
+                        counters['wait_seconds'] += waited
+                        return waited
+                    if wait_time > remaining:
+                        self._reject(priority, f"quota not available for {wait_time:.1f}s after waiting {waited:.1f}s")
+                    await asyncio.sleep(wait_time)
+                else:
+                    if remaining <= 0:
+                        self._reject(priority, f"still queued after {waited:.1f}s")
+                    entry[3].clear()
+                    try:
+                        # Woken when this call reaches the head of the queue
+                        await asyncio.wait_for(entry[3].wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+            self._wake_head()
+
+    def record_usage(self, estimated_tokens: float, actual_tokens: Optional[float]) -> None:
+        """Correct the token bucket once a call has reported the tokens it actually used."""
+        if actual_tokens is None:
+            return
+        self.tokens.debit(actual_tokens - min(estimated_tokens, self.tokens.capacity))
+        self._token_corrections += 1
+
+    def record_throttled(self) -> None:
+        """
+        The API answered ResourceExhausted despite the limits (other clients share the quota, or the
+        limits are set too high). Empty the buckets so queued calls back off for a while.
+        """
+        self._throttled += 1
+        self.requests.debit(self.requests.capacity)
+        self.tokens.debit(self.tokens.capacity)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'requests_per_minute': round(self.requests.rate * 60, 1),
+            'tokens_per_minute': round(self.tokens.rate * 60),
+            'queued_now': len(self._waiting),
+            'throttled': self._throttled,
+            'token_corrections': self._token_corrections,
+            **{PRIORITY_NAMES[priority]: {**counters, 'wait_seconds': round(counters['wait_seconds'], 3)}
+               for priority, counters in self._counters.items()},
+        }
+
+
+# Quota shared by every language model call in this process
+quota_governor = QuotaGovernor()
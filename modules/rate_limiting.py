@@ -0,0 +1,298 @@
+# modules/rate_limiting.py
+
+"""
+Rate Limiting and Circuit Breaking
+This module provides the building blocks that keep one slow or failing upstream from tying up the
+application's worker slots:
+- TokenBucket: a monotonic-clock token bucket for smoothing request rates.
+- CircuitBreaker: trips after consecutive failures, fast-fails while open and lets a single trial
+  request through after a recovery timeout.
+- HostLimiter: per-host max in-flight requests + token-bucket rate + circuit breaker.
+- HostLimiterRegistry: the process-wide set of host limiters and their instrumentation, capped to
+  the most recently used hosts; idle limiters of other hosts are dropped.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("rate_limiting")
+
+# Limiters kept by a registry; beyond this the least recently used idle ones are dropped
+HOST_LIMITER_MAX_HOSTS = int(os.getenv('HOST_LIMITER_MAX_HOSTS', '1000'))
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the circuit breaker is open."""
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at `rate` tokens per second up to `capacity`.
+    It uses no asyncio primitives, so one bucket can be shared across event loops.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` will be available, without taking them."""
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def debit(self, tokens: float) -> None:
+        """
+        Take tokens unconditionally, or give them back if negative. The balance may go below zero,
+        which delays later requests until the bucket has refilled.
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - tokens)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available.
+
+        :return: 0 if the tokens were taken, otherwise the seconds until they will be available.
+        """
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until tokens are available and take them.
+
+        :return: Total seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait_time = self.try_acquire(tokens)
+            if wait_time <= 0:
+                return waited
+            await asyncio.sleep(wait_time)
+            waited += wait_time
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+    closed -> open after `failure_threshold` consecutive failures; open -> half_open once
+    `recovery_timeout` seconds have passed; half_open -> closed on success or open on failure.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, name: str = ''):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.name = name
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+            logger.info(f"Circuit for {self.name} half-open, allowing a trial request")
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.warning(f"Circuit for {self.name} opened after "
+                               f"{self.consecutive_failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot whose request ended without an outcome."""
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'trips': self.trips,
+        }
+
+
+class HostLimiter:
+    """
+    Limits requests to one host: at most `max_in_flight` concurrent requests, `rate` requests per
+    second (bursting to `burst`), and a circuit breaker over transport failures.
+    """
+
+    def __init__(self, host: str, max_in_flight: int = 4, rate: float = 2.0, burst: float = 4.0,
+                 failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.host = host
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, recovery_timeout, name=host)
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Requests inside acquire(), including those still waiting for a slot or a token
+        self._active = 0
+        self._counters = {'requests': 0, 'successes': 0, 'failures': 0, 'rejected': 0, 'in_flight': 0,
+                          'rate_limited_seconds': 0.0}
+
+    @property
+    def idle(self) -> bool:
+        """No request is using or waiting for the limiter and the circuit holds no failures."""
+        return (self._active == 0 and self.breaker.state == CircuitBreaker.CLOSED
+                and self.breaker.consecutive_failures == 0)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @staticmethod
+    def is_host_failure(error: BaseException) -> bool:
+        """
+        True if the error means the host is unavailable rather than that the page is bad:
+        connection errors, timeouts, 5xx responses and 429 throttling.
+        """
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500 or error.status == 429
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+    def record_success(self) -> None:
+        self._counters['successes'] += 1
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        self._counters['failures'] += 1
+        self.breaker.record_failure()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Hold a request slot for this host. Raises CircuitOpenError without waiting if the breaker
+        is open. Host failures raised inside the block (see is_host_failure) are recorded as
+        failures; anything else, including normal completion, is recorded as a success.
+        """
+        if not self.breaker.allow_request():
+            self._counters['rejected'] += 1
+            raise CircuitOpenError(f"Circuit open for {self.host}")
+
+        self._active += 1
+        try:
+            async with self._get_semaphore():
+                self._counters['rate_limited_seconds'] += await self.bucket.acquire()
+                self._counters['requests'] += 1
+                self._counters['in_flight'] += 1
+                try:
+                    yield self
+                except Exception as e:
+                    if self.is_host_failure(e):
+                        self.record_failure()
+                    else:
+                        # The host answered; the error is about the response, not the host
+                        self.record_success()
+                    raise
+                else:
+                    self.record_success()
+                finally:
+                    self._counters['in_flight'] -= 1
+        except asyncio.CancelledError:
+            # A cancelled request (e.g. a hedged fetch that lost) says nothing about the host
+            self.breaker.release_trial()
+            raise
+        finally:
+            self._active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            'rate_limited_seconds': round(self._counters['rate_limited_seconds'], 3),
+            'max_in_flight': self.max_in_flight,
+            'rate': self.bucket.rate,
+            'circuit': self.breaker.stats(),
+        }
+
+
+class HostLimiterRegistry:
+    """
+    Creates and holds one HostLimiter per host. Hosts without explicit settings use the defaults.
+    At most max_hosts limiters are kept: when a new host goes over the cap, the least recently used
+    idle limiters are dropped (a limiter in use or with an open circuit is kept, as dropping it
+    would lose its limits). A dropped host gets a fresh limiter on its next request.
+    """
+
+    def __init__(self, max_hosts: int = HOST_LIMITER_MAX_HOSTS, **defaults):
+        self.max_hosts = max_hosts
+        self.defaults = defaults
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._limiters: 'OrderedDict[str, HostLimiter]' = OrderedDict()
+        self.evicted = 0
+
+    def configure(self, host: str, **settings) -> None:
+        """Set limiter settings for a specific host; replaces an existing limiter for it."""
+        self._overrides[host] = settings
+        self._limiters.pop(host, None)
+
+    def get(self, host: str) -> HostLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = HostLimiter(host, **{**self.defaults, **self._overrides.get(host, {})})
+            self._limiters[host] = limiter
+            self._evict_idle()
+        self._limiters.move_to_end(host)
+        return limiter
+
+    def _evict_idle(self) -> None:
+        excess = len(self._limiters) - self.max_hosts
+        if excess <= 0:
+            return
+        # Oldest first; the limiter just created is last and is never a candidate
+        for host in [host for host, limiter in list(self._limiters.items())[:-1] if limiter.idle][:excess]:
+            del self._limiters[host]
+            self.evicted += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {host: limiter.stats() for host, limiter in self._limiters.items()}
+
+
+# Process-wide limiters shared by all scrapers
+host_limiters = HostLimiterRegistry()
@@ -0,0 +1,78 @@
+# modules/sentence_segmenter.py
+
+"""
+Rule-Based Sentence Segmenter
+This module provides a pure-regex sentence segmenter for very large inputs where loading or running
+a spaCy pipeline is not worth the cost. It exposes the small subset of the spaCy interface used by
+text_processing.normalize_text (calling the segmenter on a text, pipe() and doc.sents), so it can be
+swapped in for a spaCy Language object.
+"""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple
+
+# Candidate boundary: terminal punctuation, optional closing quotes/brackets, whitespace, and a
+# following token that looks like the start of a sentence.
+SENTENCE_BOUNDARY_PATTERN = re.compile(
+    r'[.!?…]+["\'”’)\]]*\s+(?=["\'“‘(\[]?[A-Z0-9])'
+)
+
+# Dotted initialisms such as "U.S." or a single capital initial such as "J."
+INITIALISM_PATTERN = re.compile(r'(?:[A-Za-z]\.){2,}|[A-Z]\.')
+
+ABBREVIATIONS = frozenset({
+    'mr.', 'mrs.', 'ms.', 'dr.', 'prof.', 'sr.', 'jr.', 'st.', 'mt.', 'gen.', 'col.', 'lt.', 'sgt.',
+    'capt.', 'gov.', 'sen.', 'rep.', 'rev.', 'hon.', 'vs.', 'etc.', 'inc.', 'ltd.', 'co.', 'corp.',
+    'no.', 'fig.', 'approx.', 'dept.', 'est.', 'jan.', 'feb.', 'mar.', 'apr.', 'jun.', 'jul.',
+    'aug.', 'sep.', 'sept.', 'oct.', 'nov.', 'dec.', 'e.g.', 'i.e.',
+})
+
+
+class Sentence(NamedTuple):
+    """A segmented sentence; mirrors the `text` attribute of a spaCy Span."""
+    text: str
+
+
+class SegmentedDoc(NamedTuple):
+    """A segmented text; mirrors the `sents` attribute of a spaCy Doc."""
+    text: str
+    sents: List[Sentence]
+
+
+class RegexSentenceSegmenter:
+    """
+    Splits text into sentences with a single compiled regular expression plus an
+    abbreviation check. Throughput is linear in the input size and needs no model.
+    """
+
+    def __call__(self, text: str) -> SegmentedDoc:
+        return SegmentedDoc(text=text, sents=[Sentence(s) for s in self.segment(text)])
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64) -> Iterator[SegmentedDoc]:
+        for text in texts:
+            yield self(text)
+
+    def segment(self, text: str) -> List[str]:
+        """
+        Return the sentences in text.
+
+        :param text: The text to segment.
+        :return: List of sentence strings, stripped of surrounding whitespace.
+        """
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY_PATTERN.finditer(text):
+            # The word carrying the punctuation, e.g. "Dr." or "U.S."
+            preceding = text[start:match.start() + 1].rsplit(None, 1)
+            word = preceding[-1].lstrip('("\'“‘') if preceding else ''
+            if word.lower() in ABBREVIATIONS or INITIALISM_PATTERN.fullmatch(word):
+                continue
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+
+        tail = text[start:].strip()
+        if tail:
+            sentences.append(tail)
+        return sentences
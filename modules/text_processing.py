@@ -0,0 +1,59 @@
+# modules/text_processing.py
+
+"""
+Text Normalization
+This module holds the sentence-level text normalization used by the WebScraper. Each paragraph is
+segmented exactly once: non-empty paragraphs are streamed through nlp.pipe in batches, and the
+resulting sentence spans are reused for long-sentence splitting instead of running the model again.
+The functions are synchronous and CPU-bound; callers should run them in an executor.
+"""
+
+import re
+from typing import Any, List
+
+# Logical split points for sentences that exceed the maximum length
+LONG_SENTENCE_SPLIT_PATTERN = re.compile(r'[,;]|\sand\s|\sbut\s')
+
+
+def split_long_sentence(sentence: str, max_length: int) -> List[str]:
+    """
+    Split a sentence at logical points (commas, semicolons, conjunctions) if it is too long.
+
+    :param sentence: The sentence text.
+    :param max_length: Maximum sentence length in characters.
+    :return: List of sentence fragments.
+    """
+    if len(sentence) <= max_length:
+        return [sentence]
+    return [part.strip() for part in LONG_SENTENCE_SPLIT_PATTERN.split(sentence) if part.strip()]
+
+
+def normalize_text(nlp: Any, text: str, max_sentence_length: int, batch_size: int = 64) -> str:
+    """
+    Process and clean text while preserving all sentences and paragraph structure.
+
+    :param nlp: A spaCy-compatible pipeline exposing pipe() and doc.sents.
+    :param text: Raw text, one paragraph per line.
+    :param max_sentence_length: Sentences longer than this are split at logical points.
+    :param batch_size: Number of paragraphs per nlp.pipe batch.
+    :return: Normalized text.
+    """
+    # Split text into paragraphs while preserving empty lines
+    paragraphs = text.split('\n')
+    processed_paragraphs = [''] * len(paragraphs)
+    non_empty = [index for index, paragraph in enumerate(paragraphs) if paragraph.strip()]
+
+    docs = nlp.pipe((paragraphs[index] for index in non_empty), batch_size=batch_size)
+    for index, doc in zip(non_empty, docs):
+        sentences = []
+        for sent in doc.sents:
+            sentence = sent.text.strip()
+            if sentence:
+                sentences.extend(split_long_sentence(sentence, max_sentence_length))
+        processed_paragraphs[index] = ' '.join(sentences)
+
+    # Join paragraphs with newlines, preserving structure
+    final_text = '\n'.join(processed_paragraphs)
+
+    # Remove consecutive empty lines while preserving structure
+    return re.sub(r'\n{3,}', '\n\n', final_text)
@@ -0,0 +1,455 @@
+# modules/tts_normalizer.py
+
+"""
+TTS Text Normalizer
+Rewrites text into the form a text-to-speech voice should read aloud: numbers, ordinals, fractions,
+ranges, ratios, years, dates, times, units, currency, percentages, telephone numbers, symbols, e-mail
+and web addresses and common abbreviations. These are the mechanical parts of the readability prompt. Doing them locally either
+replaces that language model pass ('local' mode) or hands the model text with less left to rewrite
+('hybrid' mode).
+
+All rules are alternatives of one compiled pattern, so a text is normalized in a single left-to-right
+scan; at each position the first rule that matches wins, which is why the more specific rules
+(addresses, dates, times, currency) come before plain numbers.
+"""
+
+import os
+import re
+from typing import Callable, Dict, List
+
+# 'llm': the readability prompt does all rewriting (previous behaviour);
+# 'local': this module replaces the readability prompt;
+# 'hybrid': this module runs first and the readability prompt polishes the result.
+TTS_NORMALIZATION_MODES = ('llm', 'local', 'hybrid')
+TTS_NORMALIZATION_MODE = os.getenv('TTS_NORMALIZATION_MODE', 'llm').lower()
+if TTS_NORMALIZATION_MODE not in TTS_NORMALIZATION_MODES:
+    TTS_NORMALIZATION_MODE = 'llm'
+
+ONES = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+        'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen']
+TENS = ['', '', 'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety']
+SCALES = [(10 ** 12, 'trillion'), (10 ** 9, 'billion'), (10 ** 6, 'million'), (1000, 'thousand')]
+
+ORDINAL_WORDS = {
+    'one': 'first', 'two': 'second', 'three': 'third', 'five': 'fifth', 'eight': 'eighth',
+    'nine': 'ninth', 'twelve': 'twelfth',
+}
+
+FRACTION_DENOMINATORS = {2: ('half', 'halves'), 4: ('quarter', 'quarters')}
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+          'October', 'November', 'December']
+MONTH_NAMES = {name.lower(): name for name in MONTHS}
+MONTH_NAMES.update({name[:3].lower(): name for name in MONTHS})
+MONTH_NAMES['sept'] = 'September'
+
+# Unit spellings (case-sensitive: 5g is grams, 5G is a network) -> (singular, plural).
+# Single letters that are as often something else (m, h, l) are left alone.
+UNITS = {
+    'km': ('kilometer', 'kilometers'), 'cm': ('centimeter', 'centimeters'), 'mm': ('millimeter', 'millimeters'),
+    'mi': ('mile', 'miles'), 'ft': ('foot', 'feet'),
+    'kg': ('kilogram', 'kilograms'), 'g': ('gram', 'grams'), 'mg': ('milligram', 'milligrams'),
+    'lb': ('pound', 'pounds'), 'lbs': ('pound', 'pounds'), 'oz': ('ounce', 'ounces'),
+    'tsp': ('teaspoon', 'teaspoons'), 'tbsp': ('tablespoon', 'tablespoons'),
+    'ml': ('milliliter', 'milliliters'), 'mL': ('milliliter', 'milliliters'),
+    'mph': ('mile per hour', 'miles per hour'), 'km/h': ('kilometer per hour', 'kilometers per hour'),
+    'kph': ('kilometer per hour', 'kilometers per hour'),
+    'hr': ('hour', 'hours'), 'hrs': ('hour', 'hours'),
+    'min': ('minute', 'minutes'), 'mins': ('minute', 'minutes'), 'sec': ('second', 'seconds'),
+    'secs': ('second', 'seconds'), 'ms': ('millisecond', 'milliseconds'),
+    'KB': ('kilobyte', 'kilobytes'), 'MB': ('megabyte', 'megabytes'), 'GB': ('gigabyte', 'gigabytes'),
+    'TB': ('terabyte', 'terabytes'), 'GHz': ('gigahertz', 'gigahertz'), 'MHz': ('megahertz', 'megahertz'),
+    'kW': ('kilowatt', 'kilowatts'), 'MW': ('megawatt', 'megawatts'), 'kWh': ('kilowatt hour', 'kilowatt hours'),
+    '°F': ('degree Fahrenheit', 'degrees Fahrenheit'), '°C': ('degree Celsius', 'degrees Celsius'),
+    '°': ('degree', 'degrees'), 'pp': ('percentage point', 'percentage points'),
+}
+
+CURRENCIES = {'$': ('dollar', 'dollars', 'cent', 'cents'), '£': ('pound', 'pounds', 'penny', 'pence'),
+              '€': ('euro', 'euros', 'cent', 'cents'), '¥': ('yen', 'yen', None, None)}
+MAGNITUDES = {'k': 'thousand', 'thousand': 'thousand', 'm': 'million', 'mn': 'million', 'million': 'million',
+              'b': 'billion', 'bn': 'billion', 'billion': 'billion', 'tn': 'trillion', 'trillion': 'trillion'}
+
+ABBREVIATIONS = {
+    'Dr.': 'Doctor', 'Mr.': 'Mister', 'Mrs.': 'Missus', 'Ms.': 'Miz', 'Prof.': 'Professor',
+    'Sen.': 'Senator', 'Rep.': 'Representative', 'Gov.': 'Governor', 'Gen.': 'General', 'Lt.': 'Lieutenant',
+    'Jr.': 'Junior', 'Sr.': 'Senior', 'Mt.': 'Mount',
+    'etc.': 'etcetera', 'e.g.': 'for example', 'i.e.': 'that is', 'vs.': 'versus', 'approx.': 'approximately',
+}
+
+SYMBOLS = {'&': 'and', '+': 'plus', '=': 'equals', '@': 'at', '%': 'percent', '~': 'about', '#': 'number'}
+
+SUPERSCRIPTS = {'²': 'squared', '³': 'cubed'}
+
+ADDRESS_SYMBOLS = {'.': 'dot', '/': 'forward slash', '_': 'underscore', '-': 'dash', '@': 'at', ':': 'colon'}
+
+
+# ----------------------------------------------------------------------------
+# Number words
+# ----------------------------------------------------------------------------
+
+def _below_thousand(number: int) -> str:
+    words = []
+    hundreds, rest = divmod(number, 100)
+    if hundreds:
+        words.append(f"{ONES[hundreds]} hundred")
+    if rest >= 20:
+        tens, ones = divmod(rest, 10)
+        words.append(f"{TENS[tens]}-{ONES[ones]}" if ones else TENS[tens])
+    elif rest or not hundreds:
+        words.append(ONES[rest])
+    return ' '.join(words)
+
+
+def number_to_words(number: int) -> str:
+    """Cardinal words for an integer: 2002 -> 'two thousand two'."""
+    if number < 0:
+        return f"minus {number_to_words(-number)}"
+    if number < 1000:
+        return _below_thousand(number)
+    words = []
+    for scale, name in SCALES:
+        count, number = divmod(number, scale)
+        if count:
+            words.append(f"{number_to_words(count)} {name}")
+    if number:
+        words.append(_below_thousand(number))
+    return ' '.join(words)
+
+
+def ordinal_words(number: int) -> str:
+    """Ordinal words for an integer: 21 -> 'twenty-first'."""
+    words = number_to_words(number)
+    head, separator, last = words.rpartition('-') if '-' in words.rsplit(' ', 1)[-1] else words.rpartition(' ')
+    if last in ORDINAL_WORDS:
+        last = ORDINAL_WORDS[last]
+    elif last.endswith('y'):
+        last = last[:-1] + 'ieth'
+    else:
+        last += 'th'
+    return f"{head}{separator}{last}"
+
+
+def decimal_to_words(text: str) -> str:
+    """Words for a number written with optional thousands separators and decimals: '3.25' -> 'three point two five'."""
+    text = text.replace(',', '')
+    negative = text.startswith('-')
+    whole, _, fraction = text.lstrip('-+').partition('.')
+    words = number_to_words(int(whole or '0'))
+    if fraction:
+        words += ' point ' + ' '.join(ONES[int(digit)] for digit in fraction)
+    return f"minus {words}" if negative else words
+
+
+def year_to_words(year: int) -> str:
+    """Words for a year as it is read aloud: 1998 -> 'nineteen ninety-eight', 2023 -> 'two thousand twenty-three'."""
+    if year < 1100 or year >= 2000:
+        return number_to_words(year)
+    century, rest = divmod(year, 100)
+    if rest == 0:
+        return f"{number_to_words(century)} hundred"
+    if rest < 10:
+        return f"{number_to_words(century)} oh {ONES[rest]}"
+    return f"{number_to_words(century)} {number_to_words(rest)}"
+
+
+def fraction_to_words(numerator: int, denominator: int) -> str:
+    """Words for a fraction: 1/2 -> 'one half', 3/4 -> 'three quarters', 5/8 -> 'five eighths'."""
+    if denominator in FRACTION_DENOMINATORS:
+        singular, plural = FRACTION_DENOMINATORS[denominator]
+    else:
+        singular = ordinal_words(denominator)
+        plural = singular + 's'
+    return f"{number_to_words(numerator)} {singular if numerator == 1 else plural}"
+
+
+def _time_to_words(hour: int, minute: int) -> str:
+    hour_words = number_to_words(hour % 12 or 12)
+    if minute == 0:
+        return f"{hour_words} o'clock"
+    if minute < 10:
+        return f"{hour_words} oh {ONES[minute]}"
+    return f"{hour_words} {number_to_words(minute)}"
+
+
+def _day_period(hour: int) -> str:
+    if 5 <= hour < 12:
+        return 'in the morning'
+    if 12 <= hour < 17:
+        return 'in the afternoon'
+    if 17 <= hour < 21:
+        return 'in the evening'
+    return 'at night'
+
+
+def _plural(count_text: str, singular: str, plural: str) -> str:
+    return singular if count_text in ('1', '1.0', '-1') else plural
+
+
+# ----------------------------------------------------------------------------
+# Rules: (group name, pattern, handler). Tried in this order at each position.
+# ----------------------------------------------------------------------------
+
+NUMBER = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+# A number ends where no letter, digit or decimal part follows. \b would let '1.5m' backtrack to '1'.
+NUMBER_END = r'(?!\w|\.\d)'
+# Optional minus sign of a number that starts a word ('-5', not 'x-5')
+SIGNED_NUMBER = rf'(?<![\w.])(?:(?<!\S)-)?(?:{NUMBER})'
+MONTH = r'(?:Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sept?|Oct|Nov|Dec)\.?|(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+UNIT = '|'.join(sorted((re.escape(unit) for unit in UNITS), key=len, reverse=True))
+MAGNITUDE = '(?i:' + '|'.join(sorted(MAGNITUDES, key=len, reverse=True)) + ')'
+# Magnitudes written straight after a number: 2.5k, 1.5m, 4.7bn
+MAGNITUDE_SUFFIX = r'(?i:mn|bn|tn|k|m)(?!\w)'
+MERIDIEM = r'(?i:[ap]\.?m\.?)(?!\w)'
+# Years are read as years ('nineteen ninety-eight') only after words that introduce one;
+# elsewhere a four-digit number is a quantity
+# Telephone numbers, with or without a country code and area code: 555-1234, (555) 123-4567, 1-800-555-0199
+PHONE = (r'(?<![\w.-])(?:(?:1[-.])?(?:\(\d{3}\)\s?|\d{3}[-.])\d{3}[-.]\d{4}|\d{3}-\d{4})'
+         r'(?![\w-]|\.\d)')
+# Operands of spans that are read as 'from to': 9:00-17:00, 9am-5pm, 5.25%-5.5%, $5-$10
+SPAN_OPERAND = (rf'(?:[$£€¥](?:{NUMBER})(?:\s?{MAGNITUDE}\b)?|\d{{1,2}}:\d{{2}}\b(?:\s?{MERIDIEM})?'
+                rf'|\d{{1,2}}\s?{MERIDIEM}|(?:{NUMBER})\s?%)')
+YEAR_PREFIX = r'(?:[Ii]n|[Ss]ince|[Bb]y|[Ff]rom|[Uu]ntil|[Tt]hrough|[Dd]uring|of|to|year|early|late|mid|circa)\s'
+
+
+def _email(match: re.Match) -> str:
+    return _spell_address(match.group(0))
+
+
+def _url(match: re.Match) -> str:
+    address = re.sub(r'^https?://', '', match.group(0), flags=re.IGNORECASE).rstrip('/')
+    return _spell_address(address)
+
+
+def _spell_address(address: str) -> str:
+    words = []
+    for part in re.split(r'([./_@:-])', address):
+        if not part:
+            continue
+        if part in ADDRESS_SYMBOLS:
+            words.append(ADDRESS_SYMBOLS[part])
+        elif part.lower() == 'www':
+            words.append('w w w')
+        elif part.isdigit():
+            words.append(number_to_words(int(part)))
+        else:
+            words.append(part)
+    return ' '.join(words)
+
+
+def _date_numeric(match: re.Match) -> str:
+    month, day, year = int(match.group('d_month')), int(match.group('d_day')), match.group('d_year')
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return match.group(0)
+    year = int(year) + (2000 if len(year) == 2 else 0)
+    return f"{MONTHS[month - 1]} {ordinal_words(day)}, {year_to_words(year)}"
+
+
+def _date_iso(match: re.Match) -> str:
+    year, month, day = int(match.group('i_year')), int(match.group('i_month')), int(match.group('i_day'))
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return match.group(0)
+    return f"{MONTHS[month - 1]} {ordinal_words(day)}, {year_to_words(year)}"
+
+
+def _date_named(match: re.Match) -> str:
+    month = MONTH_NAMES[match.group('n_month').rstrip('.').lower()]
+    day = int(match.group('n_day'))
+    if not 1 <= day <= 31:
+        return match.group(0)
+    spoken = f"{month} {ordinal_words(day)}"
+    if match.group('n_year'):
+        spoken += f", {year_to_words(int(match.group('n_year')))}"
+    return spoken
+
+
+def _phone(match: re.Match) -> str:
+    # Read digit by digit, pausing between groups
+    return ', '.join(' '.join(ONES[int(digit)] for digit in group) for group in re.findall(r'\d+', match.group(0)))
+
+
+def _span(match: re.Match) -> str:
+    return f"{normalize_for_tts(match.group('s_from'))} to {normalize_for_tts(match.group('s_to'))}"
+
+
+def _ratio(match: re.Match) -> str:
+    return f"{number_to_words(int(match.group('a_left')))} to {number_to_words(int(match.group('a_right')))}"
+
+
+def _time(match: re.Match) -> str:
+    hour, minute = int(match.group('t_hour')), int(match.group('t_minute'))
+    meridiem = (match.group('t_meridiem') or '').replace('.', '').lower()
+    if hour > 23 or minute > 59:
+        return match.group(0)
+    if meridiem == 'pm' and hour < 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    spoken = _time_to_words(hour, minute)
+    if meridiem or hour > 12 or hour == 0:
+        spoken += f" {_day_period(hour)}"
+    return spoken
+
+
+def _hour(match: re.Match) -> str:
+    hour = int(match.group('h_hour'))
+    if not 1 <= hour <= 12:
+        return match.group(0)
+    if match.group('h_meridiem').replace('.', '').lower() == 'pm' and hour < 12:
+        hour += 12
+    elif hour == 12:
+        hour = 0 if match.group('h_meridiem').lower().startswith('a') else 12
+    return f"{number_to_words(hour % 12 or 12)} {_day_period(hour)}"
+
+
+def _currency(match: re.Match) -> str:
+    singular, plural, minor_singular, minor_plural = CURRENCIES[match.group('c_symbol')]
+    amount = match.group('c_amount')
+    magnitude = match.group('c_magnitude')
+    if magnitude:
+        return f"{decimal_to_words(amount)} {MAGNITUDES[magnitude.lower()]} {plural}"
+    whole, _, cents = amount.replace(',', '').partition('.')
+    spoken = f"{number_to_words(int(whole))} {singular if whole == '1' else plural}"
+    if cents and minor_singular and int(cents):
+        cents = int(cents.ljust(2, '0')[:2])
+        spoken += f" and {number_to_words(cents)} {minor_singular if cents == 1 else minor_plural}"
+    return spoken
+
+
+def _percent(match: re.Match) -> str:
+    return f"{decimal_to_words(match.group('p_amount'))} percent"
+
+
+def _unit(match: re.Match) -> str:
+    amount = match.group('u_amount')
+    singular, plural = UNITS[match.group('u_unit')]
+    return f"{decimal_to_words(amount)} {_plural(amount, singular, plural)}"
+
+
+def _magnitude(match: re.Match) -> str:
+    return f"{decimal_to_words(match.group('g_amount'))} {MAGNITUDES[match.group('g_magnitude').lower()]}"
+
+
+def _multiple(match: re.Match) -> str:
+    return f"{decimal_to_words(match.group('v_amount'))} times"
+
+
+def _range(match: re.Match) -> str:
+    spoken = f"{decimal_to_words(match.group('r_from'))} to {decimal_to_words(match.group('r_to'))}"
+    if match.group('r_magnitude'):
+        spoken += f" {MAGNITUDES[match.group('r_magnitude').lower()]}"
+    elif match.group('r_percent'):
+        spoken += ' percent'
+    return spoken
+
+
+def _multiply(match: re.Match) -> str:
+    return f"{decimal_to_words(match.group('x_left'))} times {decimal_to_words(match.group('x_right'))}"
+
+
+def _power(match: re.Match) -> str:
+    return f"{decimal_to_words(match.group('w_base'))} {SUPERSCRIPTS[match.group('w_power')]}"
+
+
+def _ordinal(match: re.Match) -> str:
+    return ordinal_words(int(match.group('o_number').replace(',', '')))
+
+
+def _fraction(match: re.Match) -> str:
+    numerator, denominator = int(match.group('f_numerator')), int(match.group('f_denominator'))
+    if denominator == 0:
+        return match.group(0)
+    if (numerator, denominator) == (24, 7):
+        return 'twenty-four seven'
+    return fraction_to_words(numerator, denominator)
+
+
+def _decade(match: re.Match) -> str:
+    digits = match.group('e_digits')
+    if digits == '00':
+        return 'two thousands'
+    if len(digits) == 2:
+        words = number_to_words(int(digits))
+    else:
+        words = year_to_words(int(digits))
+    if words.endswith('y'):
+        return words[:-1] + 'ies'
+    return words + 's'
+
+
+def _year(match: re.Match) -> str:
+    words = f"{match.group('y_prefix')}{year_to_words(int(match.group('y_year')))}"
+    if match.group('y_end'):
+        words += f" to {year_to_words(int(match.group('y_end')))}"
+    return words
+
+
+def _number(match: re.Match) -> str:
+    return decimal_to_words(match.group(0))
+
+
+def _abbreviation(match: re.Match) -> str:
+    return ABBREVIATIONS[match.group(0)]
+
+
+def _number_sign(match: re.Match) -> str:
+    return f"number {decimal_to_words(match.group('n_number'))}"
+
+
+def _symbol(match: re.Match) -> str:
+    return SYMBOLS[match.group(0)]
+
+
+RULES = [
+    ('email', r'\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b', _email),
+    ('url', r'\b(?:[Hh]ttps?://|www\.)[^\s<>"\']+[^\s<>"\'.,;:!?)]', _url),
+    ('phone', PHONE, _phone),
+    ('date_numeric', r'\b(?P<d_month>\d{1,2})/(?P<d_day>\d{1,2})/(?P<d_year>\d{4}|\d{2})\b', _date_numeric),
+    ('date_iso', r'\b(?P<i_year>\d{4})-(?P<i_month>\d{2})-(?P<i_day>\d{2})\b', _date_iso),
+    ('date_named', rf'\b(?P<n_month>{MONTH})\s(?P<n_day>\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s(?P<n_year>\d{{4}})\b)?',
+     _date_named),
+    ('span', rf'(?<![\w.])(?P<s_from>{SPAN_OPERAND})\s?[-–]\s?(?P<s_to>{SPAN_OPERAND})', _span),
+    ('time', rf'\b(?P<t_hour>\d{{1,2}}):(?P<t_minute>\d{{2}})\b(?:\s?(?P<t_meridiem>{MERIDIEM}))?', _time),
+    ('hour', rf'\b(?P<h_hour>\d{{1,2}})\s?(?P<h_meridiem>{MERIDIEM})', _hour),
+    ('ratio', r'(?<![\w:.])(?P<a_left>\d{1,3}):(?P<a_right>\d{1,3})(?![\w:]|\.\d)', _ratio),
+    ('currency', rf'(?P<c_symbol>[$£€¥])(?P<c_amount>{NUMBER})(?:\s?(?P<c_magnitude>{MAGNITUDE})\b)?', _currency),
+    ('percent', rf'(?P<p_amount>-?(?:{NUMBER}))\s?%', _percent),
+    ('unit', rf'(?P<u_amount>{SIGNED_NUMBER})\s?(?P<u_unit>{UNIT})(?![\w/])', _unit),
+    ('magnitude', rf'(?P<g_amount>{SIGNED_NUMBER})(?P<g_magnitude>{MAGNITUDE_SUFFIX})', _magnitude),
+    ('range', rf'\b(?P<r_from>{NUMBER})\s?[-–]\s?(?P<r_to>{NUMBER})'
+     rf'(?:(?P<r_magnitude>{MAGNITUDE_SUFFIX})|(?P<r_percent>\s?%)|{NUMBER_END}(?![-/]))', _range),
+    ('multiply', rf'\b(?P<x_left>{NUMBER})\s?[x×]\s?(?P<x_right>{NUMBER}){NUMBER_END}', _multiply),
+    ('multiple', rf'(?<![\w.])(?P<v_amount>{NUMBER})[x×](?!\w)', _multiple),
+    ('power', rf'\b(?P<w_base>{NUMBER})(?P<w_power>[²³])', _power),
+    ('ordinal', r'\b(?P<o_number>\d{1,3}(?:,\d{3})*|\d+)(?:st|nd|rd|th)\b', _ordinal),
+    ('fraction', rf'\b(?P<f_numerator>\d{{1,2}})/(?P<f_denominator>\d{{1,2}}){NUMBER_END}(?!/)', _fraction),
+    ('decade', r"(?:\b|')(?P<e_digits>1[1-9]\d0|20\d0|\d0)s\b", _decade),
+    ('year', rf'\b(?P<y_prefix>{YEAR_PREFIX})(?P<y_year>1[1-9]\d\d|20\d\d)(?:[-–](?P<y_end>1[1-9]\d\d|20\d\d))?\b(?![.,]\d)',
+     _year),
+    ('number', rf'{SIGNED_NUMBER}{NUMBER_END}', _number),
+    ('number_sign', rf'#(?P<n_number>{NUMBER}){NUMBER_END}', _number_sign),
+    ('abbreviation', r'(?<![\w.])(?:' + '|'.join(re.escape(abbreviation) for abbreviation in ABBREVIATIONS)
+     + r')(?=\s|$)', _abbreviation),
+    ('symbol', r'(?<=\s)[&+=@~%](?=\s)', _symbol),
+]
+
+PATTERN = re.compile('|'.join(f"(?P<{name}>{pattern})" for name, pattern, _ in RULES))
+HANDLERS: Dict[str, Callable[[re.Match], str]] = {name: handler for name, _, handler in RULES}
+
+
+def _dispatch(match: re.Match) -> str:
+    # The rule's own group is the outermost group that matched, which closes last
+    return HANDLERS[match.lastgroup](match)
+
+
+def normalize_for_tts(text: str) -> str:
+    """
+    Rewrite text into its spoken form.
+
+    :param text: Article text.
+    :return: The text with numbers, dates, times, units, currency, symbols and addresses spelled out.
+    """
+    return PATTERN.sub(_dispatch, text)
+
+
+def rule_names() -> List[str]:
+    return [name for name, _, _ in RULES]
@@ -0,0 +1,193 @@
+# modules/url_index.py
+
+"""
+URL Index
+This module maps canonical article URLs to the IDs of articles already stored, so a URL that was
+ingested before is answered from the index instead of being scraped and sent through the language
+model again. URLs are canonicalized (scheme, host, default port, trailing slash, tracking
+parameters, fragment) before lookup, and the page's <link rel="canonical"> is indexed as well.
+Entries are cached in memory in front of a persistent store (the Firestore 'url_index' collection).
+The memory tier only holds entries for a short time: deleting an article clears the store and the
+memory of the process that served the DELETE, and the other workers and instances must not keep
+answering with the deleted article ID.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from modules.common_logger import setup_logger
+
+logger = setup_logger("url_index")
+
+# Query parameters that identify a campaign or click rather than a page
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'twclid', 'igshid',
+    'mc_cid', 'mc_eid', 'ref', 'ref_src', 'ref_url', 'referrer', 'cmpid', 'ncid', 'ocid',
+    'smid', 'smtyp', 'spm', '_ga', '_gl', 'guccounter', 'guce_referrer', 'guce_referrer_sig',
+    'at_medium', 'at_campaign', 'sr_share'
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'pk_', 'mtm_', 'hsa_', 'vero_', 'oly_')
+
+# Seconds an entry is served from memory before the store is asked again
+URL_INDEX_MEMORY_TTL_SECONDS = float(os.getenv('URL_INDEX_MEMORY_TTL_SECONDS', '60'))
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+DUPLICATE_SLASHES = re.compile(r'/{2,}')
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """
+    Normalize a URL so different spellings of the same article compare equal:
+    https scheme, lower-case host without 'www.', no default port, no fragment, no tracking
+    parameters, sorted query, collapsed slashes and no trailing slash.
+
+    :param url: The URL to canonicalize; may be relative if base is given.
+    :param base: The URL of the page the URL was found on.
+    :return: The canonical URL, or None if the URL is not an http(s) URL.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = DUPLICATE_SLASHES.sub('/', parts.path or '/')
+    path = posixpath.normpath(path) if path != '/' else path
+    if path != '/':
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def url_key(canonical_url: str) -> str:
+    """Stable document ID for a canonical URL (URLs contain characters Firestore IDs cannot)."""
+    return hashlib.sha256(canonical_url.encode('utf-8')).hexdigest()
+
+
+class UrlIndex:
+    """
+    Canonical URL -> article ID index. The persistent store is reached through the coroutine
+    functions passed in, so the index itself has no database dependency:
+        lookup(key) -> Optional[str]                    article ID stored for a URL key
+        store(key, canonical_url, article_id) -> bool  persist an entry
+    """
+
+    def __init__(self,
+                 lookup: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+                 store: Optional[Callable[[str, str, str], Awaitable[bool]]] = None,
+                 max_entries: int = 100000,
+                 memory_ttl_seconds: float = URL_INDEX_MEMORY_TTL_SECONDS):
+        self.lookup = lookup
+        self.store = store
+        self.max_entries = max_entries
+        self.memory_ttl_seconds = memory_ttl_seconds
+
+        # Canonical URL -> (article ID, time after which the store is asked again)
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._counters = {'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'expired': 0, 'store_errors': 0}
+
+    def _remember(self, canonical_url: str, article_id: str) -> None:
+        self._entries[canonical_url] = (article_id, time.monotonic() + self.memory_ttl_seconds)
+        self._entries.move_to_end(canonical_url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def find(self, *urls: Optional[str]) -> Optional[str]:
+        """
+        Return the article ID stored for the first of the given URLs that is indexed.
+
+        :param urls: URLs to look up, in any form; None and non-http URLs are skipped.
+        :return: The existing article ID, or None.
+        """
+        canonical_urls = [canonical for canonical in map(canonicalize_url, urls) if canonical]
+        for canonical_url in canonical_urls:
+            entry = self._entries.get(canonical_url)
+            if entry is None:
+                continue
+            article_id, expires_at = entry
+            if time.monotonic() >= expires_at:
+                # Confirm against the store, which reflects deletions made by other processes
+                del self._entries[canonical_url]
+                self._counters['expired'] += 1
+                continue
+            self._entries.move_to_end(canonical_url)
+            self._counters['memory_hits'] += 1
+            return article_id
+
+        if self.lookup is not None:
+            for canonical_url in canonical_urls:
+                try:
+                    article_id = await self.lookup(url_key(canonical_url))
+                except Exception as e:
+                    self._counters['store_errors'] += 1
+                    logger.warning(f"URL index lookup failed for {canonical_url}: {e}")
+                    continue
+                if article_id:
+                    self._counters['store_hits'] += 1
+                    self._remember(canonical_url, article_id)
+                    return article_id
+
+        self._counters['misses'] += 1
+        return None
+
+    async def add(self, urls: Iterable[Optional[str]], article_id: str, persist: bool = True) -> None:
+        """
+        Index each of the given URLs as pointing at article_id.
+
+        :param urls: URLs of the article; None entries are ignored.
+        :param article_id: The article they point at.
+        :param persist: Also write the entries to the store. If False they are kept in memory only,
+                        and expire with the memory tier.
+        """
+        canonical_urls = {canonical for canonical in map(canonicalize_url, urls) if canonical}
+        for canonical_url in canonical_urls:
+            self._remember(canonical_url, article_id)
+            if self.store is None or not persist:
+                continue
+            try:
+                await self.store(url_key(canonical_url), canonical_url, article_id)
+            except Exception as e:
+                self._counters['store_errors'] += 1
+                logger.warning(f"Failed to persist URL index entry for {canonical_url}: {e}")
+        if canonical_urls:
+            logger.debug(f"Indexed {len(canonical_urls)} URL(s) for article {article_id}")
+
+    def forget_article(self, article_id: str) -> None:
+        """Drop in-memory entries pointing at a deleted article."""
+        for canonical_url in [url for url, (stored_id, _) in self._entries.items() if stored_id == article_id]:
+            del self._entries[canonical_url]
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(self._entries), **self._counters}
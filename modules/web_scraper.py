@@ -13,31 +13,108 @@ process to facilitate debugging and optimization.
 """
 
 # Standard library imports
+import codecs
 import os
 import re
 import time
 import random
 from typing import Optional, Dict, Any, Generator
 from urllib.parse import urlparse
-from dateutil import parser
 import json
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 # Third-party imports
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-import spacy
+from bs4 import BeautifulSoup, FeatureNotFound
 
 # Local imports
 from modules.common_logger import setup_logger
-from modules.config import initialize_nlp
-import threading
-from functools import lru_cache
+from modules.config import NLP_BACKEND
+from modules.nlp_registry import nlp_registry
+from modules.http_session import HttpSessionManager
+from modules.text_processing import normalize_text
+from modules.nlp_worker_pool import NLPWorkerPool
+from modules.content_extractor import extract_main_text
+from modules.metadata_extractor import HeadMetadataParser, extract_head_metadata
+from modules.fingerprint import simhash
+from modules.rate_limiting import CircuitOpenError, HostLimiterRegistry, host_limiters
+
+def _select_html_parser() -> str:
+    """Prefer the C-backed lxml parser, falling back to the pure-Python html.parser."""
+    try:
+        BeautifulSoup("<html></html>", 'lxml')
+        return 'lxml'
+    except FeatureNotFound:
+        return 'html.parser'
+
+
+HTML_PARSER = _select_html_parser()
+
+# Cloud Run scraping service used as the second fetch backend
+CLOUD_RUN_URL = "https://scrape-webpage-1098359986679.us-south1.run.app"
+
+# Number of leading bytes searched for a <meta charset> declaration
+CHARSET_SNIFF_BYTES = 4096
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+
+
+class ContentRejectedError(Exception):
+    """Raised when a response body is rejected while it is being streamed."""
+
+
+class FetchedPage(str):
+    """
+    A downloaded HTML document that also carries the head metadata read while it was streamed,
+    so the metadata does not have to be extracted again. Behaves as a plain str everywhere else.
+    """
+
+    head_metadata: Optional[Dict[str, str]] = None
+
+    def __new__(cls, content: str, head_metadata: Optional[Dict[str, str]] = None):
+        page = super().__new__(cls, content)
+        page.head_metadata = head_metadata
+        return page
+
+
+class FetchSelectionPolicy:
+    """
+    Decides which fetched document wins a hedged fetch.
+    `grace_period` is how long to keep waiting for other backends after the first valid result.
+    """
+    grace_period = 0.0
+
+    def select(self, candidates: List[Tuple[str, str]]) -> Tuple[str, str]:
+        """Pick one (source, content) pair from the valid results received so far."""
+        raise NotImplementedError
+
+
+class FirstValidPolicy(FetchSelectionPolicy):
+    """Return the first valid document as soon as it arrives."""
+
+    def select(self, candidates: List[Tuple[str, str]]) -> Tuple[str, str]:
+        return candidates[0]
+
+
+class LongestContentPolicy(FetchSelectionPolicy):
+    """Return the longest valid document received within the grace period."""
+
+    def __init__(self, grace_period: float = 2.0):
+        self.grace_period = grace_period
+
+    def select(self, candidates: List[Tuple[str, str]]) -> Tuple[str, str]:
+        return max(candidates, key=lambda candidate: len(candidate[1]))
+
 
 class WebScraper:
-    def __init__(self, config: Dict[str, Any] = None):
-        """Initialize the WebScraper with configuration options."""
+    def __init__(self, config: Dict[str, Any] = None, session_manager: Optional[HttpSessionManager] = None,
+                 nlp_pool: Optional[NLPWorkerPool] = None, limiters: Optional[HostLimiterRegistry] = None):
+        """
+        Initialize the WebScraper with configuration options.
+        When a session_manager is given, its shared session is used and never closed by the scraper.
+        When a running nlp_pool is given, text normalization runs in its worker processes.
+        Fetches are limited per host by `limiters`, the process-wide host_limiters by default.
+        """
         self.logger = setup_logger("web_scraper")
         
         default_config = {
@@ -47,28 +124,45 @@ class WebScraper:
             'verify_ssl': True,
             'min_content_length': 1000,
             'max_sentence_length': 300,
+            'nlp_batch_size': 64,  # Paragraphs per nlp.pipe batch
+            'nlp_backend': NLP_BACKEND,  # 'full', 'senter', 'sentencizer' or 'regex'
+            'regex_segmentation_threshold': 1000000,  # Characters; larger inputs use 'regex'
             'max_content_length': 5000000,  # 5MB
+            'stream_chunk_size': 65536,  # Bytes read per chunk when streaming a response body
+            'allowed_content_types': ('text/html', 'application/xhtml+xml'),
+            'extraction_engine': 'density',  # 'density', 'trafilatura' or 'none'
+            'min_extracted_length': 200,  # Fall back to the full page text below this
+            'cloud_run_url': CLOUD_RUN_URL,
+            'fetch_mode': 'sequential',  # 'sequential' or 'hedged'
+            'hedge_delay': 0.0,  # Seconds before Cloud Run is started in hedged mode
+            'hedge_policy': 'longest',  # 'first_valid', 'longest' or a FetchSelectionPolicy
+            'hedge_grace_period': 2.0,  # Seconds to wait for a longer result in 'longest'
         }
         
         # Update configuration with user-provided settings
         self.config = {**default_config, **(config or {})}
-        self.cloud_run_url = "https://scrape-webpage-1098359986679.us-south1.run.app" 
+        self.cloud_run_url = self.config['cloud_run_url']
 
 
-        self.nlp_local = threading.local()
-
         # Initialize session
         self.session = None
+        self.session_manager = session_manager
+        self.nlp_pool = nlp_pool
+        self.host_limiters = limiters if limiters is not None else host_limiters
 
-    @lru_cache(maxsize=None)
-    def get_nlp(self):
-        if not hasattr(self.nlp_local, 'nlp'):
-            try:
-                self.nlp_local.nlp = initialize_nlp()
-            except Exception as e:
-                self.logger.error(f"Failed to initialize NLP model: {str(e)}")
-                raise
-        return self.nlp_local.nlp
+    def get_nlp(self, backend: Optional[str] = None):
+        """Return the process-wide pipeline for a backend, loading it on first use."""
+        try:
+            return nlp_registry.get(backend or self.config['nlp_backend'])
+        except Exception as e:
+            self.logger.error(f"Failed to initialize NLP model: {str(e)}")
+            raise
+
+    def _select_nlp_backend(self, text: str) -> str:
+        """Use the regex segmenter for inputs too large for the configured spaCy backend."""
+        if len(text) > self.config['regex_segmentation_threshold']:
+            return 'regex'
+        return self.config['nlp_backend']
     
     async def __aenter__(self):
         await self.create_session()
@@ -78,14 +172,16 @@ class WebScraper:
         await self.close_session()
         
     async def create_session(self):
-        if self.session is None:
+        if self.session_manager is not None:
+            self.session = await self.session_manager.get_session()
+        elif self.session is None:
             connector = aiohttp.TCPConnector(verify_ssl=self.config['verify_ssl'])
             self.session = aiohttp.ClientSession(connector=connector)
 
     async def close_session(self):
-        if self.session:
+        if self.session and self.session_manager is None:
             await self.session.close()
-            self.session = None
+        self.session = None
 
     def _get_random_user_agent(self) -> str:
         """Return a random user agent string."""
@@ -101,15 +197,19 @@ class WebScraper:
     async def fetch_webpage(self, url: str) -> Optional[str]:
         """
         Fetch webpage content with retry mechanism, using both local method and Cloud Run service.
+        The backends run one after the other in 'sequential' mode, or concurrently in 'hedged' mode.
         Args:
             url (str): The URL to fetch
         Returns:
-            Optional[Tuple[str, str]]: Tuple of (HTML content, source) if successfully retrieved, None otherwise
+            Optional[str]: HTML content if successfully retrieved, None otherwise
         """
         self.logger.info(f"Fetching webpage: {url}")
         
         await self.create_session()
 
+        if self.config['fetch_mode'] == 'hedged':
+            return await self._fetch_hedged(url)
+
         local_content = await self._fetch_local(url)
         cloud_run_content = await self._fetch_cloud_run(url)
         
@@ -126,21 +226,109 @@ class WebScraper:
         self.logger.error("Failed to retrieve content from both local and Cloud Run methods")
         return None
 
+    def _get_selection_policy(self) -> 'FetchSelectionPolicy':
+        """Resolve the configured hedge policy (a name or a FetchSelectionPolicy instance)."""
+        policy = self.config['hedge_policy']
+        if isinstance(policy, FetchSelectionPolicy):
+            return policy
+        if policy == 'first_valid':
+            return FirstValidPolicy()
+        if policy == 'longest':
+            return LongestContentPolicy(self.config['hedge_grace_period'])
+        raise ValueError(f"Unknown hedge policy: {policy}")
+
+    async def _fetch_hedged(self, url: str) -> Optional[str]:
+        """
+        Run the local and Cloud Run fetches concurrently and pick a winner.
+
+        Cloud Run is started after `hedge_delay` seconds unless the local fetch has already
+        succeeded by then. Once the first valid result arrives, the selection policy's grace
+        period decides how long to wait for the other backend before the loser is cancelled.
+        """
+        policy = self._get_selection_policy()
+        loop = asyncio.get_running_loop()
+
+        local_task = asyncio.create_task(self._fetch_local(url))
+        cloud_run_task = asyncio.create_task(
+            self._fetch_cloud_run_hedged(url, local_task, self.config['hedge_delay'])
+        )
+        pending = {local_task: 'local', cloud_run_task: 'cloud_run'}
+        candidates = []
+        deadline = None
+
+        try:
+            while pending:
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                done, _ = await asyncio.wait(pending.keys(), timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.logger.info("Hedge grace period expired, cancelling remaining fetch")
+                    break
+
+                for task in done:
+                    source = pending.pop(task)
+                    try:
+                        content = task.result()
+                    except Exception as e:
+                        self.logger.warning(f"Hedged {source} fetch raised: {str(e)}")
+                        content = None
+                    if content:
+                        candidates.append((source, content))
+                        if deadline is None:
+                            deadline = loop.time() + policy.grace_period
+
+                if candidates and policy.grace_period <= 0:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending.keys(), return_exceptions=True)
+
+        if not candidates:
+            self.logger.error("Failed to retrieve content from both local and Cloud Run methods")
+            return None
+
+        source, content = policy.select(candidates)
+        self.logger.info(f"Hedged fetch selected {source} content ({len(content)} characters)")
+        return content
+
+    async def _fetch_cloud_run_hedged(self, url: str, local_task: asyncio.Task,
+                                      delay: float) -> Optional[str]:
+        """Start the Cloud Run fetch once the hedge delay expires or the local fetch fails."""
+        if delay > 0:
+            await asyncio.wait({local_task}, timeout=delay)
+            if local_task.done() and not local_task.cancelled() \
+                    and local_task.exception() is None and local_task.result():
+                self.logger.info("Local fetch succeeded within hedge delay, skipping Cloud Run")
+                return None
+        return await self._fetch_cloud_run(url)
+
     async def _fetch_local(self, url: str) -> Optional[str]:
+        limiter = self.host_limiters.get(urlparse(url).hostname or url)
         for attempt in range(self.config['retry_attempts']):
             self.logger.info(f"Local attempt {attempt + 1} of {self.config['retry_attempts']}")
             
             try:
                 headers = {'User-Agent': self._get_random_user_agent()}
-                async with self.session.get(url, timeout=self.config['timeout'], headers=headers) as response:
-                    response.raise_for_status()
-                    content = await response.text()
-                    if self._is_valid_content(content):
-                        self.logger.info("Successfully retrieved content locally")
-                        return content
-                    
-                    self.logger.warning("Retrieved local content is not valid")
+                async with limiter.acquire():
+                    async with self.session.get(url, timeout=self.config['timeout'], headers=headers) as response:
+                        response.raise_for_status()
+                        content = await self._read_body(response)
+                if self._is_valid_content(content):
+                    self.logger.info("Successfully retrieved content locally")
+                    return content
+                
+                self.logger.warning("Retrieved local content is not valid")
                     
+            except CircuitOpenError as e:
+                self.logger.warning(f"Local fetch skipped: {str(e)}")
+                return None
+            except ContentRejectedError as e:
+                # Retrying would only download the same oversized or non-HTML body again
+                self.logger.warning(f"Local fetch aborted: {str(e)}")
+                return None
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Local fetch timed out after {self.config['timeout']} seconds")
             except aiohttp.ClientError as e:
                 self.logger.warning(f"Local fetch failed: {str(e)}")
             
@@ -154,24 +342,29 @@ class WebScraper:
     
 
     async def _fetch_cloud_run(self, url: str) -> Optional[str]:
+        limiter = self.host_limiters.get(urlparse(self.cloud_run_url).hostname or self.cloud_run_url)
         for attempt in range(self.config['retry_attempts']):
             self.logger.info(f"Cloud Run attempt {attempt + 1} of {self.config['retry_attempts']}")
             
             try:
                 params = {'url': url}
-                async with self.session.get(self.cloud_run_url, params=params, timeout=self.config['timeout']) as response:
-                    response.raise_for_status()
-                    result = await response.json()
-                    if result['status'] == 'success':
-                        content = result['content']
-                        if self._is_valid_content(content):
-                            self.logger.info("Successfully retrieved content from Cloud Run")
-                            return content
-                        
-                        self.logger.warning("Retrieved Cloud Run content is not valid")
-                    else:
-                        self.logger.warning(f"Cloud Run fetch failed: {result.get('error', 'Unknown error')}")
+                async with limiter.acquire():
+                    async with self.session.get(self.cloud_run_url, params=params, timeout=self.config['timeout']) as response:
+                        response.raise_for_status()
+                        result = await response.json()
+                if result['status'] == 'success':
+                    content = result['content']
+                    if self._is_valid_content(content):
+                        self.logger.info("Successfully retrieved content from Cloud Run")
+                        return content
+                    
+                    self.logger.warning("Retrieved Cloud Run content is not valid")
+                else:
+                    self.logger.warning(f"Cloud Run fetch failed: {result.get('error', 'Unknown error')}")
                         
+            except CircuitOpenError as e:
+                self.logger.warning(f"Cloud Run fetch skipped: {str(e)}")
+                return None
             except asyncio.TimeoutError:
                 self.logger.warning(f"Cloud Run fetch timed out after {self.config['timeout']} seconds")
             except aiohttp.ClientError as e:
@@ -187,6 +380,63 @@ class WebScraper:
         self.logger.error("Failed to retrieve content from Cloud Run after all attempts")
         return None
 
+    async def _read_body(self, response: aiohttp.ClientResponse) -> 'FetchedPage':
+        """
+        Stream the response body in chunks, enforcing the content-type and size limits while
+        reading, and decode it incrementally with the declared or sniffed charset. The head
+        metadata is parsed from the decoded chunks as they arrive, until the head ends.
+        Raises ContentRejectedError as soon as a limit is crossed.
+        """
+        mime_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if mime_type and mime_type not in self.config['allowed_content_types']:
+            raise ContentRejectedError(f"Unsupported content type: {mime_type}")
+
+        max_bytes = self.config['max_content_length']
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise ContentRejectedError(f"Declared length {response.content_length} exceeds {max_bytes} bytes")
+
+        decoder = None
+        head = bytearray()
+        parts = []
+        bytes_read = 0
+        metadata_parser = HeadMetadataParser()
+
+        async for chunk in response.content.iter_chunked(self.config['stream_chunk_size']):
+            bytes_read += len(chunk)
+            if bytes_read > max_bytes:
+                raise ContentRejectedError(f"Body exceeds {max_bytes} bytes, aborting download")
+
+            if decoder is None:
+                # Buffer the start of the document until a <meta charset> can be sniffed
+                head.extend(chunk)
+                if len(head) < CHARSET_SNIFF_BYTES:
+                    continue
+                decoder = self._get_decoder(response.charset, bytes(head))
+                parts.append(decoder.decode(bytes(head)))
+            else:
+                parts.append(decoder.decode(chunk))
+            metadata_parser.feed(parts[-1])
+
+        if decoder is None:
+            decoder = self._get_decoder(response.charset, bytes(head))
+            parts.append(decoder.decode(bytes(head)))
+            metadata_parser.feed(parts[-1])
+        parts.append(decoder.decode(b'', final=True))
+        return FetchedPage(''.join(parts), metadata_parser.metadata())
+
+    def _get_decoder(self, declared_charset: Optional[str], head: bytes) -> codecs.IncrementalDecoder:
+        """Build an incremental decoder for the declared charset, the sniffed one, or UTF-8."""
+        match = META_CHARSET_PATTERN.search(head[:CHARSET_SNIFF_BYTES])
+        sniffed_charset = match.group(1).decode('ascii') if match else None
+        for charset in (declared_charset, sniffed_charset):
+            if not charset:
+                continue
+            try:
+                return codecs.getincrementaldecoder(charset)(errors='replace')
+            except LookupError:
+                self.logger.warning(f"Unknown charset '{charset}', ignoring")
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
     def _is_valid_content(self, content: Optional[str]) -> bool:
         """
         Validate if the retrieved content is proper HTML and has sufficient content.
@@ -205,6 +455,71 @@ class WebScraper:
             
         return True
 
+    def _parse_html(self, html_content: str) -> BeautifulSoup:
+        """
+        Parse HTML into a BeautifulSoup tree using the fastest available parser.
+        This is CPU-bound and should be called from an executor.
+        """
+        return BeautifulSoup(html_content, HTML_PARSER)
+
+    def _extract_text_from_soup(self, soup: BeautifulSoup,
+                                html_content: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Return the main text of the tree and extraction statistics.
+        Boilerplate is removed with the configured extraction engine ('density', 'trafilatura'
+        or 'none'); if the engine finds too little text, the full visible text is used instead.
+        """
+        for script in soup(["script", "style"]):
+            script.decompose()
+        full_text = soup.get_text()
+
+        engine = self.config['extraction_engine']
+        text = None
+        if engine == 'density':
+            text = extract_main_text(soup)
+        elif engine == 'trafilatura' and html_content:
+            text = self._extract_with_trafilatura(html_content)
+
+        if engine != 'none' and (not text or len(text) < self.config['min_extracted_length']):
+            self.logger.warning(f"{engine} extraction found too little text, using the full page text")
+            text = None
+        if text is None:
+            engine, text = 'none', full_text
+
+        stats = {
+            'engine': engine,
+            'original_characters': len(full_text),
+            'extracted_characters': len(text),
+            'removed_characters': max(len(full_text) - len(text), 0),
+        }
+        self.logger.info(f"Boilerplate removal ({engine}) removed {stats['removed_characters']} of "
+                         f"{stats['original_characters']} characters")
+        return text, stats
+
+    def _extract_with_trafilatura(self, html_content: str) -> Optional[str]:
+        """Extract the main text with trafilatura, which parses the document itself."""
+        try:
+            import trafilatura
+            return trafilatura.extract(html_content, include_comments=False, include_tables=True,
+                                       favor_recall=True)
+        except Exception as e:
+            self.logger.error(f"trafilatura extraction failed: {str(e)}")
+            return None
+
+    def _parse_document(self, html_content: str) -> Tuple[Dict[str, str], str, Dict[str, Any]]:
+        """
+        Parse the document once and extract main text and extraction statistics from the tree.
+        Metadata comes from the head: already read while downloading for a FetchedPage,
+        otherwise read with the head-only tokenizer.
+        """
+        start_time = time.perf_counter()
+        metadata = getattr(html_content, 'head_metadata', None) or extract_head_metadata(html_content)
+        soup = self._parse_html(html_content)
+        text, extraction_stats = self._extract_text_from_soup(soup, html_content)
+        self.logger.info(f"Parsed {len(html_content)} characters of HTML with {HTML_PARSER} "
+                         f"in {time.perf_counter() - start_time:.3f}s")
+        return metadata, text, extraction_stats
+
     async def extract_content(self, html_content: str) -> Optional[str]:
         """
         Extract main content from HTML.
@@ -212,14 +527,10 @@ class WebScraper:
         self.logger.info("Extracting content")
         try:
             loop = asyncio.get_running_loop()
-            soup = await loop.run_in_executor(None, lambda: BeautifulSoup(html_content, 'html.parser'))
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-
-            # Get text
-            text = await loop.run_in_executor(None, soup.get_text)
+            # Parse and get text in a single executor call to keep the event loop free
+            text, _ = await loop.run_in_executor(
+                None, lambda: self._extract_text_from_soup(self._parse_html(html_content), html_content)
+            )
             
             # Process text (this can be CPU-intensive, so we run it in an executor)
             processed_text = await self.process_text(text)
@@ -234,33 +545,33 @@ class WebScraper:
     async def process_text(self, text: str) -> Optional[str]:
         """
         Process and clean text while preserving all sentences and structure.
+        Each paragraph is segmented once, in batches, in the NLP worker pool if one is
+        running or otherwise in a single thread-pool executor call.
         """
         try:
             self.logger.info(f"Processing text of length: {len(text)} characters")
             
-            loop = asyncio.get_running_loop()
-            nlp = self.get_nlp()
-
-            # Split text into paragraphs while preserving empty lines
-            paragraphs = text.split('\n')
-            processed_paragraphs = []
-
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    doc = await loop.run_in_executor(None, nlp, paragraph)
-                    processed_sentences = await asyncio.gather(*[
-                        loop.run_in_executor(None, self.split_long_sentences, sent.text.strip())
-                        for sent in doc.sents if sent.text.strip()
-                    ])
-                    processed_paragraphs.append(' '.join(processed_sentences))
-                else:
-                    processed_paragraphs.append('')
-            
-            # Join paragraphs with newlines, preserving structure
-            final_text = '\n'.join(processed_paragraphs)
-            
-            # Remove consecutive empty lines while preserving structure
-            final_text = re.sub(r'\n{3,}', '\n\n', final_text)
+            backend = self._select_nlp_backend(text)
+            self.logger.info(f"Using NLP backend: {backend}")
+
+            if self.nlp_pool is not None and self.nlp_pool.running:
+                final_text = await self.nlp_pool.normalize_text(
+                    text,
+                    self.config['max_sentence_length'],
+                    self.config['nlp_batch_size'],
+                    backend=backend
+                )
+            else:
+                loop = asyncio.get_running_loop()
+                nlp = self.get_nlp(backend)
+                final_text = await loop.run_in_executor(
+                    None,
+                    normalize_text,
+                    nlp,
+                    text,
+                    self.config['max_sentence_length'],
+                    self.config['nlp_batch_size']
+                )
             
             self.logger.info(f"Successfully processed text: {len(final_text)} characters. "
                  f"Preview: {final_text[:100]}...{final_text[-100:]}")
@@ -270,72 +581,35 @@ class WebScraper:
             self.logger.error(f"Error processing text: {str(e)}", exc_info=True)
             return None
 
-    def split_long_sentences(self, text: str) -> str:
-        max_length = self.config['max_sentence_length']
-        nlp = self.get_nlp()
-        doc = nlp(text)
-        split_sentences = []
-        for sent in doc.sents:
-            if len(sent.text) > max_length:
-                # Split long sentence at logical points (e.g., commas, conjunctions)
-                sub_sentences = re.split(r'[,;]|\sand\s|\sbut\s', sent.text)
-                split_sentences.extend([s.strip() for s in sub_sentences if s.strip()])
-            else:
-                split_sentences.append(sent.text.strip())
-        return ' '.join(split_sentences)
-
-
     async def extract_article_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
         """
         Extract article metadata from HTML.
         """
-        self.logger.info("Extracting article metadata")
-        
-        metadata = {
-            'title': '',
-            'author': '',
-            'date': '',
-            'description': ''
-        }
-        
         loop = asyncio.get_running_loop()
-        
-        # Extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = await loop.run_in_executor(None, lambda: title_tag.text.strip())
-        
-        # Extract author
-        author_tag = soup.find('meta', attrs={'name': 'author'})
-        if author_tag:
-            metadata['author'] = author_tag.get('content', '').strip()
-        
-        # Extract date
-        date_tag = soup.find('meta', attrs={'property': 'article:published_time'})
-        if date_tag:
-            date_str = date_tag.get('content', '')
-            try:
-                parsed_date = await loop.run_in_executor(None, parser.parse, date_str)
-                metadata['date'] = parsed_date.isoformat()
-            except ValueError:
-                self.logger.warning(f"Could not parse date: {date_str}")
-        
-        # Extract description
-        desc_tag = soup.find('meta', attrs={'name': 'description'})
-        if desc_tag:
-            metadata['description'] = desc_tag.get('content', '').strip()
-        
+        return await loop.run_in_executor(None, self._extract_metadata_from_soup, soup)
+
+    def _extract_metadata_from_soup(self, soup: BeautifulSoup) -> Dict[str, str]:
+        """
+        Extract article metadata from an already parsed tree by re-reading its head
+        (JSON-LD, OpenGraph, Twitter, <meta> and <title>, in that priority order).
+        """
+        self.logger.info("Extracting article metadata")
+        metadata = extract_head_metadata(str(soup.head) if soup.head else str(soup))
         self.logger.info("Metadata extraction completed")
         return metadata
 
     async def scrape_article(self, url: str = None, raw_content: str = None) -> Optional[Dict[str, str]]:
+        """
+        Scrape an article from a URL or from raw HTML. When both are given, the HTML is used
+        as already fetched and the URL is only recorded.
+        """
         self.logger.info(f"Starting article scraping{' for URL: ' + url if url else ''}")
         
         try:
-            if url:
-                html_content = await self.fetch_webpage(url)
-            elif raw_content:
+            if raw_content:
                 html_content = raw_content
+            elif url:
+                html_content = await self.fetch_webpage(url)
             else:
                 raise ValueError("Either URL or HTML content must be provided")
             
@@ -343,23 +617,27 @@ class WebScraper:
                 self.logger.error("Failed to retrieve HTML content")
                 return None
             
-            soup = BeautifulSoup(html_content, 'html.parser')
-            metadata = await self.extract_article_metadata(soup)
-            
-            main_content = await self.extract_content(html_content)
-            if not main_content:
-                self.logger.error("Failed to extract main content")
-                return None
+            # Parse once, off the event loop, and share the tree between metadata and text
+            loop = asyncio.get_running_loop()
+            metadata, text, extraction_stats = await loop.run_in_executor(
+                None, self._parse_document, html_content
+            )
             
-            processed_text = await self.process_text(main_content)
+            processed_text = await self.process_text(text)
             if not processed_text:
                 self.logger.error("Failed to process text")
                 return None
             
+            # Content fingerprint for near-duplicate detection (syndicated copies under other URLs);
+            # None when the text is too short to fingerprint
+            fingerprint = await loop.run_in_executor(None, simhash, processed_text)
+            
             result = {
                 'url': url,
                 'content': processed_text,
-                **metadata
+                **metadata,
+                'fingerprint': fingerprint,
+                'extraction_stats': extraction_stats
             }
             self._log_extraction_results(result)
             return result
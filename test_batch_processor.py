@@ -0,0 +1,115 @@
+# test_batch_processor.py
+
+import asyncio
+import logging
+import unittest
+from modules.batch_processor import BatchProcessor, DONE, FAILED
+from modules.common_logger import get_job_context
+
+
+class FakePipeline:
+    """Stage callables that record peak concurrency per stage."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.active = {'fetch': 0, 'extract': 0, 'generate': 0}
+        self.peak = {'fetch': 0, 'extract': 0, 'generate': 0}
+        self.job_ids = []
+
+    async def _run(self, stage):
+        self.active[stage] += 1
+        self.peak[stage] = max(self.peak[stage], self.active[stage])
+        await asyncio.sleep(self.delay)
+        self.active[stage] -= 1
+
+    async def fetch(self, url):
+        await self._run('fetch')
+        self.job_ids.append(get_job_context())
+        return None if 'missing' in url else f"<html>{url}</html>"
+
+    async def extract(self, url, html_content):
+        await self._run('extract')
+        return {'url': url, 'content': html_content}
+
+    async def generate(self, content):
+        await self._run('generate')
+        return content.upper()
+
+    async def save(self, article_data, text):
+        return f"id-{article_data['url'][-1]}"
+
+
+class TestBatchProcessor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.pipeline = FakePipeline()
+        self.processor = BatchProcessor(self.pipeline.fetch, self.pipeline.extract, self.pipeline.generate,
+                                        self.pipeline.save, fetch_concurrency=3, nlp_concurrency=2,
+                                        llm_concurrency=1, max_urls=20)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_submit_deduplicates_preserving_order(self):
+        batch = self.processor.submit(['https://a.test/1', ' https://a.test/2 ', 'https://a.test/1', '', None])
+        self.assertEqual([item.url for item in batch.items], ['https://a.test/1', 'https://a.test/2'])
+        self.assertEqual(batch.duplicates, 1)
+        self.assertEqual(batch.invalid, 2)
+        self.assertEqual(batch.to_dict()['invalid_removed'], 2)
+        self.assertIs(self.processor.get(batch.batch_id), batch)
+
+    def test_submit_rejects_empty_and_oversized_batches(self):
+        with self.assertRaises(ValueError):
+            self.processor.submit([])
+        with self.assertRaises(ValueError):
+            self.processor.submit([f"https://a.test/{n}" for n in range(21)])
+
+    async def test_run_respects_stage_limits(self):
+        batch = self.processor.submit([f"https://a.test/{n}" for n in range(10)])
+        await self.processor.run(batch)
+
+        self.assertTrue(batch.finished)
+        self.assertEqual(batch.to_dict()['counts'], {DONE: 10})
+        self.assertLessEqual(self.pipeline.peak['fetch'], 3)
+        self.assertLessEqual(self.pipeline.peak['extract'], 2)
+        self.assertEqual(self.pipeline.peak['generate'], 1)
+        self.assertEqual(batch.items[3].article_id, 'id-3')
+
+    async def test_failures_are_recorded_per_item(self):
+        batch = self.processor.submit(['https://a.test/1', 'https://a.test/missing', 'ftp://a.test/2'])
+        await self.processor.run(batch)
+
+        statuses = {item.url: (item.status, item.error) for item in batch.items}
+        self.assertEqual(statuses['https://a.test/1'], (DONE, None))
+        self.assertEqual(statuses['https://a.test/missing'], (FAILED, 'Failed to fetch page'))
+        self.assertEqual(statuses['ftp://a.test/2'], (FAILED, 'Invalid URL'))
+
+    async def test_ingested_urls_are_skipped_unless_refreshed(self):
+        async def find_existing(url, article_data):
+            return 'existing' if url.endswith('/1') else None
+
+        processor = BatchProcessor(self.pipeline.fetch, self.pipeline.extract, self.pipeline.generate,
+                                   self.pipeline.save, find_existing=find_existing)
+        batch = processor.submit(['https://a.test/1', 'http://www.a.test/1/?utm_source=x', 'https://a.test/2'])
+        self.assertEqual(batch.duplicates, 1)
+        await processor.run(batch)
+
+        self.assertEqual([(item.article_id, item.duplicate) for item in batch.items],
+                         [('existing', True), ('id-2', False)])
+        self.assertEqual(len(self.pipeline.job_ids), 1)
+
+        batch = processor.submit(['https://a.test/1'], force_refresh=True)
+        await processor.run(batch)
+        self.assertEqual((batch.items[0].article_id, batch.items[0].duplicate), ('id-1', False))
+
+    async def test_each_item_logs_under_its_own_job_id(self):
+        batch = self.processor.submit([f"https://a.test/{n}" for n in range(4)])
+        await self.processor.run(batch)
+
+        self.assertEqual(sorted(self.pipeline.job_ids), sorted(item.job_id for item in batch.items))
+        self.assertIsNone(get_job_context())
+
+
+if __name__ == '__main__':
+    unittest.main()
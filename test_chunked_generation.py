@@ -0,0 +1,150 @@
+# test_chunked_generation.py
+
+import asyncio
+import logging
+import unittest
+from types import SimpleNamespace
+from modules import article_pipeline
+from modules.chunked_generation import chunk_text, estimate_tokens, generate_chunked, merge_chunks, split_paragraphs
+from modules.llm_backends import extract_article_text
+from modules.llm_metrics import prompt_type
+
+
+def make_article(paragraph_count, sentences_per_paragraph=6):
+    return '\n\n'.join(
+        ' '.join(f"Paragraph {p} sentence {s} talks about the council budget in some detail."
+                 for s in range(sentences_per_paragraph))
+        for p in range(paragraph_count)
+    )
+
+
+class TestChunkText(unittest.TestCase):
+
+    def test_short_text_is_one_chunk(self):
+        text = "First paragraph.\nSecond paragraph."
+        self.assertEqual(chunk_text(text, max_tokens=100), ["First paragraph.\n\nSecond paragraph."])
+
+    def test_chunks_respect_budget_and_paragraph_boundaries(self):
+        text = make_article(30)
+        paragraphs = split_paragraphs(text)
+        chunks = chunk_text(text, max_tokens=500, overlap=0)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 500 + 10)
+            for paragraph in split_paragraphs(chunk):
+                self.assertIn(paragraph, paragraphs)
+        self.assertEqual([p for chunk in chunks for p in split_paragraphs(chunk)], paragraphs)
+
+    def test_overlap_repeats_previous_paragraph(self):
+        chunks = chunk_text(make_article(30), max_tokens=500, overlap=1)
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertEqual(split_paragraphs(current)[0], split_paragraphs(previous)[-1])
+
+    def test_oversized_paragraph_is_split_at_sentences(self):
+        paragraph = make_article(1, sentences_per_paragraph=200)
+        chunks = chunk_text(paragraph, max_tokens=300, overlap=0)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.endswith('detail.') for chunk in chunks))
+
+
+class TestMergeChunks(unittest.TestCase):
+
+    def test_reworded_overlap_is_dropped_at_the_seam(self):
+        outputs = [
+            "Alpha paragraph one.\n\nThe mayor said the budget would pass on Tuesday.",
+            "The mayor said the budget will pass on Tuesday.\n\nBeta paragraph two.",
+        ]
+        self.assertEqual(merge_chunks(outputs, overlap=1),
+                         "Alpha paragraph one.\n\nThe mayor said the budget would pass on Tuesday.\n\nBeta paragraph two.")
+
+    def test_distinct_paragraphs_are_kept(self):
+        outputs = ["First window text.", "Completely different second window."]
+        self.assertEqual(merge_chunks(outputs, overlap=1),
+                         "First window text.\n\nCompletely different second window.")
+
+
+class TestGenerateChunked(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_passes_run_per_chunk_in_parallel_and_reassemble_in_order(self):
+        in_flight = 0
+        peak = 0
+        prompts = []
+
+        async def generate(prompt):
+            nonlocal in_flight, peak
+            prompts.append(prompt)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            # Echo the article text back, as a cleaning pass that changes nothing would
+            return prompt.split('ARTICLE:\n', 1)[1]
+
+        text = make_article(30)
+        result = await generate_chunked(generate, text, ["CLEAN ARTICLE:\n{article_text}",
+                                                         "READ ARTICLE:\n{article_text}"],
+                                        max_tokens=500, concurrency=3, overlap=1)
+        chunk_count = len(chunk_text(text, max_tokens=500, overlap=1))
+        self.assertEqual(result, '\n\n'.join(split_paragraphs(text)))
+        self.assertEqual(len(prompts), 2 * chunk_count)
+        self.assertEqual(peak, 3)
+
+
+class RewordingGenerator:
+    """Cleans by echoing the article; rewords every paragraph differently on each readability call."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content(self, user_prompt):
+        self.prompts.append(user_prompt)
+        text = extract_article_text(user_prompt)
+        if prompt_type(user_prompt) != 'readability':
+            return text
+        # Alternate calls change the case of every letter, so copies of a paragraph from two calls differ
+        reword = str.upper if len(self.prompts) % 2 else str.lower
+        return '\n\n'.join(reword(paragraph) for paragraph in split_paragraphs(text))
+
+
+class TestChunkedArticleText(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.generator = RewordingGenerator()
+        self.original = (article_pipeline.content_generators, article_pipeline.LLM_PIPELINING_ENABLED,
+                         article_pipeline.LLM_CHUNKING_ENABLED, article_pipeline.LLM_CHUNK_TOKENS)
+        article_pipeline.content_generators = SimpleNamespace(get=lambda: self.generator)
+        article_pipeline.LLM_PIPELINING_ENABLED = False
+        article_pipeline.LLM_CHUNKING_ENABLED = True
+        article_pipeline.LLM_CHUNK_TOKENS = 500
+
+    def tearDown(self):
+        (article_pipeline.content_generators, article_pipeline.LLM_PIPELINING_ENABLED,
+         article_pipeline.LLM_CHUNKING_ENABLED, article_pipeline.LLM_CHUNK_TOKENS) = self.original
+        logging.disable(logging.NOTSET)
+
+    async def test_overlap_reworded_per_window_is_not_duplicated(self):
+        text = make_article(30)
+        result = await article_pipeline.generate_article_text(text, tts_mode='llm')
+        paragraphs = split_paragraphs(result)
+        self.assertEqual(len(paragraphs), 30)
+        for index, source in enumerate(split_paragraphs(text)):
+            self.assertEqual(source.lower(), paragraphs[index].lower())
+        # The clean pass runs per overlapping window, the readability pass over the merged text
+        clean_calls = [prompt for prompt in self.generator.prompts if prompt_type(prompt) == 'clean']
+        self.assertEqual(len(clean_calls), len(chunk_text(text, max_tokens=500)))
+
+    async def test_article_under_the_limit_is_not_chunked(self):
+        article_pipeline.LLM_CHUNK_TOKENS = 7000
+        await article_pipeline.generate_article_text(make_article(30), tts_mode='llm')
+        self.assertEqual([prompt_type(prompt) for prompt in self.generator.prompts], ['clean', 'readability'])
+
+
+if __name__ == '__main__':
+    unittest.main()
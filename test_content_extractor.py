@@ -0,0 +1,48 @@
+# test_content_extractor.py
+
+import os
+import unittest
+from bs4 import BeautifulSoup
+from modules.content_extractor import extract_main_text
+from modules.web_scraper import WebScraper
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'fixtures', 'medium_article.html')
+
+
+class TestContentExtractor(unittest.TestCase):
+
+    def setUp(self):
+        with open(FIXTURE, encoding='utf-8') as fixture:
+            self.html_content = fixture.read()
+
+    def test_removes_boilerplate_and_keeps_article(self):
+        text = extract_main_text(BeautifulSoup(self.html_content, 'lxml'))
+        self.assertIn("City approves road repair budget", text)
+        self.assertIn("Section 5: Council update", text)
+        for boilerplate in ("We use cookies", "Related stories", "Great article", "All rights reserved", "Podcasts"):
+            self.assertNotIn(boilerplate, text)
+
+    def test_one_block_per_paragraph(self):
+        html_content = "<html><body><div><p>" + "Words, more words. " * 5 + "</p><p>Second paragraph here.</p></div></body></html>"
+        text = extract_main_text(BeautifulSoup(html_content, 'lxml'))
+        self.assertEqual(text.split('\n\n')[1], "Second paragraph here.")
+
+    def test_keeps_article_in_page_wide_form_and_shareable_containers(self):
+        paragraphs = "".join(f"<p>Paragraph {index}, with enough words to be scored as content.</p>"
+                             for index in range(4))
+        html_content = (f"<html><body><form id='aspnetForm'><div class='article-body shareable'>{paragraphs}"
+                        "</div><div class='share-buttons'>Share on social</div></form></body></html>")
+        text = extract_main_text(BeautifulSoup(html_content, 'lxml'))
+        self.assertIn("Paragraph 3", text)
+        self.assertNotIn("Share on social", text)
+
+    def test_scraper_reports_removed_characters(self):
+        scraper = WebScraper()
+        _, text, stats = scraper._parse_document(self.html_content)
+        self.assertEqual(stats['engine'], 'density')
+        self.assertEqual(stats['extracted_characters'], len(text))
+        self.assertGreater(stats['removed_characters'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_content_generator_registry.py
+
+import logging
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from modules.google_api_interface import ContentGeneratorRegistry, DEFAULT_MODEL_NAME
+from modules.llm_cache import LLMResponseCache
+
+
+class FakeGenerator:
+    created = 0
+    lock = threading.Lock()
+
+    def __init__(self, model_name, cache=None, governor=None):
+        # Slow construction, as vertexai.init and GenerativeModel are
+        time.sleep(0.05)
+        with FakeGenerator.lock:
+            FakeGenerator.created += 1
+        self.model_name = model_name
+        self.cache = cache
+        self.requests = {'generate': 0, 'stream': 0}
+        self.model = self
+        self.warmup_prompts = []
+
+    def generate_content(self, content, generation_config=None):
+        self.warmup_prompts.append(content[0])
+
+
+class TestContentGeneratorRegistry(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        FakeGenerator.created = 0
+        self.cache = LLMResponseCache(enabled=True)
+        self.registry = ContentGeneratorRegistry(cache=self.cache, factory=FakeGenerator)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_one_generator_per_model_across_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            generators = list(executor.map(lambda _: self.registry.get(), range(16)))
+        self.assertEqual(FakeGenerator.created, 1)
+        self.assertTrue(all(generator is generators[0] for generator in generators))
+        self.assertEqual(generators[0].model_name, DEFAULT_MODEL_NAME)
+        self.assertIs(generators[0].cache, self.cache)
+        self.assertEqual(self.registry.stats()['created'], 1)
+        self.assertEqual(self.registry.stats()['reused'], 15)
+
+    def test_models_get_separate_generators(self):
+        self.assertIsNot(self.registry.get("model-a"), self.registry.get("model-b"))
+        self.assertIs(self.registry.get("model-a"), self.registry.get("model-a"))
+        self.assertEqual(set(self.registry.stats()['models']), {"model-a", "model-b"})
+
+    def test_stats_report_calls_per_model_instance(self):
+        for _ in range(3):
+            self.registry.get("model-a").requests['generate'] += 1
+        self.registry.get("model-b").requests['stream'] += 1
+        stats = self.registry.stats()
+        self.assertEqual(stats['models']['model-a'], {'generate': 3, 'stream': 0, 'calls': 3})
+        self.assertEqual(stats['model_instances'], {'unknown': 2})
+        self.assertEqual(stats['calls_per_model_instance'], 2.0)
+
+    async def test_warmup_creates_generator_and_optionally_sends_a_request(self):
+        await self.registry.warmup()
+        generator = self.registry.get()
+        self.assertEqual(generator.warmup_prompts, [])
+        await self.registry.warmup(send_request=True)
+        self.assertEqual(len(generator.warmup_prompts), 1)
+        self.assertIn(DEFAULT_MODEL_NAME, self.registry.stats()['warmup_seconds'])
+        self.assertEqual(FakeGenerator.created, 1)
+
+    async def test_warmup_failures_are_logged_not_raised(self):
+        def failing_factory(model_name, cache=None, governor=None):
+            raise RuntimeError("no credentials")
+
+        registry = ContentGeneratorRegistry(factory=failing_factory)
+        await registry.warmup()
+        self.assertEqual(registry.stats()['created'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
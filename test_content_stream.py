@@ -0,0 +1,154 @@
+# test_content_stream.py
+
+import asyncio
+import logging
+import threading
+import time
+import unittest
+from google.api_core.exceptions import ResourceExhausted
+from tenacity import wait_none
+from modules import google_api_interface
+from modules.google_api_interface import ContentGenerator
+from modules.llm_backends import ModelBackend
+from modules.llm_cache import LLMResponseCache
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("Response has no text")
+        return self._text
+
+
+class FakeStreamingModel:
+    """Emits the prompt back word by word, sleeping token_delay before each word."""
+
+    def __init__(self, token_delay=0.0, fail_first=0, fail_after=None):
+        self.token_delay = token_delay
+        self.fail_first = fail_first
+        self.fail_after = fail_after
+        self.calls = 0
+        self.emitted = 0
+        self.finished = threading.Event()
+
+    def generate_content(self, content, generation_config=None, safety_settings=None, stream=False):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise ResourceExhausted("quota")
+        return self._stream(content[0].split())
+
+    def _stream(self, words):
+        try:
+            for index, word in enumerate(words):
+                if self.fail_after is not None and index == self.fail_after:
+                    raise RuntimeError("connection reset")
+                time.sleep(self.token_delay)
+                self.emitted += 1
+                yield FakeChunk(word + ' ')
+            # Final chunk with only a finish reason
+            yield FakeChunk(None)
+        finally:
+            self.finished.set()
+
+
+class FakeStreamingBackend(ModelBackend):
+    """Serves the given model."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def create_model(self, model_name):
+        return self.model
+
+
+class TestContentStream(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.prompt = ' '.join(f"word{index}" for index in range(20))
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_deltas_arrive_before_generation_finishes(self):
+        model = FakeStreamingModel(token_delay=0.02)
+        generator = ContentGenerator("fake-model", backend=FakeStreamingBackend(model), metrics=None)
+        start = time.perf_counter()
+        arrivals, deltas = [], []
+        async for delta in generator.generate_content_stream(self.prompt):
+            arrivals.append(time.perf_counter() - start)
+            deltas.append(delta)
+        self.assertEqual(len(deltas), 20)
+        self.assertEqual(''.join(deltas).split(), self.prompt.split())
+        self.assertLess(arrivals[0], arrivals[-1] / 4)
+
+    async def test_complete_stream_is_cached_and_replayed(self):
+        cache = LLMResponseCache(enabled=True)
+        model = FakeStreamingModel()
+        generator = ContentGenerator("fake-model", cache=cache, backend=FakeStreamingBackend(model), metrics=None)
+        first = ''.join([delta async for delta in generator.generate_content_stream(self.prompt)])
+        replay = [delta async for delta in generator.generate_content_stream(self.prompt)]
+        self.assertEqual(replay, [first])
+        self.assertEqual(model.calls, 1)
+        # The non-streaming call shares the same cache entry
+        self.assertEqual(await generator.generate_content(self.prompt), first)
+
+    async def test_consumer_leaving_early_stops_the_worker(self):
+        model = FakeStreamingModel(token_delay=0.01)
+        generator = ContentGenerator("fake-model", cache=LLMResponseCache(enabled=True),
+                                     backend=FakeStreamingBackend(model), metrics=None)
+        stream = generator.generate_content_stream(self.prompt)
+        async for _ in stream:
+            break
+        await stream.aclose()
+        await asyncio.to_thread(model.finished.wait, 2)
+        self.assertTrue(model.finished.is_set())
+        self.assertLess(model.emitted, 20)
+        # A partial response is not cached
+        self.assertEqual(generator.cache.stats()['entries'], 0)
+
+    async def test_worker_gives_up_on_a_stalled_consumer(self):
+        original = (google_api_interface.STREAM_STALL_SECONDS, google_api_interface.STREAM_PUT_POLL_SECONDS)
+        google_api_interface.STREAM_STALL_SECONDS, google_api_interface.STREAM_PUT_POLL_SECONDS = 0.2, 0.05
+        try:
+            model = FakeStreamingModel()
+            generator = ContentGenerator("fake-model", backend=FakeStreamingBackend(model), metrics=None)
+            prompt = ' '.join(f"word{index}" for index in range(500))
+            # Take one delta, then stop reading without closing the stream
+            stream = generator.generate_content_stream(prompt)
+            await stream.__anext__()
+            await asyncio.to_thread(model.finished.wait, 2)
+            self.assertTrue(model.finished.is_set())
+            self.assertLess(model.emitted, 500)
+            await stream.aclose()
+        finally:
+            google_api_interface.STREAM_STALL_SECONDS, google_api_interface.STREAM_PUT_POLL_SECONDS = original
+
+    async def test_resource_exhausted_before_first_delta_is_retried(self):
+        original_wait = ContentGenerator._open_stream.retry.wait
+        ContentGenerator._open_stream.retry.wait = wait_none()
+        try:
+            model = FakeStreamingModel(fail_first=2)
+            generator = ContentGenerator("fake-model", backend=FakeStreamingBackend(model), metrics=None)
+            text = ''.join([delta async for delta in generator.generate_content_stream(self.prompt)])
+        finally:
+            ContentGenerator._open_stream.retry.wait = original_wait
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(text.split(), self.prompt.split())
+
+    async def test_error_mid_stream_is_raised_after_partial_output(self):
+        model = FakeStreamingModel(fail_after=5)
+        generator = ContentGenerator("fake-model", backend=FakeStreamingBackend(model), metrics=None)
+        deltas = []
+        with self.assertRaises(RuntimeError):
+            async for delta in generator.generate_content_stream(self.prompt):
+                deltas.append(delta)
+        self.assertEqual(len(deltas), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# test_fingerprint.py
+
+import logging
+import random
+import unittest
+from modules.fingerprint import (
+    FingerprintIndex, fingerprint_bands, format_fingerprint, hamming_distance, parse_fingerprint, shingle_count,
+    simhash
+)
+
+WORDS = ("the council voted on tuesday to approve a new budget for road repairs schools and parks "
+         "after months of debate residents said the plan was overdue while critics argued").split()
+
+
+def make_article(seed, length=400):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+class TestSimHash(unittest.TestCase):
+
+    def test_near_duplicates_have_close_fingerprints(self):
+        text = make_article(1)
+        syndicated = "Reprinted from the Daily Courier. " + text.replace("budget", "Budget", 3) + " Copyright 2024."
+        distance = hamming_distance(simhash(text), simhash(syndicated))
+        self.assertLessEqual(distance, 3)
+
+    def test_different_articles_are_far_apart(self):
+        self.assertGreater(hamming_distance(simhash(make_article(1)), simhash(make_article(2))), 10)
+
+    def test_fingerprint_is_deterministic_and_64_bit(self):
+        fingerprint = simhash(make_article(3))
+        self.assertEqual(fingerprint, simhash(make_article(3)))
+        self.assertLess(fingerprint, 1 << 64)
+        self.assertEqual(parse_fingerprint(format_fingerprint(fingerprint)), fingerprint)
+
+    def test_empty_text_has_no_fingerprint(self):
+        self.assertIsNone(simhash(""))
+        self.assertIsNone(simhash("  ...  "))
+
+    def test_short_text_has_no_fingerprint(self):
+        self.assertIsNone(simhash("Page not found. The page you requested does not exist."))
+        self.assertIsNone(simhash(make_article(4, length=51)))
+        self.assertIsNotNone(simhash(make_article(4, length=52)))
+        self.assertEqual(shingle_count(make_article(4, length=52)), 50)
+
+    def test_bands_cover_every_bit(self):
+        bands = fingerprint_bands((1 << 64) - 1, max_distance=3)
+        self.assertEqual(bands, ['0:ffff', '1:ffff', '2:ffff', '3:ffff'])
+
+
+class TestFingerprintIndex(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_finds_every_fingerprint_within_distance(self):
+        rng = random.Random(7)
+        index = FingerprintIndex(max_distance=3)
+        stored = {f"a{n}": rng.getrandbits(64) for n in range(2000)}
+        for article_id, fingerprint in stored.items():
+            index.add(article_id, fingerprint)
+
+        for article_id, fingerprint in list(stored.items())[:200]:
+            flipped = fingerprint
+            for bit in rng.sample(range(64), rng.randint(0, 3)):
+                flipped ^= 1 << bit
+            match = index.find_in_memory(flipped)
+            self.assertIsNotNone(match)
+            self.assertEqual(match[0], article_id)
+
+        # Band lookup compares a handful of candidates, not the whole index
+        self.assertLess(index.stats()['candidates_compared'], 200 * 10)
+
+    def test_remove_drops_article(self):
+        index = FingerprintIndex()
+        index.add("a1", 12345)
+        index.remove("a1")
+        self.assertIsNone(index.find_in_memory(12345))
+        self.assertEqual(index.stats()['bands'], 0)
+
+    async def test_store_lookup_populates_memory(self):
+        calls = []
+
+        async def lookup(band_keys):
+            calls.append(band_keys)
+            return [("stored", 0b1011)]
+
+        index = FingerprintIndex(lookup=lookup)
+        self.assertEqual(await index.find(0b1001), ("stored", 1, True))
+        self.assertEqual(await index.find(0b1011), ("stored", 0, False))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(index.stats()['memory_hits'], 1)
+
+    async def test_article_deleted_by_another_process_stops_matching(self):
+        stored = {"stored": 0b1011}
+
+        async def lookup(band_keys):
+            return list(stored.items())
+
+        index = FingerprintIndex(lookup=lookup, memory_ttl_seconds=0)
+        self.assertEqual(await index.find(0b1011), ("stored", 0, True))
+        # The DELETE was served by another worker, which cleared the store but not this index
+        stored.clear()
+        self.assertIsNone(await index.find(0b1011))
+        self.assertEqual(index.stats()['expired'], 1)
+        self.assertEqual(len(index), 0)
+
+    async def test_distant_store_candidates_are_not_matches(self):
+        async def lookup(band_keys):
+            return [("other", 0xffff)]
+
+        index = FingerprintIndex(lookup=lookup)
+        self.assertIsNone(await index.find(0))
+        self.assertEqual(index.stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# test_http_session.py
+
+import unittest
+from aiohttp import web
+from modules.http_session import HttpSessionManager
+from modules.web_scraper import WebScraper
+
+
+class TestHttpSessionManager(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async def handler(request):
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_get('/', handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        self.manager = HttpSessionManager(limit_per_host=2)
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+        await self.runner.cleanup()
+
+    async def test_connections_are_reused(self):
+        session = await self.manager.get_session()
+        for _ in range(3):
+            async with session.get(self.url) as response:
+                await response.text()
+        stats = self.manager.stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['connections_created'], 1)
+        self.assertEqual(stats['connections_reused'], 2)
+
+    async def test_scraper_does_not_close_shared_session(self):
+        async with WebScraper(session_manager=self.manager) as scraper:
+            self.assertIs(scraper.session, await self.manager.get_session())
+        session = await self.manager.get_session()
+        self.assertFalse(session.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
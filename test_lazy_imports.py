@@ -0,0 +1,34 @@
+# test_lazy_imports.py
+
+import json
+import subprocess
+import sys
+import unittest
+from modules.lazy_imports import import_stats, lazy_import
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_lazy_import_returns_module_and_records_first_import(self):
+        module = lazy_import('modules.sentence_segmenter')
+        self.assertTrue(hasattr(module, 'RegexSentenceSegmenter'))
+        self.assertIs(lazy_import('modules.sentence_segmenter'), module)
+
+        lazy_import('tabnanny')
+        self.assertIn('tabnanny', import_stats())
+
+    def test_startup_modules_do_not_import_heavy_dependencies(self):
+        heavy = ['spacy', 'vertexai', 'google.cloud.texttospeech', 'pydub', 'google.cloud.logging',
+                 'google.cloud.firestore', 'google.cloud.storage']
+        code = (
+            "import sys, json; "
+            "import modules.web_scraper, modules.google_api_interface, modules.db_manager; "
+            f"print(json.dumps([name for name in {heavy!r} if name in sys.modules]))"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# test_llm_backends.py
+
+import logging
+import time
+import unittest
+from google.api_core.exceptions import ResourceExhausted
+from modules.config import ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT
+from modules.google_api_interface import ContentGenerator
+from modules.llm_backends import FakeBackend, extract_article_text, get_backend
+from modules.quota_governor import QuotaGovernor
+from modules.tts_normalizer import normalize_for_tts
+
+
+class TestFakeBackend(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_extracts_the_article_from_known_prompts(self):
+        self.assertEqual(extract_article_text(ARTICLE_CLEAN_PROMPT.format(article_text="Body.")), "Body.")
+        self.assertEqual(extract_article_text(ARTICLE_IMPROVE_READABILITY_PROMPT.format(article_text="Body.")),
+                         "Body.")
+        self.assertEqual(extract_article_text("Any other prompt"), "Any other prompt")
+
+    def test_simulates_latency_and_token_rate(self):
+        # 0.05s to first token, then about 100 tokens at 1000 tokens/s
+        backend = FakeBackend(latency=0.05, distribution='constant', tokens_per_second=1000)
+        model = backend.create_model("fake-model")
+        start = time.perf_counter()
+        response = model.generate_content(["x" * 400])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.14)
+        self.assertEqual(response.text, "x" * 400)
+        self.assertEqual(response.usage_metadata.candidates_token_count, 101)
+        self.assertAlmostEqual(backend.stats()['simulated_seconds'], 0.15, places=2)
+
+    def test_latency_distributions(self):
+        uniform = FakeBackend(latency=1.0, jitter=0.5, distribution='uniform', seed=1)
+        samples = [uniform.sample_latency() for _ in range(200)]
+        self.assertTrue(all(0.5 <= sample <= 1.5 for sample in samples))
+        lognormal = FakeBackend(latency=1.0, jitter=0.5, distribution='lognormal', seed=1)
+        samples = sorted(lognormal.sample_latency() for _ in range(201))
+        self.assertAlmostEqual(samples[100], 1.0, delta=0.15)
+        with self.assertRaises(ValueError):
+            FakeBackend(distribution='normal')
+
+    def test_streams_chunks_with_usage_on_the_last(self):
+        backend = FakeBackend(latency=0, distribution='constant', tokens_per_second=1e6, stream_chunk_tokens=10)
+        chunks = list(backend.create_model("fake-model").generate_content(["y" * 100], stream=True))
+        self.assertEqual(''.join(chunk.text for chunk in chunks), "y" * 100)
+        self.assertEqual(len(chunks), 4)
+        self.assertIsNone(chunks[0].usage_metadata)
+        self.assertEqual(chunks[-1].usage_metadata.candidates_token_count, 26)
+
+    def test_injects_resource_exhausted(self):
+        backend = FakeBackend(latency=0, distribution='constant', error_rate=1.0)
+        with self.assertRaises(ResourceExhausted):
+            backend.create_model("fake-model").generate_content(["prompt"])
+        self.assertEqual(backend.stats()['errors'], 1)
+
+    def test_backend_is_selected_by_name(self):
+        self.assertIs(get_backend('fake'), get_backend('fake'))
+        self.assertIsInstance(get_backend('fake'), FakeBackend)
+        with self.assertRaises(ValueError):
+            get_backend('openai')
+
+
+class TestContentGeneratorWithFakeBackend(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_generates_and_streams_without_vertex_ai(self):
+        backend = FakeBackend(latency=0.01, distribution='constant', tokens_per_second=1e6,
+                              transform=lambda prompt: normalize_for_tts(extract_article_text(prompt)))
+        governor = QuotaGovernor(requests_per_minute=600, tokens_per_minute=600000)
+        generator = ContentGenerator("fake-model", governor=governor, backend=backend)
+        prompt = ARTICLE_IMPROVE_READABILITY_PROMPT.format(article_text="It cost $5.")
+
+        self.assertEqual(await generator.generate_content(prompt), "It cost five dollars.")
+        deltas = [delta async for delta in generator.generate_content_stream(prompt)]
+        self.assertEqual(''.join(deltas), "It cost five dollars.")
+        self.assertEqual(backend.stats()['calls'], 2)
+        self.assertEqual(governor.stats()['token_corrections'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
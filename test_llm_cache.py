@@ -0,0 +1,115 @@
+# test_llm_cache.py
+
+import logging
+import time
+import unittest
+from modules.google_api_interface import ContentGenerator
+from modules.llm_backends import FakeBackend
+from modules.llm_cache import LLMResponseCache, cache_key
+
+
+class TestCacheKey(unittest.TestCase):
+
+    def test_key_covers_model_config_and_prompt(self):
+        key = cache_key("model-a", {"temperature": 0, "top_p": 1.0}, "Clean this")
+        self.assertEqual(key, cache_key("model-a", {"top_p": 1.0, "temperature": 0}, "Clean this"))
+        self.assertNotEqual(key, cache_key("model-b", {"temperature": 0, "top_p": 1.0}, "Clean this"))
+        self.assertNotEqual(key, cache_key("model-a", {"temperature": 0.5, "top_p": 1.0}, "Clean this"))
+        self.assertNotEqual(key, cache_key("model-a", {"temperature": 0, "top_p": 1.0}, "Clean this."))
+
+
+class TestLLMResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.store_entries = {}
+
+        async def lookup(key):
+            return self.store_entries.get(key)
+
+        async def store(key, text, model_name, created_at):
+            self.store_entries[key] = (text, created_at)
+            return True
+
+        self.lookup = lookup
+        self.store = store
+        self.cache = LLMResponseCache(lookup=lookup, store=store, max_entries=2, ttl_seconds=3600, enabled=True)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_put_then_get_hits_memory_and_persists(self):
+        await self.cache.put("k1", "cleaned text", "model-a")
+        self.assertEqual(await self.cache.get("k1"), "cleaned text")
+        self.assertIn("k1", self.store_entries)
+        self.assertEqual(self.cache.stats()['memory_hits'], 1)
+
+    async def test_store_backs_a_cold_cache(self):
+        self.store_entries["k1"] = ("stored text", time.time())
+        self.assertEqual(await self.cache.get("k1"), "stored text")
+        self.assertEqual(await self.cache.get("k1"), "stored text")
+        stats = self.cache.stats()
+        self.assertEqual((stats['store_hits'], stats['memory_hits']), (1, 1))
+
+    async def test_expired_entries_miss_in_both_tiers(self):
+        self.store_entries["old"] = ("stale text", time.time() - 7200)
+        self.assertIsNone(await self.cache.get("old"))
+        cache = LLMResponseCache(lookup=self.lookup, ttl_seconds=0, enabled=True)
+        await cache.put("k1", "text", "model-a")
+        self.assertIsNone(await cache.get("k1"))
+        self.assertEqual(cache.stats()['expired'], 1)
+
+    async def test_memory_tier_evicts_least_recently_used(self):
+        memory_only = LLMResponseCache(max_entries=2, enabled=True)
+        await memory_only.put("a", "A", "m")
+        await memory_only.put("b", "B", "m")
+        await memory_only.get("a")
+        await memory_only.put("c", "C", "m")
+        self.assertIsNone(await memory_only.get("b"))
+        self.assertEqual(await memory_only.get("a"), "A")
+
+    async def test_store_errors_do_not_fail_generation(self):
+        async def failing(*args):
+            raise RuntimeError("firestore unavailable")
+
+        cache = LLMResponseCache(lookup=failing, store=failing, enabled=True)
+        await cache.put("k1", "text", "model-a")
+        cache.clear()
+        self.assertIsNone(await cache.get("k1"))
+        self.assertEqual(cache.stats()['store_errors'], 2)
+
+
+class TestContentGeneratorCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def make_generator(self, cache):
+        backend = FakeBackend(latency=0, distribution='constant', tokens_per_second=1e6)
+        return ContentGenerator("test-model", cache=cache, backend=backend, metrics=None)
+
+    async def test_repeated_prompt_is_served_from_cache(self):
+        cache = LLMResponseCache(enabled=True)
+        generator = self.make_generator(cache)
+        first = await generator.generate_content("Clean this article")
+        second = await generator.generate_content("Clean this article")
+        self.assertEqual(first, second)
+        self.assertEqual(generator.backend.stats()['calls'], 1)
+
+        # A new generator (e.g. a retried request) shares the cache
+        retry_generator = self.make_generator(cache)
+        self.assertEqual(await retry_generator.generate_content("Clean this article"), first)
+        self.assertEqual(retry_generator.backend.stats()['calls'], 0)
+
+    async def test_without_cache_every_call_reaches_the_model(self):
+        generator = self.make_generator(None)
+        await generator.generate_content("Clean this article")
+        await generator.generate_content("Clean this article")
+        self.assertEqual(generator.backend.stats()['calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
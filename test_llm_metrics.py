@@ -0,0 +1,144 @@
+# test_llm_metrics.py
+
+import logging
+import unittest
+from tenacity import wait_none
+from modules.config import ARTICLE_CLEAN_PROMPT, ARTICLE_IMPROVE_READABILITY_PROMPT
+from modules.google_api_interface import ContentGenerator
+from modules.llm_backends import FakeBackend
+from modules.llm_cache import LLMResponseCache
+from modules.llm_metrics import (
+    Histogram,
+    LLMMetrics,
+    get_job_llm_metrics,
+    job_llm_metrics,
+    prompt_type
+)
+
+CLEAN = ARTICLE_CLEAN_PROMPT.format(article_text="Some article text.")
+READABILITY = ARTICLE_IMPROVE_READABILITY_PROMPT.format(article_text="Some article text.")
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = Histogram([1, 2, 4, 8])
+        for value in [0.5] * 50 + [3] * 45 + [7] * 5:
+            histogram.observe(value)
+        self.assertEqual(histogram.percentile(0.50), 1)
+        self.assertEqual(histogram.percentile(0.95), 4)
+        self.assertEqual(histogram.percentile(0.99), 7)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertEqual(snapshot['buckets'], {'1': 50, '4': 45, '8': 5})
+
+    def test_values_above_the_last_bound(self):
+        histogram = Histogram([1, 2])
+        histogram.observe(10)
+        self.assertEqual(histogram.percentile(0.5), 10)
+        self.assertEqual(histogram.snapshot()['buckets'], {'+Inf': 1})
+        self.assertEqual(Histogram([1]).snapshot(), {'count': 0})
+
+
+class TestLLMMetrics(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_prompt_type(self):
+        self.assertEqual(prompt_type(CLEAN), 'clean')
+        self.assertEqual(prompt_type(READABILITY), 'readability')
+        self.assertEqual(prompt_type("Reply with the single word: ready"), 'other')
+
+    def test_calls_are_tagged_by_prompt_type_and_model(self):
+        metrics = LLMMetrics()
+        metrics.record_call(CLEAN, "model-a", 2.0, 0.5, input_tokens=1000, output_tokens=800)
+        metrics.record_call(CLEAN, "model-a", 0.01, cache_hit=True)
+        metrics.record_call(READABILITY, "model-a", 1.0, input_tokens=900, output_tokens=900)
+        metrics.record_retry(READABILITY, "model-a")
+        stats = metrics.stats()
+        self.assertEqual(set(stats), {'clean/model-a', 'readability/model-a'})
+        clean = stats['clean/model-a']
+        self.assertEqual((clean['calls'], clean['cache_hits']), (2, 1))
+        self.assertEqual(clean['wall_seconds']['count'], 2)
+        # Cache hits do not count as model calls for waits, tokens or cost
+        self.assertEqual(clean['input_tokens']['count'], 1)
+        self.assertAlmostEqual(clean['cost_usd']['sum'], (1000 * 0.075 + 800 * 0.30) / 1e6, places=9)
+        self.assertEqual(stats['readability/model-a']['retries'], 1)
+
+    def test_job_summary_is_collected_and_logged(self):
+        metrics = LLMMetrics()
+        self.assertIsNone(get_job_llm_metrics())
+        with self.assertLogs('llm_metrics', level='INFO') as logs:
+            logging.disable(logging.NOTSET)
+            with job_llm_metrics() as summary:
+                metrics.record_call(CLEAN, "model-a", 2.0, input_tokens=1000, output_tokens=800)
+                metrics.record_call(READABILITY, "model-a", 1.0, 0.25, input_tokens=900, output_tokens=900)
+                self.assertIs(get_job_llm_metrics(), summary)
+        self.assertEqual(summary['clean']['wall_seconds'], 2.0)
+        self.assertEqual(summary['readability']['queue_wait_seconds'], 0.25)
+        self.assertIn("clean 1 calls", logs.output[0])
+        self.assertIn("readability 1 calls", logs.output[0])
+        self.assertIsNone(get_job_llm_metrics())
+
+
+class TestContentGeneratorMetrics(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.original_wait = ContentGenerator._generate.retry.wait
+        ContentGenerator._generate.retry.wait = wait_none()
+
+    def tearDown(self):
+        ContentGenerator._generate.retry.wait = self.original_wait
+        logging.disable(logging.NOTSET)
+
+    def make_generator(self, backend, cache=None):
+        self.metrics = LLMMetrics()
+        return ContentGenerator("fake-model", cache=cache, backend=backend, metrics=self.metrics)
+
+    async def test_records_tokens_cache_hits_and_streams(self):
+        backend = FakeBackend(latency=0.01, distribution='constant', tokens_per_second=1e6)
+        generator = self.make_generator(backend, cache=LLMResponseCache(enabled=True))
+        with job_llm_metrics() as summary:
+            await generator.generate_content(CLEAN)
+            await generator.generate_content(CLEAN)
+            deltas = [delta async for delta in generator.generate_content_stream(READABILITY)]
+        self.assertEqual(''.join(deltas), "Some article text.")
+
+        stats = self.metrics.stats()
+        clean = stats['clean/fake-model']
+        self.assertEqual((clean['calls'], clean['cache_hits']), (2, 1))
+        self.assertGreaterEqual(clean['wall_seconds']['max'], 0.01)
+        self.assertGreater(clean['input_tokens']['sum'], 0)
+        self.assertEqual(clean['output_tokens']['sum'], 5)
+        readability = stats['readability/fake-model']
+        self.assertEqual(readability['first_delta_seconds']['count'], 1)
+        self.assertEqual(readability['output_tokens']['sum'], 5)
+        self.assertEqual(summary['clean']['calls'], 2)
+        self.assertEqual(summary['readability']['calls'], 1)
+
+    async def test_records_retries_and_errors(self):
+        backend = FakeBackend(latency=0, distribution='constant', error_rate=1.0)
+        generator = self.make_generator(backend)
+        with self.assertRaises(Exception):
+            await generator.generate_content(CLEAN)
+        clean = self.metrics.stats()['clean/fake-model']
+        # The last attempt is not retried
+        self.assertEqual((clean['retries'], clean['errors'], clean['calls']), (2, 1, 0))
+
+    async def test_a_retry_that_succeeds_is_not_an_error(self):
+        backend = FakeBackend(latency=0, distribution='constant', tokens_per_second=1e6)
+        failures = iter([True])
+        backend.should_fail = lambda: next(failures, False)
+        generator = self.make_generator(backend)
+        self.assertEqual(await generator.generate_content(CLEAN), "Some article text.")
+        clean = self.metrics.stats()['clean/fake-model']
+        self.assertEqual((clean['retries'], clean['errors'], clean['calls']), (1, 0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# test_metadata_extractor.py
+
+import json
+import unittest
+from modules.metadata_extractor import HeadMetadataParser, extract_head_metadata
+
+JSON_LD = {
+    "@context": "https://schema.org",
+    "@graph": [
+        {"@type": "WebSite", "name": "The Daily Courier"},
+        {
+            "@type": "NewsArticle",
+            "headline": "Council approves road budget",
+            "author": [{"@type": "Person", "name": "Jane Doe"}, {"@type": "Person", "name": "Sam Lee"}],
+            "datePublished": "2024-11-08T10:00:00Z",
+            "description": "The vote ended months of debate.",
+            "mainEntityOfPage": {"@id": "https://courier.example/news/road-budget"}
+        }
+    ]
+}
+
+
+def make_page(head, body="<p>Body text</p>"):
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+
+class TestHeadMetadata(unittest.TestCase):
+
+    def test_json_ld_takes_priority(self):
+        page = make_page(
+            "<title>Council approves road budget | The Daily Courier</title>"
+            "<meta property='og:title' content='OG title'>"
+            "<meta name='author' content='Courier Staff'>"
+            f"<script type='application/ld+json'>{json.dumps(JSON_LD)}</script>"
+        )
+        metadata = extract_head_metadata(page)
+        self.assertEqual(metadata['title'], "Council approves road budget")
+        self.assertEqual(metadata['author'], "Jane Doe, Sam Lee")
+        self.assertTrue(metadata['date'].startswith("2024-11-08T10:00:00"))
+        self.assertEqual(metadata['description'], "The vote ended months of debate.")
+        self.assertEqual(metadata['canonical_url'], "https://courier.example/news/road-budget")
+
+    def test_opengraph_twitter_meta_and_title_fallbacks(self):
+        page = make_page(
+            "<title>  Page   title </title>"
+            "<meta name='twitter:title' content='Twitter title'>"
+            "<meta name='twitter:description' content='Twitter description'>"
+            "<meta property='article:author' content='https://facebook.example/janedoe'>"
+            "<meta name='author' content='Jane Doe'>"
+            "<meta property='article:published_time' content='2024-11-08'>"
+            "<meta property='og:url' content='https://courier.example/og'>"
+            "<link rel='canonical' href='https://courier.example/canonical'>"
+        )
+        metadata = extract_head_metadata(page)
+        self.assertEqual(metadata['title'], "Twitter title")
+        self.assertEqual(metadata['description'], "Twitter description")
+        self.assertEqual(metadata['author'], "Jane Doe")
+        self.assertTrue(metadata['date'].startswith("2024-11-08"))
+        self.assertEqual(metadata['canonical_url'], "https://courier.example/canonical")
+
+        self.assertEqual(extract_head_metadata(make_page("<title>  Page   title </title>"))['title'], "Page title")
+
+    def test_body_is_not_read(self):
+        page = make_page("<title>Head title</title>",
+                         body="<meta name='author' content='Body author'><title>Body title</title>")
+        metadata = extract_head_metadata(page)
+        self.assertEqual(metadata['title'], "Head title")
+        self.assertEqual(metadata['author'], "")
+
+    def test_incremental_feed_stops_at_end_of_head(self):
+        page = make_page(
+            f"<script type='application/ld+json'>{json.dumps(JSON_LD)}</script>",
+            body="<p>" + "x" * 100000 + "</p>"
+        )
+        parser = HeadMetadataParser()
+        fed = 0
+        for start in range(0, len(page), 7):
+            if parser.done:
+                break
+            parser.feed(page[start:start + 7])
+            fed += 7
+        self.assertTrue(parser.done)
+        self.assertLess(fed, 2000)
+        self.assertEqual(parser.metadata()['title'], "Council approves road budget")
+
+    def test_malformed_json_ld_is_ignored(self):
+        page = make_page("<script type='application/ld+json'>{not json</script><title>Fallback</title>")
+        self.assertEqual(extract_head_metadata(page)['title'], "Fallback")
+
+
+if __name__ == '__main__':
+    unittest.main()
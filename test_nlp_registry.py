@@ -0,0 +1,49 @@
+# test_nlp_registry.py
+
+import logging
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from modules.nlp_registry import NLPModelRegistry
+from modules.sentence_segmenter import RegexSentenceSegmenter
+from modules.web_scraper import WebScraper
+
+
+class TestNLPModelRegistry(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_backend_is_loaded_once_across_threads(self):
+        registry = NLPModelRegistry(default_backend='regex')
+        with mock.patch('modules.nlp_registry.initialize_nlp',
+                        side_effect=lambda backend: RegexSentenceSegmenter()) as initialize:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                pipelines = list(executor.map(lambda _: registry.get(), range(32)))
+        self.assertEqual(initialize.call_count, 1)
+        self.assertTrue(all(nlp is pipelines[0] for nlp in pipelines))
+
+    async def test_warmup_preloads_and_reports_stats(self):
+        registry = NLPModelRegistry(default_backend='regex')
+        await registry.warmup()
+        self.assertTrue(registry.is_loaded('regex'))
+        stats = registry.stats()['loaded']['regex']
+        self.assertIn('load_seconds', stats)
+        self.assertIn('rss_delta_mb', stats)
+
+    async def test_warmup_failure_is_logged_not_raised(self):
+        registry = NLPModelRegistry()
+        await registry.warmup(['no-such-backend'])
+        self.assertFalse(registry.is_loaded('no-such-backend'))
+
+    def test_scrapers_share_the_process_pipeline(self):
+        first = WebScraper({'nlp_backend': 'regex'})
+        second = WebScraper({'nlp_backend': 'regex'})
+        self.assertIs(first.get_nlp(), second.get_nlp())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+# test_nlp_worker_pool.py
+
+import unittest
+from modules.nlp_worker_pool import NLPWorkerPool
+from modules.sentence_segmenter import RegexSentenceSegmenter
+from modules.text_processing import normalize_text
+from modules.web_scraper import WebScraper
+
+
+class TestNLPWorkerPool(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.pool = NLPWorkerPool(workers=1, max_pending=2, backend='regex')
+        await self.pool.start()
+
+    async def asyncTearDown(self):
+        self.pool.shutdown()
+
+    async def test_normalize_text_matches_in_process_result(self):
+        text = "First sentence. Second one!\n\nA new paragraph."
+        result = await self.pool.normalize_text(text, max_sentence_length=300)
+        self.assertEqual(result, normalize_text(RegexSentenceSegmenter(), text, 300))
+        self.assertEqual(self.pool.stats()['pending'], 0)
+
+    async def test_scraper_uses_running_pool(self):
+        scraper = WebScraper({'nlp_backend': 'regex'}, nlp_pool=self.pool)
+        result = await scraper.process_text("Hello there. General Kenobi.")
+        self.assertEqual(result, "Hello there. General Kenobi.")
+        self.assertGreaterEqual(self.pool.stats()['completed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
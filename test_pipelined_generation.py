@@ -0,0 +1,93 @@
+# test_pipelined_generation.py
+
+import asyncio
+import logging
+import time
+import unittest
+from modules.pipelined_generation import ParagraphGrouper, pipelined_passes
+
+
+async def stream_text(text, delta_size=7, delay=0.0):
+    for start in range(0, len(text), delta_size):
+        if delay:
+            await asyncio.sleep(delay)
+        yield text[start:start + delta_size]
+
+
+class TestParagraphGrouper(unittest.TestCase):
+
+    def test_groups_are_released_only_after_the_paragraph_ends(self):
+        grouper = ParagraphGrouper(group_tokens=1)
+        self.assertEqual(grouper.feed("First para"), [])
+        self.assertEqual(grouper.feed("graph.\nSecond"), ["First paragraph."])
+        self.assertEqual(grouper.feed(" paragraph."), [])
+        self.assertEqual(grouper.flush(), "Second paragraph.")
+        self.assertIsNone(grouper.flush())
+
+    def test_small_paragraphs_are_grouped_to_the_budget(self):
+        grouper = ParagraphGrouper(group_tokens=10)
+        groups = grouper.feed("One short line.\n\nAnother short line.\n\nThird line.\n")
+        self.assertEqual(groups, ["One short line.\n\nAnother short line.\n\nThird line."])
+
+
+class TestPipelinedPasses(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.paragraphs = [f"Paragraph {index} of the cleaned article text goes here." for index in range(12)]
+        self.text = '\n\n'.join(self.paragraphs)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_output_is_reassembled_in_order(self):
+        async def second_pass(group):
+            # Later groups finish first
+            await asyncio.sleep(0.05 / (1 + len(group) % 5))
+            return group.upper()
+
+        timings = {}
+        result = await pipelined_passes(stream_text(self.text), second_pass, group_tokens=30, timings=timings)
+        self.assertEqual(result, '\n\n'.join(paragraph.upper() for paragraph in self.paragraphs))
+        self.assertGreater(timings['groups'], 1)
+
+    async def test_second_pass_overlaps_the_first(self):
+        second_pass_started = []
+
+        async def second_pass(group):
+            second_pass_started.append(time.perf_counter())
+            await asyncio.sleep(0.05)
+            return group
+
+        start = time.perf_counter()
+        timings = {}
+        await pipelined_passes(stream_text(self.text, delay=0.005), second_pass, group_tokens=30, timings=timings)
+        # The first group went to the second pass well before the first pass finished,
+        # so only the last group's latency is added after the first pass.
+        self.assertLess(second_pass_started[0] - start, timings['first_pass'] / 2)
+        self.assertLess(timings['second_pass_tail'], timings['second_pass_total'])
+
+    async def test_first_pass_failure_cancels_pending_groups(self):
+        cancelled = []
+
+        async def failing_stream():
+            yield self.text[:200] + "\n"
+            await asyncio.sleep(0.01)
+            raise RuntimeError("stream broke")
+
+        async def second_pass(group):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(group)
+                raise
+            return group
+
+        with self.assertRaises(RuntimeError):
+            await pipelined_passes(failing_stream(), second_pass, group_tokens=10)
+        await asyncio.sleep(0)
+        self.assertTrue(cancelled)
+
+
+if __name__ == '__main__':
+    unittest.main()
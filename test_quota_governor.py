@@ -0,0 +1,135 @@
+# test_quota_governor.py
+
+import asyncio
+import logging
+import time
+import unittest
+from types import SimpleNamespace
+from modules.google_api_interface import ContentGenerator
+from modules.llm_backends import ModelBackend
+from modules.quota_governor import (
+    BATCH,
+    INTERACTIVE,
+    QuotaExceededError,
+    QuotaGovernor,
+    get_priority,
+    priority_context
+)
+
+
+class TestQuotaGovernor(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_calls_within_quota_are_admitted_immediately(self):
+        governor = QuotaGovernor(requests_per_minute=600, tokens_per_minute=60000)
+        for _ in range(5):
+            self.assertEqual(await governor.acquire(100), 0.0)
+        self.assertEqual(governor.stats()['interactive']['admitted'], 5)
+
+    async def test_requests_are_spaced_to_the_rate(self):
+        # 10 requests per second, no burst
+        governor = QuotaGovernor(requests_per_minute=600, tokens_per_minute=1e9, burst_seconds=0.1)
+        start = time.monotonic()
+        await asyncio.gather(*[governor.acquire(1) for _ in range(5)])
+        self.assertGreaterEqual(time.monotonic() - start, 0.35)
+
+    async def test_token_budget_limits_large_calls(self):
+        # 6000 tokens per second, at most 600 at once
+        governor = QuotaGovernor(requests_per_minute=60000, tokens_per_minute=360000, burst_seconds=0.1)
+        start = time.monotonic()
+        await governor.acquire(600)
+        await governor.acquire(600)
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    async def test_interactive_calls_go_ahead_of_queued_batch_calls(self):
+        governor = QuotaGovernor(requests_per_minute=1200, tokens_per_minute=1e9, burst_seconds=0.05)
+        await governor.acquire(1)
+        order = []
+
+        async def call(name, priority, delay=0.0):
+            await asyncio.sleep(delay)
+            await governor.acquire(1, priority=priority)
+            order.append(name)
+
+        await asyncio.gather(
+            call('batch-1', BATCH), call('batch-2', BATCH), call('batch-3', BATCH),
+            call('interactive', INTERACTIVE, delay=0.01)
+        )
+        self.assertLess(order.index('interactive'), order.index('batch-2'))
+        self.assertEqual([name for name in order if name.startswith('batch')], ['batch-1', 'batch-2', 'batch-3'])
+
+    async def test_rejects_when_queue_is_full(self):
+        governor = QuotaGovernor(requests_per_minute=60, tokens_per_minute=1e9, max_queue=1, burst_seconds=1)
+        await governor.acquire(1)
+        waiting = asyncio.create_task(governor.acquire(1))
+        await asyncio.sleep(0)
+        with self.assertRaises(QuotaExceededError):
+            await governor.acquire(1)
+        waiting.cancel()
+        self.assertEqual(governor.stats()['interactive']['rejected'], 1)
+        await asyncio.sleep(0)
+        self.assertEqual(governor.stats()['queued_now'], 0)
+
+    async def test_rejects_when_wait_would_exceed_the_limit(self):
+        governor = QuotaGovernor(requests_per_minute=6, tokens_per_minute=1e9, burst_seconds=10,
+                                 max_wait={BATCH: 0.5})
+        await governor.acquire(1)
+        start = time.monotonic()
+        with self.assertRaises(QuotaExceededError):
+            await governor.acquire(1, priority=BATCH)
+        self.assertLess(time.monotonic() - start, 0.2)
+
+    async def test_throttling_and_usage_feed_back_into_the_buckets(self):
+        governor = QuotaGovernor(requests_per_minute=600, tokens_per_minute=60000, burst_seconds=1)
+        await governor.acquire(100)
+        governor.record_usage(100, 900)
+        self.assertGreater(governor.tokens.wait_time(200), 0)
+        governor.record_throttled()
+        self.assertGreater(governor.requests.wait_time(1), 0)
+        self.assertEqual(governor.stats()['throttled'], 1)
+
+    def test_priority_context(self):
+        self.assertEqual(get_priority(), INTERACTIVE)
+        with priority_context(BATCH):
+            self.assertEqual(get_priority(), BATCH)
+        self.assertEqual(get_priority(), INTERACTIVE)
+
+
+class FakeModel:
+    def generate_content(self, content, generation_config=None, safety_settings=None, stream=False):
+        return SimpleNamespace(text="generated", usage_metadata=SimpleNamespace(total_token_count=5000))
+
+
+class FakeModelBackend(ModelBackend):
+    def create_model(self, model_name):
+        return FakeModel()
+
+
+class TestContentGeneratorQuota(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_model_calls_are_admitted_and_corrected_by_actual_usage(self):
+        governor = QuotaGovernor(requests_per_minute=600, tokens_per_minute=600000, burst_seconds=1)
+        generator = ContentGenerator("fake-model", governor=governor, backend=FakeModelBackend(), metrics=None)
+
+        with priority_context(BATCH):
+            self.assertEqual(await generator.generate_content("Clean this article"), "generated")
+        stats = governor.stats()
+        self.assertEqual(stats['batch']['admitted'], 1)
+        self.assertEqual(stats['token_corrections'], 1)
+        # 10000 token bucket, less the 5000 actually used
+        self.assertAlmostEqual(governor.tokens.tokens, 5000, delta=50)
+
+
+if __name__ == '__main__':
+    unittest.main()
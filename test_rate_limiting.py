@@ -0,0 +1,121 @@
+# test_rate_limiting.py
+
+import time
+import unittest
+from unittest import mock
+from aiohttp import web
+from modules.rate_limiting import CircuitBreaker, CircuitOpenError, HostLimiter, HostLimiterRegistry, TokenBucket
+from modules.web_scraper import WebScraper
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+
+    async def test_acquire_waits_for_refill(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        self.assertEqual(await bucket.acquire(), 0)
+        start = time.monotonic()
+        await bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_debit_can_overdraw_the_bucket(self):
+        bucket = TokenBucket(rate=10, capacity=5)
+        self.assertEqual(bucket.wait_time(5), 0)
+        bucket.debit(8)
+        self.assertAlmostEqual(bucket.wait_time(1), 0.4, delta=0.05)
+        bucket.debit(-100)
+        self.assertEqual(bucket.tokens, 5)
+
+
+class TestHostLimiter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_open_circuit_fast_fails(self):
+        limiter = HostLimiter('example.com', failure_threshold=1)
+        with self.assertRaises(ConnectionError):
+            async with limiter.acquire():
+                raise ConnectionError("not a host failure type")
+        self.assertEqual(limiter.breaker.state, CircuitBreaker.CLOSED)
+
+        with self.assertRaises(TimeoutError):
+            async with limiter.acquire():
+                raise TimeoutError()
+        with self.assertRaises(CircuitOpenError):
+            async with limiter.acquire():
+                pass
+        stats = limiter.stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['circuit']['trips'], 1)
+
+
+class TestHostLimiterRegistry(unittest.IsolatedAsyncioTestCase):
+
+    async def test_least_recently_used_idle_limiters_are_dropped(self):
+        limiters = HostLimiterRegistry(max_hosts=2, failure_threshold=1)
+        tripped = limiters.get('down.test')
+        with self.assertRaises(TimeoutError):
+            async with tripped.acquire():
+                raise TimeoutError()
+        busy = limiters.get('busy.test')
+        async with busy.acquire():
+            limiters.get('idle.test')
+            # Over the cap, but the open circuit and the request in flight keep both limiters
+            self.assertEqual(set(limiters.stats()), {'down.test', 'busy.test', 'idle.test'})
+            limiters.get('new.test')
+            self.assertNotIn('idle.test', limiters.stats())
+        self.assertIs(limiters.get('down.test'), tripped)
+        self.assertIs(limiters.get('busy.test'), busy)
+        self.assertEqual(limiters.evicted, 1)
+
+
+class TestScraperCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.requests = 0
+
+        async def unavailable(request):
+            self.requests += 1
+            return web.Response(status=503)
+
+        app = web.Application()
+        app.router.add_get('/', unavailable)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_open_circuit_skips_requests_across_scrapers(self):
+        limiters = HostLimiterRegistry(failure_threshold=2, recovery_timeout=60)
+        with mock.patch.object(WebScraper, '_calculate_backoff', return_value=0):
+            async with WebScraper({'retry_attempts': 3}, limiters=limiters) as scraper:
+                self.assertIsNone(await scraper._fetch_local(self.url))
+            async with WebScraper({'retry_attempts': 3}, limiters=limiters) as scraper:
+                self.assertIsNone(await scraper._fetch_local(self.url))
+        self.assertEqual(self.requests, 2)
+        self.assertEqual(limiters.stats()['127.0.0.1']['circuit']['state'], CircuitBreaker.OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()
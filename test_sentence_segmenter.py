@@ -0,0 +1,45 @@
+# test_sentence_segmenter.py
+
+import unittest
+from modules.config import initialize_nlp
+from modules.sentence_segmenter import RegexSentenceSegmenter
+from modules.text_processing import normalize_text
+from modules.web_scraper import WebScraper
+
+
+class TestRegexSentenceSegmenter(unittest.TestCase):
+
+    def setUp(self):
+        self.segmenter = RegexSentenceSegmenter()
+
+    def test_segments_on_terminal_punctuation(self):
+        sentences = self.segmenter.segment('He left. Did she stay? "Yes!" she said. It was 4.5 percent.')
+        self.assertEqual(sentences, ['He left.', 'Did she stay?', '"Yes!" she said.', 'It was 4.5 percent.'])
+
+    def test_does_not_split_abbreviations_or_initials(self):
+        sentences = self.segmenter.segment('Dr. Smith met J. Doe in the U.S. Capitol on Jan. 5. They talked.')
+        self.assertEqual(sentences, ['Dr. Smith met J. Doe in the U.S. Capitol on Jan. 5.', 'They talked.'])
+
+    def test_usable_as_nlp_pipeline(self):
+        result = normalize_text(self.segmenter, "One. Two.\n\nThree.", max_sentence_length=300)
+        self.assertEqual(result, "One. Two.\n\nThree.")
+
+
+class TestNlpBackendSelection(unittest.TestCase):
+
+    def test_sentencizer_backend_segments_without_model(self):
+        nlp = initialize_nlp('sentencizer')
+        self.assertEqual([s.text for s in nlp("First one. Second one.").sents], ["First one.", "Second one."])
+
+    def test_unknown_backend_raises(self):
+        with self.assertRaises(ValueError):
+            initialize_nlp('unknown')
+
+    def test_large_inputs_use_regex_backend(self):
+        scraper = WebScraper({'nlp_backend': 'sentencizer', 'regex_segmentation_threshold': 100})
+        self.assertEqual(scraper._select_nlp_backend("x" * 50), 'sentencizer')
+        self.assertEqual(scraper._select_nlp_backend("x" * 150), 'regex')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+# test_text_processing.py
+
+import unittest
+import spacy
+from modules.text_processing import normalize_text, split_long_sentence
+
+
+class TestTextProcessing(unittest.TestCase):
+
+    def setUp(self):
+        self.nlp = spacy.blank('en')
+        self.nlp.add_pipe('sentencizer')
+
+    def test_normalize_text_preserves_paragraphs(self):
+        text = "First sentence.   Second sentence.\n\n\n\nNew paragraph here."
+        result = normalize_text(self.nlp, text, max_sentence_length=300)
+        self.assertEqual(result, "First sentence. Second sentence.\n\nNew paragraph here.")
+
+    def test_normalize_text_splits_long_sentences(self):
+        sentence = "This clause is long, " * 20 + "and it ends here."
+        result = normalize_text(self.nlp, sentence, max_sentence_length=100)
+        self.assertNotIn(",", result)
+        self.assertIn("it ends here.", result)
+
+    def test_split_long_sentence_keeps_short_sentences(self):
+        self.assertEqual(split_long_sentence("Short, sweet.", 100), ["Short, sweet."])
+
+
+if __name__ == '__main__':
+    unittest.main()
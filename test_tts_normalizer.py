@@ -0,0 +1,155 @@
+# test_tts_normalizer.py
+
+import glob
+import logging
+import os
+import time
+import unittest
+from types import SimpleNamespace
+from modules import article_pipeline
+from modules.tts_normalizer import (
+    normalize_for_tts,
+    number_to_words,
+    ordinal_words,
+    rule_names,
+    year_to_words
+)
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'fixtures', 'tts_normalizer')
+
+
+class TestNumberWords(unittest.TestCase):
+
+    def test_cardinals_ordinals_and_years(self):
+        self.assertEqual(number_to_words(2002), "two thousand two")
+        self.assertEqual(number_to_words(1000000), "one million")
+        self.assertEqual(ordinal_words(21), "twenty-first")
+        self.assertEqual(ordinal_words(112), "one hundred twelfth")
+        self.assertEqual(year_to_words(1998), "nineteen ninety-eight")
+        self.assertEqual(year_to_words(1905), "nineteen oh five")
+        self.assertEqual(year_to_words(2023), "two thousand twenty-three")
+
+
+class TestNormalizeForTTS(unittest.TestCase):
+
+    def assertSpoken(self, text, expected):
+        self.assertEqual(normalize_for_tts(text), expected)
+
+    def test_numbers_ordinals_and_fractions(self):
+        self.assertSpoken("2002", "two thousand two")
+        self.assertSpoken("1st", "first")
+        self.assertSpoken("1/2", "one half")
+        self.assertSpoken("5/8", "five eighths")
+        self.assertSpoken("-5 and 3.25", "minus five and three point two five")
+
+    def test_dates_and_times(self):
+        self.assertSpoken("1/15/2023", "January fifteenth, two thousand twenty-three")
+        self.assertSpoken("9:30 AM", "nine thirty in the morning")
+        self.assertSpoken("23:45", "eleven forty-five at night")
+        self.assertSpoken("5 p.m.", "five in the evening")
+
+    def test_units_currency_and_symbols(self):
+        self.assertSpoken("5 km", "five kilometers")
+        self.assertSpoken("72°F", "seventy-two degrees Fahrenheit")
+        self.assertSpoken("$5.50", "five dollars and fifty cents")
+        self.assertSpoken("5x3", "five times three")
+        self.assertSpoken("10²", "ten squared")
+        self.assertSpoken("Dr. Smith", "Doctor Smith")
+
+    def test_decimals_with_suffixes_are_read_whole(self):
+        self.assertSpoken("1.5m", "one point five million")
+        self.assertSpoken("4.7bn people", "four point seven billion people")
+        self.assertSpoken("2.5k users", "two point five thousand users")
+        self.assertSpoken("5-10k jobs", "five to ten thousand jobs")
+        self.assertSpoken("up 0.5pp", "up zero point five percentage points")
+        self.assertSpoken("1.5x faster", "one point five times faster")
+        self.assertSpoken("-5°C", "minus five degrees Celsius")
+        self.assertSpoken("it costs 5.", "it costs five.")
+
+    def test_phone_numbers_spans_and_ratios(self):
+        self.assertSpoken("555-1234", "five five five, one two three four")
+        self.assertSpoken("1-800-555-0199", "one, eight zero zero, five five five, zero one nine nine")
+        self.assertSpoken("5.25%-5.5%", "five point two five percent to five point five percent")
+        self.assertSpoken("9:00-17:00", "nine o'clock to five o'clock in the evening")
+        self.assertSpoken("a 16:9 screen", "a sixteen to nine screen")
+        self.assertSpoken("Mt. Hood", "Mount Hood")
+
+    def test_addresses(self):
+        self.assertSpoken("example@gmail.com", "example at gmail dot com")
+        self.assertSpoken("www.website.com", "w w w dot website dot com")
+
+    def test_leaves_ambiguous_text_alone(self):
+        # Not a date, not grams, not a year without a word introducing it
+        self.assertSpoken("may 5 people", "may five people")
+        self.assertSpoken("a 5G network", "a 5G network")
+        self.assertSpoken("R&D at AT&T", "R&D at AT&T")
+        self.assertSpoken("1998 cars", "one thousand nine hundred ninety-eight cars")
+        self.assertSpoken("in 1998", "in nineteen ninety-eight")
+
+    def test_every_rule_has_a_group(self):
+        self.assertIn('number', rule_names())
+        self.assertEqual(len(rule_names()), len(set(rule_names())))
+
+
+class TestGoldenCorpus(unittest.TestCase):
+
+    def test_golden_files(self):
+        inputs = [path for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, '*.txt')))
+                  if not path.endswith('.expected.txt')]
+        self.assertTrue(inputs)
+        for path in inputs:
+            with self.subTest(path=os.path.basename(path)):
+                with open(path, encoding='utf-8') as source, \
+                        open(path[:-len('.txt')] + '.expected.txt', encoding='utf-8') as expected:
+                    self.assertEqual(normalize_for_tts(source.read()), expected.read())
+
+    def test_large_article_is_normalized_in_milliseconds(self):
+        with open(os.path.join(GOLDEN_DIR, 'news.txt'), encoding='utf-8') as source:
+            paragraph = source.read()
+        article = (paragraph * (50000 // len(paragraph) + 1))[:50000]
+        start = time.perf_counter()
+        normalize_for_tts(article)
+        # Typically well under 100ms; generous for slow CI machines
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_content(self, user_prompt):
+        self.prompts.append(user_prompt)
+        return user_prompt.rsplit('\n', 1)[-1]
+
+
+class TestGenerateArticleTextModes(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.generator = FakeGenerator()
+        self.original = (article_pipeline.content_generators, article_pipeline.LLM_PIPELINING_ENABLED)
+        article_pipeline.content_generators = SimpleNamespace(get=lambda: self.generator)
+        article_pipeline.LLM_PIPELINING_ENABLED = False
+
+    def tearDown(self):
+        article_pipeline.content_generators, article_pipeline.LLM_PIPELINING_ENABLED = self.original
+        logging.disable(logging.NOTSET)
+
+    async def test_local_mode_replaces_the_readability_prompt(self):
+        text = await article_pipeline.generate_article_text("It cost $5.", tts_mode='local')
+        self.assertEqual(text, "It cost five dollars.")
+        self.assertEqual(len(self.generator.prompts), 1)
+
+    async def test_hybrid_mode_normalizes_before_the_readability_prompt(self):
+        await article_pipeline.generate_article_text("It cost $5.", tts_mode='hybrid')
+        self.assertEqual(len(self.generator.prompts), 2)
+        self.assertIn("It cost five dollars.", self.generator.prompts[1])
+
+    async def test_llm_mode_sends_text_unchanged(self):
+        await article_pipeline.generate_article_text("It cost $5.", tts_mode='llm')
+        self.assertEqual(len(self.generator.prompts), 2)
+        self.assertIn("It cost $5.", self.generator.prompts[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
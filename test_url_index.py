@@ -0,0 +1,107 @@
+# test_url_index.py
+
+import logging
+import unittest
+from modules.url_index import UrlIndex, canonicalize_url, url_key
+
+
+class TestCanonicalizeUrl(unittest.TestCase):
+
+    def test_equivalent_spellings_share_a_canonical_url(self):
+        expected = "https://example.com/news/story?id=7"
+        for url in [
+            "https://example.com/news/story?id=7",
+            "http://www.Example.com/news/story/?id=7",
+            "https://example.com:443//news/story?utm_source=x&id=7&fbclid=abc#comments",
+            "HTTPS://EXAMPLE.COM/news/./story?id=7&utm_campaign=spring",
+        ]:
+            self.assertEqual(canonicalize_url(url), expected, url)
+
+    def test_meaningful_differences_are_kept(self):
+        self.assertNotEqual(canonicalize_url("https://example.com/a?page=1"),
+                            canonicalize_url("https://example.com/a?page=2"))
+        self.assertEqual(canonicalize_url("https://example.com:8080/a"), "https://example.com:8080/a")
+        self.assertEqual(canonicalize_url("https://example.com"), "https://example.com/")
+
+    def test_relative_canonical_resolves_against_page(self):
+        self.assertEqual(canonicalize_url("/story", base="https://m.example.com/amp/story?utm_medium=x"),
+                         "https://m.example.com/story")
+
+    def test_non_http_urls_are_rejected(self):
+        self.assertIsNone(canonicalize_url("ftp://example.com/a"))
+        self.assertIsNone(canonicalize_url("not a url"))
+        self.assertIsNone(canonicalize_url(None))
+
+
+class TestUrlIndex(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.store_entries = {}
+        self.lookups = []
+
+        async def lookup(key):
+            self.lookups.append(key)
+            return self.store_entries.get(key)
+
+        async def store(key, canonical_url, article_id):
+            self.store_entries[key] = article_id
+            return True
+
+        self.index = UrlIndex(lookup=lookup, store=store)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    async def test_added_urls_are_found_in_memory(self):
+        await self.index.add(["https://www.example.com/story/?utm_source=feed", None], "article-1")
+        self.assertEqual(await self.index.find("http://example.com/story"), "article-1")
+        self.assertEqual(self.lookups, [])
+        self.assertEqual(self.index.stats()['memory_hits'], 1)
+
+    async def test_store_backs_a_cold_index(self):
+        self.store_entries[url_key("https://example.com/story")] = "article-2"
+        self.assertEqual(await self.index.find("https://example.com/other", "https://example.com/story"),
+                         "article-2")
+        self.assertEqual(await self.index.find("https://example.com/story"), "article-2")
+        self.assertEqual(self.index.stats()['store_hits'], 1)
+        self.assertEqual(self.index.stats()['memory_hits'], 1)
+
+    async def test_unknown_urls_miss(self):
+        self.assertIsNone(await self.index.find("https://example.com/new"))
+        self.assertEqual(self.index.stats()['misses'], 1)
+
+    async def test_store_errors_do_not_fail_lookups(self):
+        async def failing_lookup(key):
+            raise RuntimeError("unavailable")
+
+        index = UrlIndex(lookup=failing_lookup)
+        self.assertIsNone(await index.find("https://example.com/story"))
+        self.assertEqual(index.stats()['store_errors'], 1)
+
+    async def test_forget_article_removes_entries(self):
+        index = UrlIndex()
+        await index.add(["https://example.com/a", "https://example.com/b"], "article-3")
+        index.forget_article("article-3")
+        self.assertIsNone(await index.find("https://example.com/a"))
+
+    async def test_unpersisted_entries_stay_in_memory(self):
+        await self.index.add(["https://example.com/a"], "article-5", persist=False)
+        self.assertEqual(self.store_entries, {})
+        self.assertEqual(await self.index.find("https://example.com/a"), "article-5")
+
+    async def test_expired_memory_entries_are_confirmed_by_the_store(self):
+        index = UrlIndex(lookup=self.index.lookup, store=self.index.store, memory_ttl_seconds=0)
+        await index.add(["https://example.com/a", "https://example.com/b"], "article-4")
+        self.assertEqual(await index.find("https://example.com/a"), "article-4")
+        self.assertEqual(self.lookups, [url_key("https://example.com/a")])
+
+        # Another process deleted the article and its store entries
+        self.store_entries.clear()
+        self.assertIsNone(await index.find("https://example.com/b"))
+        self.assertEqual(index.stats()['expired'], 2)
+        self.assertEqual(index.stats()['memory_hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
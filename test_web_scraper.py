@@ -1,5 +1,8 @@
 import unittest
-from modules.web_scraper import WebScraper
+import asyncio
+import time
+from aiohttp import web
+from modules.web_scraper import WebScraper, FirstValidPolicy
 
 class WebScraperTestCase(unittest.TestCase):
     def setUp(self):
@@ -33,5 +36,184 @@ The US government said Mr Shakeri has not been arrested and is believed to be in
         self.assertIn('content', result)
         self.assertTrue(len(result['content']) > 100)  # Assuming content will be substantial
 
+
+def make_html(marker, paragraphs=40):
+    body = ''.join(f"<p>{marker} paragraph {i} with enough words to look like an article.</p>" for i in range(paragraphs))
+    return f"<html><head><title>{marker}</title></head><body>{body}</body></html>"
+
+
+class DocumentParsingTestCase(unittest.TestCase):
+    """Single-parse metadata and text extraction."""
+
+    def setUp(self):
+        self.scraper = WebScraper()
+
+    def test_parse_document_extracts_metadata_and_text(self):
+        html_content = (
+            "<html><head><title> Test Title </title>"
+            "<meta name='author' content='Jane Doe'>"
+            "<meta property='article:published_time' content='2024-11-08T10:00:00Z'>"
+            "<meta name='description' content='A description'>"
+            "<link rel='canonical' href='https://example.com/story'>"
+            "<script>var tracking = 1;</script></head>"
+            "<body><p>Some content</p><style>p {}</style></body></html>"
+        )
+        metadata, text, stats = self.scraper._parse_document(html_content)
+        self.assertEqual(metadata['title'], "Test Title")
+        self.assertEqual(metadata['author'], "Jane Doe")
+        self.assertTrue(metadata['date'].startswith("2024-11-08T10:00:00"))
+        self.assertEqual(metadata['description'], "A description")
+        self.assertEqual(metadata['canonical_url'], "https://example.com/story")
+        self.assertIn("Some content", text)
+        self.assertNotIn("tracking", text)
+        self.assertNotIn("p {}", text)
+        # Too little text for boilerplate removal, so the full page text is used
+        self.assertEqual(stats['engine'], 'none')
+
+
+class StreamingFetchTestCase(unittest.IsolatedAsyncioTestCase):
+    """Streaming body reader limits in _fetch_local."""
+
+    async def asyncSetUp(self):
+        self.requests = 0
+
+        async def oversized_handler(request):
+            self.requests += 1
+            response = web.StreamResponse(headers={'Content-Type': 'text/html'})
+            await response.prepare(request)
+            for _ in range(100):
+                await response.write(b"<p>" + b"x" * 65536 + b"</p>")
+            return response
+
+        async def image_handler(request):
+            self.requests += 1
+            return web.Response(body=b"\x89PNG" + b"0" * 2000, content_type='image/png')
+
+        app = web.Application()
+        app.router.add_get('/oversized', oversized_handler)
+        app.router.add_get('/image', image_handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        self.scraper = WebScraper({'max_content_length': 100000, 'retry_attempts': 3})
+        await self.scraper.create_session()
+
+    async def asyncTearDown(self):
+        await self.scraper.close()
+        await self.runner.cleanup()
+
+    async def test_oversized_body_is_aborted_without_retry(self):
+        result = await self.scraper._fetch_local(f"{self.base_url}/oversized")
+        self.assertIsNone(result)
+        self.assertEqual(self.requests, 1)
+
+    async def test_non_html_content_type_is_rejected(self):
+        result = await self.scraper._fetch_local(f"{self.base_url}/image")
+        self.assertIsNone(result)
+        self.assertEqual(self.requests, 1)
+
+    async def test_charset_is_sniffed_from_meta_tag(self):
+        self.scraper.config['min_content_length'] = 100
+        original = make_html("caf\u00e9")
+        latin1_page = original.replace("<head>", "<head><meta charset='iso-8859-1'>")
+
+        async def handler(request):
+            return web.Response(body=latin1_page.encode('iso-8859-1'), headers={'Content-Type': 'text/html'})
+
+        app = web.Application()
+        app.router.add_get('/', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        try:
+            url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+            result = await self.scraper._fetch_local(url)
+        finally:
+            await runner.cleanup()
+        self.assertIn("caf\u00e9", result)
+        # Head metadata is read while the body streams
+        self.assertEqual(result.head_metadata['title'], "caf\u00e9")
+
+
+class HedgedFetchTestCase(unittest.IsolatedAsyncioTestCase):
+    """Hedged fetch against two local stand-in servers with injected delays."""
+
+    async def asyncSetUp(self):
+        self.origin_delay = 0.0
+        self.origin_html = make_html("origin")
+        self.cloud_run_delay = 0.0
+        self.cloud_run_html = make_html("cloudrun", paragraphs=60)
+        self.cloud_run_calls = 0
+
+        async def origin_handler(request):
+            await asyncio.sleep(self.origin_delay)
+            return web.Response(text=self.origin_html, content_type='text/html')
+
+        async def cloud_run_handler(request):
+            self.cloud_run_calls += 1
+            await asyncio.sleep(self.cloud_run_delay)
+            return web.json_response({'status': 'success', 'content': self.cloud_run_html})
+
+        self.runners = []
+        self.origin_url = await self._start_server(origin_handler)
+        self.cloud_run_url = await self._start_server(cloud_run_handler)
+
+    async def _start_server(self, handler):
+        app = web.Application()
+        app.router.add_get('/', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        self.runners.append(runner)
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/"
+
+    async def asyncTearDown(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+    def _scraper(self, **config):
+        return WebScraper({
+            'cloud_run_url': self.cloud_run_url,
+            'fetch_mode': 'hedged',
+            'retry_attempts': 1,
+            'timeout': 5,
+            **config
+        })
+
+    async def test_first_valid_returns_faster_backend(self):
+        self.origin_delay = 1.0
+        async with self._scraper(hedge_policy='first_valid') as scraper:
+            start = time.monotonic()
+            result = await scraper.fetch_webpage(self.origin_url)
+            elapsed = time.monotonic() - start
+        self.assertIn("cloudrun", result)
+        self.assertLess(elapsed, 0.9)
+
+    async def test_longest_waits_within_grace_period(self):
+        self.cloud_run_delay = 0.3
+        async with self._scraper(hedge_policy='longest', hedge_grace_period=1.0) as scraper:
+            result = await scraper.fetch_webpage(self.origin_url)
+        self.assertIn("cloudrun", result)
+
+    async def test_longest_cancels_loser_after_grace_period(self):
+        self.cloud_run_delay = 2.0
+        async with self._scraper(hedge_policy='longest', hedge_grace_period=0.2) as scraper:
+            start = time.monotonic()
+            result = await scraper.fetch_webpage(self.origin_url)
+            elapsed = time.monotonic() - start
+        self.assertIn("origin", result)
+        self.assertLess(elapsed, 1.5)
+
+    async def test_hedge_delay_skips_cloud_run_when_local_is_fast(self):
+        async with self._scraper(hedge_policy=FirstValidPolicy(), hedge_delay=0.5) as scraper:
+            result = await scraper.fetch_webpage(self.origin_url)
+        self.assertIn("origin", result)
+        self.assertEqual(self.cloud_run_calls, 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file